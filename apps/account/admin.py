@@ -1,5 +1,6 @@
 # apps/account/admin.py
 from django.contrib import admin
+from .models import AuditEvento, AuditEventoArchivo
 
 # Intentamos importar Perfil; si no existe todavía, evitamos que el admin se caiga.
 try:
@@ -13,3 +14,32 @@ if Perfil:
     class PerfilAdmin(admin.ModelAdmin):
         list_display = ("usuario", "cargo", "avatar_url")
         search_fields = ("usuario__username", "usuario__email", "cargo")
+
+
+@admin.register(AuditEvento)
+class AuditEventoAdmin(admin.ModelAdmin):
+    list_display = ("fecha", "usuario", "accion", "objeto_tipo", "objeto_id", "objeto")
+    list_filter = ("accion",)
+    search_fields = ("usuario", "objeto")
+    date_hierarchy = "fecha"
+    ordering = ("-fecha",)
+    readonly_fields = ("fecha", "usuario", "accion", "objeto_tipo", "objeto_id", "objeto", "detalle")
+    # Sin COUNT(*) completo en cada listado
+    show_full_result_count = False
+
+    # Registro de solo lectura
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AuditEventoArchivo)
+class AuditEventoArchivoAdmin(AuditEventoAdmin):
+    list_display = ("fecha", "periodo", "usuario", "accion", "objeto_tipo", "objeto_id", "objeto")
+    list_filter = ("periodo", "accion")
+    readonly_fields = ("id", "periodo") + AuditEventoAdmin.readonly_fields
@@ -0,0 +1,137 @@
+# apps/account/audit.py
+"""
+Subsistema de auditoría no bloqueante.
+
+El logger 'auditoria' sólo encola el evento (QueueHandler). Un hilo
+QueueListener lo escribe después, en lotes, a:
+  - un archivo rotativo (audit.log)
+  - la tabla AuditEvento (bulk_create)
+Así la latencia del request no depende del I/O de auditoría.
+
+Este módulo se importa desde settings.LOGGING, antes de cargar las apps:
+no debe importar modelos a nivel de módulo.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+# Tamaño máximo de la cola: si se llena (BD caída, disco lento) se descartan
+# eventos antes que bloquear requests.
+COLA_MAXIMA = 10000
+
+
+class AuditQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que nunca bloquea: si la cola está llena, descarta y cuenta."""
+
+    def __init__(self, cola):
+        super().__init__(cola)
+        self.descartados = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+class AuditQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener que además despierta cada 'intervalo' segundos para
+    vaciar los buffers de los handlers aunque no lleguen eventos nuevos.
+    """
+
+    def __init__(self, cola, *handlers, intervalo=2.0):
+        super().__init__(cola, *handlers, respect_handler_level=True)
+        self.intervalo = intervalo
+
+    def _flush_handlers(self):
+        for handler in self.handlers:
+            try:
+                handler.flush()
+            except Exception:
+                pass
+
+    def _monitor(self):
+        q = self.queue
+        has_task_done = hasattr(q, "task_done")
+        while True:
+            try:
+                record = q.get(True, self.intervalo)
+            except queue.Empty:
+                self._flush_handlers()
+                continue
+            if record is self._sentinel:
+                if has_task_done:
+                    q.task_done()
+                break
+            self.handle(record)
+            if has_task_done:
+                q.task_done()
+        self._flush_handlers()
+
+
+class AuditDBHandler(logging.Handler):
+    """
+    Acumula eventos y los inserta en AuditEvento con un solo bulk_create
+    por lote (cada 'tamano_lote' eventos o en cada flush del listener).
+    Sólo se usa desde el hilo del listener.
+    """
+
+    def __init__(self, tamano_lote=200):
+        super().__init__()
+        self.tamano_lote = tamano_lote
+        self.buffer = []
+
+    def emit(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.tamano_lote:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        lote, self.buffer = self.buffer, []
+        try:
+            from django.db import close_old_connections
+            from .models import AuditEvento
+
+            close_old_connections()
+            AuditEvento.objects.bulk_create(
+                [AuditEvento.desde_log(r) for r in lote],
+                batch_size=self.tamano_lote,
+            )
+        except Exception as e:
+            # Sin BD (migraciones pendientes, caída): el archivo rotativo ya lo registró
+            sys.stderr.write(f"[auditoria] No se pudo escribir {len(lote)} eventos en BD: {e}\n")
+
+
+def crear_handler_auditoria(filename, max_bytes=10 * 1024 * 1024, backup_count=10,
+                            formato="{asctime} | {levelname} | {message}",
+                            tamano_lote=200, intervalo=2.0, guardar_en_bd=True):
+    """
+    Fábrica usada por settings.LOGGING ('()': ...).
+    Devuelve el QueueHandler y deja corriendo el listener con sus destinos.
+    """
+    cola = queue.Queue(COLA_MAXIMA)
+
+    archivo = logging.handlers.RotatingFileHandler(
+        filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+    archivo.setFormatter(logging.Formatter(formato, style="{"))
+    destinos = [archivo]
+    if guardar_en_bd:
+        destinos.append(AuditDBHandler(tamano_lote=tamano_lote))
+
+    listener = AuditQueueListener(cola, *destinos, intervalo=intervalo)
+    listener.start()
+    # Al salir del proceso se vacía la cola pendiente
+    atexit.register(_detener_listener, listener)
+
+    return AuditQueueHandler(cola)
+
+
+def _detener_listener(listener):
+    if listener._thread is not None:
+        listener.stop()
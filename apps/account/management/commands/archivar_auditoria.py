@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.account.models import AuditEvento, AuditEventoArchivo
+
+
+def _restar_meses(anio, mes, n):
+    total = anio * 12 + (mes - 1) - n
+    return total // 12, total % 12 + 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve los eventos de auditoría antiguos a la tabla de archivo mensual "
+        "y purga los meses archivados que superan la retención."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--meses-activos", type=int, default=3,
+                            help="Meses completos que permanecen en la tabla activa (default 3).")
+        parser.add_argument("--retencion-meses", type=int, default=60,
+                            help="Meses a conservar en el archivo; 0 = conservar todo (default 60).")
+        parser.add_argument("--lote", type=int, default=5000,
+                            help="Eventos por transacción (default 5000).")
+
+    def handle(self, *args, **opts):
+        ahora = timezone.localtime()
+        lote = max(1, opts["lote"])
+
+        # Corte: primer día del mes (actual - meses_activos), hora local
+        anio, mes = _restar_meses(ahora.year, ahora.month, max(0, opts["meses_activos"]))
+        corte = ahora.replace(year=anio, month=mes, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        movidos = 0
+        while True:
+            with transaction.atomic():
+                eventos = list(
+                    AuditEvento.objects.filter(fecha__lt=corte).order_by("id")[:lote]
+                )
+                if not eventos:
+                    break
+                AuditEventoArchivo.objects.bulk_create(
+                    [
+                        AuditEventoArchivo(
+                            id=e.id,
+                            periodo=int(timezone.localtime(e.fecha).strftime("%Y%m")),
+                            fecha=e.fecha,
+                            usuario=e.usuario,
+                            accion=e.accion,
+                            objeto_tipo=e.objeto_tipo,
+                            objeto_id=e.objeto_id,
+                            objeto=e.objeto,
+                            detalle=e.detalle,
+                        )
+                        for e in eventos
+                    ],
+                    ignore_conflicts=True,  # reintentos idempotentes
+                )
+                AuditEvento.objects.filter(id__in=[e.id for e in eventos]).delete()
+            movidos += len(eventos)
+
+        purgados = 0
+        if opts["retencion_meses"] > 0:
+            anio, mes = _restar_meses(ahora.year, ahora.month, opts["retencion_meses"])
+            periodo_limite = anio * 100 + mes
+            # Borrado por periodo completo (índice sobre 'periodo')
+            purgados, _ = AuditEventoArchivo.objects.filter(periodo__lt=periodo_limite).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Auditoría: {movidos} eventos archivados (anteriores a {corte:%Y-%m-%d}), "
+            f"{purgados} eventos purgados por retención."
+        ))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0003_delete_perfil'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEvento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(db_index=True, verbose_name='Fecha')),
+                ('usuario', models.CharField(blank=True, max_length=150, verbose_name='Usuario')),
+                ('accion', models.CharField(blank=True, max_length=60, verbose_name='Acción')),
+                ('objeto', models.CharField(blank=True, max_length=255, verbose_name='Objeto')),
+                ('detalle', models.JSONField(blank=True, default=dict, verbose_name='Detalle')),
+            ],
+            options={
+                'verbose_name': 'Evento de auditoría',
+                'verbose_name_plural': 'Eventos de auditoría',
+                'ordering': ['-fecha', '-id'],
+                'indexes': [models.Index(fields=['usuario', 'fecha'], name='audit_usuario_fecha_idx'), models.Index(fields=['accion', 'fecha'], name='audit_accion_fecha_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0004_auditevento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEventoArchivo',
+            fields=[
+                ('fecha', models.DateTimeField(verbose_name='Fecha')),
+                ('usuario', models.CharField(blank=True, max_length=150, verbose_name='Usuario')),
+                ('accion', models.CharField(blank=True, max_length=60, verbose_name='Acción')),
+                ('objeto_tipo', models.CharField(blank=True, max_length=60, verbose_name='Tipo de objeto')),
+                ('objeto_id', models.CharField(blank=True, max_length=64, verbose_name='ID de objeto')),
+                ('objeto', models.CharField(blank=True, max_length=255, verbose_name='Objeto')),
+                ('detalle', models.JSONField(blank=True, default=dict, verbose_name='Detalle')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('periodo', models.PositiveIntegerField(verbose_name='Periodo (AAAAMM)')),
+            ],
+            options={
+                'verbose_name': 'Evento de auditoría archivado',
+                'verbose_name_plural': 'Eventos de auditoría archivados',
+                'ordering': ['-fecha', '-id'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='auditevento',
+            name='objeto_id',
+            field=models.CharField(blank=True, max_length=64, verbose_name='ID de objeto'),
+        ),
+        migrations.AddField(
+            model_name='auditevento',
+            name='objeto_tipo',
+            field=models.CharField(blank=True, max_length=60, verbose_name='Tipo de objeto'),
+        ),
+        migrations.AlterField(
+            model_name='auditevento',
+            name='fecha',
+            field=models.DateTimeField(verbose_name='Fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='auditevento',
+            index=models.Index(fields=['fecha', 'id'], name='audit_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditevento',
+            index=models.Index(fields=['objeto_tipo', 'objeto_id', 'fecha'], name='audit_objeto_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditeventoarchivo',
+            index=models.Index(fields=['periodo'], name='auditarch_periodo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditeventoarchivo',
+            index=models.Index(fields=['fecha', 'id'], name='auditarch_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditeventoarchivo',
+            index=models.Index(fields=['usuario', 'fecha'], name='auditarch_usuario_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditeventoarchivo',
+            index=models.Index(fields=['accion', 'fecha'], name='auditarch_accion_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditeventoarchivo',
+            index=models.Index(fields=['objeto_tipo', 'objeto_id', 'fecha'], name='auditarch_objeto_fecha_idx'),
+        ),
+    ]
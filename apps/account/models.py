@@ -1,4 +1,7 @@
 # === AÑADIR AL FINAL DE apps/account/views.py ===
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import models
 from django.contrib.auth.views import PasswordResetView, PasswordResetConfirmView, PasswordChangeView
 from django.urls import reverse_lazy
 from .forms import CustomPasswordResetForm, CustomSetPasswordForm, CustomPasswordChangeForm
@@ -40,3 +43,84 @@ class ChangePasswordView(PasswordChangeView):
             u.invite_code = ""
             u.save(update_fields=["must_change_password", "invite_code"])
         return resp
+
+
+# ================================================================
+# AUDITORÍA
+# ================================================================
+
+class AuditEventoBase(models.Model):
+    """Columnas comunes del registro de auditoría (tabla activa y archivo)."""
+    fecha = models.DateTimeField("Fecha")
+    usuario = models.CharField("Usuario", max_length=150, blank=True)
+    accion = models.CharField("Acción", max_length=60, blank=True)
+    objeto_tipo = models.CharField("Tipo de objeto", max_length=60, blank=True)
+    objeto_id = models.CharField("ID de objeto", max_length=64, blank=True)
+    objeto = models.CharField("Objeto", max_length=255, blank=True)
+    detalle = models.JSONField("Detalle", default=dict, blank=True)
+
+    class Meta:
+        abstract = True
+        ordering = ["-fecha", "-id"]
+
+    def __str__(self):
+        return f"{self.fecha:%Y-%m-%d %H:%M:%S} {self.usuario} {self.accion} {self.objeto}"
+
+    def save(self, *args, **kwargs):
+        # Registro append-only: se inserta, nunca se modifica
+        if not self._state.adding:
+            raise ValueError("Los eventos de auditoría no se pueden modificar.")
+        super().save(*args, **kwargs)
+
+
+class AuditEvento(AuditEventoBase):
+    """
+    Evento de auditoría (escrito en lotes por apps.account.audit).
+    Tabla "caliente": sólo los últimos meses; lo antiguo se mueve a
+    AuditEventoArchivo con el comando archivar_auditoria.
+    """
+
+    class Meta(AuditEventoBase.Meta):
+        verbose_name = "Evento de auditoría"
+        verbose_name_plural = "Eventos de auditoría"
+        indexes = [
+            models.Index(fields=["fecha", "id"], name="audit_fecha_idx"),
+            models.Index(fields=["usuario", "fecha"], name="audit_usuario_fecha_idx"),
+            models.Index(fields=["accion", "fecha"], name="audit_accion_fecha_idx"),
+            models.Index(fields=["objeto_tipo", "objeto_id", "fecha"], name="audit_objeto_fecha_idx"),
+        ]
+
+    @classmethod
+    def desde_log(cls, record):
+        """Arma el evento desde un LogRecord (estructurado o texto plano)."""
+        datos = getattr(record, "auditoria", None) or {}
+        return cls(
+            fecha=datetime.fromtimestamp(record.created, tz=dt_timezone.utc),
+            usuario=str(datos.get("usuario", ""))[:150],
+            accion=str(datos.get("accion", ""))[:60],
+            objeto_tipo=str(datos.get("objeto_tipo", ""))[:60],
+            objeto_id=str(datos.get("objeto_id", ""))[:64],
+            objeto=str(datos.get("objeto", record.getMessage()))[:255],
+            detalle=datos.get("detalle") or {},
+        )
+
+
+class AuditEventoArchivo(AuditEventoBase):
+    """
+    Archivo mensual de auditoría. Conserva el id original (la paginación
+    por cursor sigue funcionando al pasar de la tabla activa al archivo)
+    y el periodo AAAAMM, que permite purgar meses completos por índice.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    periodo = models.PositiveIntegerField("Periodo (AAAAMM)")
+
+    class Meta(AuditEventoBase.Meta):
+        verbose_name = "Evento de auditoría archivado"
+        verbose_name_plural = "Eventos de auditoría archivados"
+        indexes = [
+            models.Index(fields=["periodo"], name="auditarch_periodo_idx"),
+            models.Index(fields=["fecha", "id"], name="auditarch_fecha_idx"),
+            models.Index(fields=["usuario", "fecha"], name="auditarch_usuario_fecha_idx"),
+            models.Index(fields=["accion", "fecha"], name="auditarch_accion_fecha_idx"),
+            models.Index(fields=["objeto_tipo", "objeto_id", "fecha"], name="auditarch_objeto_fecha_idx"),
+        ]
@@ -17,6 +17,9 @@ urlpatterns = [
     path('logout/', views.cerrar_sesion, name='logout'),
     path('modulo/<str:app_slug>/', views.module_gate_view, name='module_gate'),
 
+    # === Consulta de auditoría (solo ADMIN) ===
+    path('auditoria/', views.auditoria_view, name='auditoria'),
+
     # === NUEVO: Recuperar contraseña ===
     # Usa tu template: apps/account/templates/password_reset_request.html
     path('password/reset/', PasswordResetRequestView.as_view(), name='password_reset_request'),
@@ -1,12 +1,23 @@
 import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
 
-audit_logger = logging.getLogger('audit')
+from django.db.models import Q
 
-def registrar_auditoria(usuario, accion, objeto):
+# Mismo nombre que el logger configurado en settings.LOGGING
+audit_logger = logging.getLogger('auditoria')
+
+def registrar_auditoria(usuario, accion, objeto, objeto_tipo="", objeto_id="", **detalle):
     """
     Registra operaciones CRUD sin exponer datos sensibles.
+    Sólo encola el evento: la escritura a archivo/BD ocurre en segundo plano
+    (ver apps.account.audit).
+    - usuario: instancia (o UsuarioToken) o el username como texto
+    - objeto_tipo / objeto_id: permiten buscar "todo lo que pasó con X" por índice
     """
-    username = usuario.username if usuario else "desconocido"
+    if isinstance(usuario, str):
+        username = usuario or "desconocido"
+    else:
+        username = usuario.username if usuario else "desconocido"
 
     mensaje = (
         f"Usuario={username} | "
@@ -14,4 +25,80 @@ def registrar_auditoria(usuario, accion, objeto):
         f"Objeto={objeto}"
     )
 
-    audit_logger.info(mensaje)
+    audit_logger.info(mensaje, extra={"auditoria": {
+        "usuario": username,
+        "accion": accion,
+        "objeto_tipo": objeto_tipo,
+        "objeto_id": str(objeto_id or ""),
+        "objeto": str(objeto),
+        "detalle": detalle,
+    }})
+
+
+# ================================================================
+# CONSULTA CON PAGINACIÓN POR CURSOR (keyset)
+# ================================================================
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICRO = timedelta(microseconds=1)
+
+
+def _cursor_a_texto(evento):
+    micros = (evento.fecha - _EPOCH) // _MICRO  # aritmética entera, sin redondeos
+    return f"{micros}-{evento.id}"
+
+
+def _texto_a_cursor(cursor):
+    """'<epoch_micros>-<id>' -> (datetime, id) o None si es inválido."""
+    try:
+        micros, pk = (cursor or "").split("-", 1)
+        fecha = _EPOCH + int(micros) * _MICRO
+        return fecha, int(pk)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def buscar_eventos(usuario="", accion="", objeto_tipo="", objeto_id="",
+                   desde=None, hasta=None, cursor=None, limite=50):
+    """
+    Busca eventos de auditoría ordenados del más nuevo al más antiguo.
+    Pagina por cursor (fecha, id), no por OFFSET: cada página es un
+    rango sobre índice sin importar cuántos años de historia haya.
+    Si la tabla activa se agota, continúa en AuditEventoArchivo (que sólo
+    contiene eventos más antiguos).
+    desde / hasta: datetimes aware (hasta es exclusivo).
+    Devuelve (eventos, siguiente_cursor | None).
+    """
+    from .models import AuditEvento, AuditEventoArchivo
+
+    filtro = Q()
+    if usuario:
+        filtro &= Q(usuario=usuario)
+    if accion:
+        filtro &= Q(accion=accion)
+    if objeto_tipo:
+        filtro &= Q(objeto_tipo=objeto_tipo)
+    if objeto_id:
+        filtro &= Q(objeto_id=str(objeto_id))
+    if desde:
+        filtro &= Q(fecha__gte=desde)
+    if hasta:
+        filtro &= Q(fecha__lt=hasta)
+
+    posicion = _texto_a_cursor(cursor)
+    if posicion:
+        fecha, pk = posicion
+        filtro &= Q(fecha__lt=fecha) | Q(fecha=fecha, id__lt=pk)
+
+    eventos = []
+    for modelo in (AuditEvento, AuditEventoArchivo):
+        faltan = limite + 1 - len(eventos)
+        if faltan <= 0:
+            break
+        eventos.extend(modelo.objects.filter(filtro).order_by("-fecha", "-id")[:faltan])
+
+    siguiente = None
+    if len(eventos) > limite:
+        eventos = eventos[:limite]
+        siguiente = _cursor_a_texto(eventos[-1])
+    return eventos, siguiente
@@ -9,7 +9,7 @@ from django.http import JsonResponse
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_decode
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 from django.views.decorators.cache import never_cache
 from django.conf import settings
 
@@ -21,6 +21,9 @@ from .forms import (
     CustomSetPasswordForm,
     CustomPasswordChangeForm,
 )
+from django.utils.dateparse import parse_date
+from lilis_erp.roles import require_roles
+from .utils import buscar_eventos, registrar_auditoria
 
 
 # ================================================================
@@ -96,6 +99,8 @@ def iniciar_sesion(request):
                 minutos = segundos // 60
                 resto = segundos % 60
 
+                registrar_auditoria(usuario, "LOGIN_BLOQUEADO", f"Usuario id={u.id}",
+                                    objeto_tipo="Usuario", objeto_id=u.id, ip=ip)
                 messages.error(
                     request,
                     f"Demasiados intentos fallidos. Intenta nuevamente en {minutos}m {resto}s."
@@ -117,12 +122,16 @@ def iniciar_sesion(request):
 
             if getattr(user, "estado", "activo") != "activo" or not getattr(user, "activo", True):
                 logger.info(f"Login bloqueado (usuario inactivo): usuario={usuario}, ip={ip}")
+                registrar_auditoria(user, "LOGIN_INACTIVO", f"Usuario id={user.id}",
+                                    objeto_tipo="Usuario", objeto_id=user.id, ip=ip)
                 messages.error(request, "Tu usuario está desactivado. Contacta al administrador.")
                 return render(request, "login.html")
 
             login(request, user)
 
             logger.info(f"Login exitoso: usuario={usuario}, ip={ip}")
+            registrar_auditoria(user, "LOGIN_OK", f"Usuario id={user.id}",
+                                objeto_tipo="Usuario", objeto_id=user.id, ip=ip)
 
             next_url = request.POST.get("next") or request.GET.get("next")
             if (user.is_superuser or getattr(user, "rol", "") == "ADMIN") and next_url:
@@ -134,6 +143,8 @@ def iniciar_sesion(request):
         # LOGIN FALLIDO
         # ------------------------------------------------
         logger.info(f"Login fallido: usuario={usuario}, ip={ip}")
+        registrar_auditoria(usuario, "LOGIN_FALLIDO", f"Usuario={usuario}",
+                            objeto_tipo="Usuario", objeto_id=u.id if u else "", ip=ip)
 
         if u:
             u.intentos_fallidos_login += 1
@@ -174,6 +185,49 @@ def module_gate_view(request, app_slug: str):
     return render(request, "module_gate.html", {"app_slug": app_slug})
 
 
+# ================================================================
+# CONSULTA DE AUDITORÍA
+# ================================================================
+
+def _inicio_del_dia(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+@login_required
+@require_roles("ADMIN")
+def auditoria_view(request):
+    """
+    GET /auditoria/?usuario=...&accion=...&objeto_tipo=...&objeto_id=...
+                   &desde=AAAA-MM-DD&hasta=AAAA-MM-DD&cursor=...
+    Filtros exactos (índices) + paginación por cursor: incluye el archivo histórico.
+    """
+    filtros = {
+        "usuario": (request.GET.get("usuario") or "").strip(),
+        "accion": (request.GET.get("accion") or "").strip().upper(),
+        "objeto_tipo": (request.GET.get("objeto_tipo") or "").strip(),
+        "objeto_id": (request.GET.get("objeto_id") or "").strip(),
+    }
+    desde = parse_date(request.GET.get("desde") or "")
+    hasta = parse_date(request.GET.get("hasta") or "")
+
+    eventos, siguiente = buscar_eventos(
+        **filtros,
+        desde=_inicio_del_dia(desde) if desde else None,
+        hasta=_inicio_del_dia(hasta + timedelta(days=1)) if hasta else None,
+        cursor=request.GET.get("cursor"),
+        limite=25,
+    )
+
+    return render(request, "auditoria.html", {
+        "eventos": eventos,
+        "siguiente_cursor": siguiente,
+        "es_primera_pagina": not request.GET.get("cursor"),
+        **filtros,
+        "desde": request.GET.get("desde") or "",
+        "hasta": request.GET.get("hasta") or "",
+    })
+
+
 # ================================================================
 # PASSWORD RESET
 # ================================================================
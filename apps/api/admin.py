@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import TokenRevocado
 
-# Register your models here.
+@admin.register(TokenRevocado)
+class TokenRevocadoAdmin(admin.ModelAdmin):
+    list_display = ("usuario_id", "jti", "motivo", "revocado_en", "expira_en")
+    search_fields = ("jti", "motivo")
+    ordering = ("-revocado_en",)
@@ -0,0 +1,36 @@
+# apps/api/authentication.py
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+
+from .tokens import CLAIM_ROL, token_revocado
+
+
+class UsuarioToken(TokenUser):
+    """
+    Usuario liviano construido sólo con los claims del token
+    (id, username, rol, is_superuser). No toca la base de datos.
+    """
+    @cached_property
+    def rol(self):
+        return self.token.get(CLAIM_ROL, "") or ""
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Autenticación JWT sin consulta del Usuario por request:
+    - Valida firma/expiración y revisa la lista de revocación cacheada.
+    - Si el token trae el claim 'rol', arma un UsuarioToken a partir de los claims.
+    - Tokens antiguos (sin 'rol') siguen funcionando con la carga clásica desde BD.
+    """
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if token_revocado(validated_token):
+            raise InvalidToken("El token fue revocado.")
+        return validated_token
+
+    def get_user(self, validated_token):
+        if CLAIM_ROL not in validated_token:
+            return JWTAuthentication.get_user(self, validated_token)
+        return super().get_user(validated_token)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenRevocado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(blank=True, max_length=255, null=True, unique=True, verbose_name='JTI')),
+                ('usuario_id', models.BigIntegerField(db_index=True, verbose_name='ID usuario')),
+                ('revocado_en', models.DateTimeField(auto_now_add=True, verbose_name='Revocado en')),
+                ('expira_en', models.DateTimeField(db_index=True, verbose_name='Expira en')),
+                ('motivo', models.CharField(blank=True, max_length=60, verbose_name='Motivo')),
+            ],
+            options={
+                'verbose_name': 'Token revocado',
+                'verbose_name_plural': 'Tokens revocados',
+            },
+        ),
+    ]
@@ -1,3 +1,24 @@
 from django.db import models
 
-# Create your models here.
+
+class TokenRevocado(models.Model):
+    """
+    Lista de revocación de tokens JWT.
+    - Con jti: revoca un token puntual (logout de un cliente).
+    - Sin jti: revoca todos los tokens del usuario emitidos antes de 'revocado_en'
+      (desactivación, bloqueo, cambio de rol, reinicio de clave).
+    Las filas vencidas (expira_en) ya no aportan nada y se pueden purgar.
+    """
+    jti = models.CharField("JTI", max_length=255, blank=True, null=True, unique=True)
+    usuario_id = models.BigIntegerField("ID usuario", db_index=True)
+    revocado_en = models.DateTimeField("Revocado en", auto_now_add=True)
+    expira_en = models.DateTimeField("Expira en", db_index=True)
+    motivo = models.CharField("Motivo", max_length=60, blank=True)
+
+    class Meta:
+        verbose_name = "Token revocado"
+        verbose_name_plural = "Tokens revocados"
+
+    def __str__(self):
+        objetivo = self.jti or "todos"
+        return f"usuario={self.usuario_id} jti={objetivo}"
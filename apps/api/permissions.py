@@ -6,6 +6,8 @@ class IsAdminRole(BasePermission):
     """
     Permite acceso solo a usuarios autenticados con rol ADMIN
     o súperusuario.
+    Funciona igual con el Usuario de BD (sesión) o con el UsuarioToken
+    armado desde los claims del JWT (sin consultas).
     """
     def has_permission(self, request, view):
         user = request.user
@@ -16,8 +18,5 @@ class IsAdminRole(BasePermission):
         if user.is_superuser:
             return True
 
-        # Si tiene rol ADMIN (de tu modelo)
-        try:
-            return user.rol == Usuario.Roles.ADMIN
-        except AttributeError:
-            return False
+        # Si tiene rol ADMIN (de tu modelo o del claim 'rol')
+        return getattr(user, "rol", None) == Usuario.Roles.ADMIN
@@ -3,7 +3,7 @@ from rest_framework import serializers
 from apps.users.models import Usuario
 from apps.products.models import Producto
 from apps.suppliers.models import Proveedor
-from apps.transactional.models import MovimientoInventario
+from apps.transactional.models import MovimientoArchivo, MovimientoInventario
 
 
 class UsuarioSerializer(serializers.ModelSerializer):
@@ -28,3 +28,19 @@ class MovimientoInventarioSerializer(serializers.ModelSerializer):
     class Meta:
         model = MovimientoInventario
         fields = "__all__"
+
+
+class MovimientoArchivoSerializer(serializers.ModelSerializer):
+    """Movimiento archivado con las mismas claves que MovimientoInventarioSerializer."""
+    producto = serializers.IntegerField(source="producto_id")
+    proveedor = serializers.IntegerField(source="proveedor_id", allow_null=True)
+    bodega_origen = serializers.IntegerField(source="bodega_origen_id", allow_null=True)
+    bodega_destino = serializers.IntegerField(source="bodega_destino_id", allow_null=True)
+    creado_por = serializers.IntegerField(source="creado_por_id", allow_null=True)
+
+    class Meta:
+        model = MovimientoArchivo
+        fields = (
+            "id", "tipo", "fecha", "cantidad", "lote", "serie", "fecha_vencimiento", "observacion",
+            "producto", "proveedor", "bodega_origen", "bodega_destino", "creado_por",
+        )
@@ -1,3 +1,79 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.users.models import Usuario
+
+from .models import TokenRevocado
+from .tokens import TokenConRolSerializer, revocar_token, token_revocado
+
+
+class RevocacionTokensTests(TestCase):
+    """Los JWT llevan el rol en sus claims: todo cambio de permisos los revoca."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user(
+            "admin", "admin@lilis.cl", "clave-segura-1", rol=Usuario.Roles.ADMIN,
+        )
+        cls.operador = Usuario.objects.create_user(
+            "operador", "operador@lilis.cl", "clave-segura-2", rol=Usuario.Roles.INVENTARIO,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.token = TokenConRolSerializer.get_token(self.operador)
+
+    def guardar(self, usuario, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            usuario.save(**kwargs)
+
+    def test_claims(self):
+        self.assertEqual(self.token["rol"], "INVENTARIO")
+        self.assertEqual(self.token["username"], "operador")
+        self.assertIs(self.token["is_superuser"], False)
+        self.assertFalse(token_revocado(self.token))
+
+    def test_cambio_de_rol_revoca(self):
+        self.operador.rol = Usuario.Roles.VENTAS
+        self.guardar(self.operador)
+        self.assertTrue(token_revocado(self.token))
+        self.assertTrue(token_revocado(self.token.access_token))
+
+    def test_cambio_de_estado_revoca(self):
+        self.operador.estado = Usuario.Estados.BLOQUEADO
+        self.guardar(self.operador, update_fields=["estado"])
+        self.assertTrue(token_revocado(self.token))
+
+    def test_cambios_sin_permisos_no_revocan(self):
+        self.operador.first_name = "Ana"
+        self.guardar(self.operador)
+        self.operador.intentos_fallidos_login = 3
+        self.guardar(self.operador, update_fields=["intentos_fallidos_login"])
+        self.assertFalse(TokenRevocado.objects.exists())
+        self.assertFalse(token_revocado(self.token))
+
+    def test_borrado_revoca(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.operador.delete()
+        self.assertTrue(token_revocado(self.token))
+
+    def test_revocar_un_token(self):
+        otro = TokenConRolSerializer.get_token(self.operador)
+        revocar_token(self.token, motivo="logout")
+        self.assertTrue(token_revocado(self.token))
+        self.assertFalse(token_revocado(otro))
+
+    def test_api_cambia_rol_y_el_token_anterior_deja_de_servir(self):
+        admin = APIClient()
+        admin.credentials(HTTP_AUTHORIZATION=f"Bearer {TokenConRolSerializer.get_token(self.admin).access_token}")
+        operador = APIClient()
+        operador.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token.access_token}")
+        self.assertEqual(operador.get("/api/").status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            respuesta = admin.patch(f"/api/usuarios/{self.operador.pk}/", {"rol": "VENTAS"}, format="json")
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(operador.get("/api/").status_code, 401)
+        self.assertEqual(admin.get("/api/").status_code, 200)
@@ -0,0 +1,130 @@
+# apps/api/tokens.py
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import TokenRevocado
+
+# Claims que viajan en el token para no tener que leer el Usuario en cada llamada.
+CLAIM_ROL = "rol"
+CLAIM_USERNAME = "username"
+CLAIM_SUPERUSER = "is_superuser"
+
+# La lista de revocación se cachea completa (es pequeña: sólo filas no vencidas).
+DENYLIST_CACHE_KEY = "api:tokens_revocados"
+DENYLIST_CACHE_TTL = 30  # segundos
+
+
+# ============================
+#   LISTA DE REVOCACIÓN
+# ============================
+def _cargar_denylist():
+    """
+    Devuelve {"jtis": set(...), "usuarios": {usuario_id: timestamp}} con
+    las revocaciones vigentes. Una sola consulta cada DENYLIST_CACHE_TTL.
+    """
+    data = cache.get(DENYLIST_CACHE_KEY)
+    if data is not None:
+        return data
+
+    jtis = set()
+    usuarios = {}
+    vigentes = TokenRevocado.objects.filter(expira_en__gt=timezone.now()).values_list(
+        "jti", "usuario_id", "revocado_en"
+    )
+    for jti, usuario_id, revocado_en in vigentes:
+        if jti:
+            jtis.add(jti)
+        else:
+            # El claim user_id viaja como texto en el token
+            clave = str(usuario_id)
+            usuarios[clave] = max(revocado_en.timestamp(), usuarios.get(clave, 0))
+
+    data = {"jtis": jtis, "usuarios": usuarios}
+    cache.set(DENYLIST_CACHE_KEY, data, DENYLIST_CACHE_TTL)
+    return data
+
+
+def token_revocado(token) -> bool:
+    """True si el token (access o refresh) fue revocado."""
+    data = _cargar_denylist()
+    if token.get(api_settings.JTI_CLAIM) in data["jtis"]:
+        return True
+
+    corte = data["usuarios"].get(str(token.get(api_settings.USER_ID_CLAIM)))
+    if corte is None:
+        return False
+    # Tokens emitidos antes de la revocación del usuario quedan inválidos
+    return (token.get("iat") or 0) <= corte
+
+
+def _expiracion_maxima():
+    # Ningún token emitido antes de ahora puede vivir más que un refresh token.
+    return timezone.now() + api_settings.REFRESH_TOKEN_LIFETIME
+
+
+def revocar_tokens_usuario(usuario_id, motivo=""):
+    """Invalida todos los tokens emitidos hasta ahora para el usuario."""
+    TokenRevocado.objects.create(
+        usuario_id=usuario_id,
+        expira_en=_expiracion_maxima(),
+        motivo=motivo[:60],
+    )
+    # Aprovechamos para mantener la lista pequeña
+    purgar_revocaciones_vencidas()
+    cache.delete(DENYLIST_CACHE_KEY)
+
+
+def revocar_token(token, motivo=""):
+    """Invalida un token puntual por su jti (hasta su propia expiración)."""
+    exp = token.get("exp")
+    expira_en = (
+        datetime.fromtimestamp(exp, tz=dt_timezone.utc) if exp else _expiracion_maxima()
+    )
+    TokenRevocado.objects.get_or_create(
+        jti=token[api_settings.JTI_CLAIM],
+        defaults={
+            "usuario_id": token.get(api_settings.USER_ID_CLAIM) or 0,
+            "expira_en": expira_en,
+            "motivo": motivo[:60],
+        },
+    )
+    cache.delete(DENYLIST_CACHE_KEY)
+
+
+def purgar_revocaciones_vencidas():
+    """Elimina revocaciones cuyo token ya expiró por sí mismo."""
+    borrados, _ = TokenRevocado.objects.filter(expira_en__lte=timezone.now()).delete()
+    if borrados:
+        cache.delete(DENYLIST_CACHE_KEY)
+    return borrados
+
+
+# ============================
+#   SERIALIZERS DE TOKEN
+# ============================
+class TokenConRolSerializer(TokenObtainPairSerializer):
+    """
+    Emite el par de tokens incluyendo rol, username e is_superuser,
+    para que la API pueda autorizar sin consultar la tabla de usuarios.
+    """
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[CLAIM_ROL] = getattr(user, "rol", "") or ""
+        token[CLAIM_USERNAME] = user.get_username()
+        token[CLAIM_SUPERUSER] = bool(user.is_superuser)
+        return token
+
+
+class TokenRefreshConDenylistSerializer(TokenRefreshSerializer):
+    """Rechaza refresh tokens revocados antes de emitir un nuevo access."""
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if token_revocado(refresh):
+            raise InvalidToken("El token fue revocado.")
+        return super().validate(attrs)
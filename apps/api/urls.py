@@ -5,12 +5,16 @@ urlpatterns = [
     # 🌐 API Root (para que /api/ ya no dé 404)
     path("", views.api_root, name="api_root"),
 
+    # Revocación de tokens JWT
+    path("token/revoke/", views.token_revoke, name="token_revoke"),
+
     # Usuarios
     path("usuarios/", views.usuarios_list_create, name="api_usuarios_list"),
     path("usuarios/<int:pk>/", views.usuarios_detail, name="api_usuarios_detail"),
 
     # Productos
     path("productos/", views.productos_list_create, name="api_productos_list"),
+    path("productos/bajo-stock/", views.productos_bajo_stock, name="api_productos_bajo_stock"),
     path("productos/<int:pk>/", views.productos_detail, name="api_productos_detail"),
 
     # Proveedores
@@ -21,6 +25,12 @@ urlpatterns = [
     path("transacciones/", views.transacciones_list_create, name="api_transacciones_list"),
     path("transacciones/<int:pk>/", views.transacciones_detail, name="api_transacciones_detail"),
 
+    # Auditoría (paginación por cursor)
+    path("auditoria/", views.auditoria_list, name="api_auditoria_list"),
+
     # Stock real por producto
+    path("stock/por-vencer/", views.stock_por_vencer, name="api_stock_por_vencer"),
+    path("stock/conteo/", views.stock_conteo, name="api_stock_conteo"),
     path("stock/<int:pk>/", views.stock_producto, name="api_stock_producto"),
+    path("stock/<int:pk>/historico/", views.stock_producto_historico, name="api_stock_producto_historico"),
 ]
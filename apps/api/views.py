@@ -5,16 +5,33 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import models   # necesario para SUM y aggregate
+from django.core.exceptions import ValidationError
+from datetime import datetime, time, timedelta
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware
 
 # PERMISSIONS
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from .permissions import IsAdminRole
 
+# JWT
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .tokens import revocar_token
+from apps.account.utils import buscar_eventos
+
 # MODELOS
 from apps.users.models import Usuario
 from apps.products.models import Producto
 from apps.suppliers.models import Proveedor
-from apps.transactional.models import MovimientoInventario as Movimiento
+from apps.transactional.archivo import tablas as tablas_archivo
+from apps.transactional.busqueda import parsear as parsear_busqueda, rango_fechas
+from apps.transactional.models import (
+    Bodega, MovimientoArchivo, MovimientoInventario as Movimiento, MovimientoVista, Stock, stock_en_fecha,
+)
+from apps.transactional.conteo import aplicar_conteo
+from apps.transactional.views import auditar_conteo, auditar_movimiento
 
 # SERIALIZERS
 from .serializers import (
@@ -22,6 +39,7 @@ from .serializers import (
     ProductoSerializer,
     ProveedorSerializer,
     MovimientoInventarioSerializer,
+    MovimientoArchivoSerializer,
 )
 
 # ============================
@@ -53,12 +71,19 @@ def api_root(request):
             },
             "transacciones": {
                 "listar / crear": base + "transacciones/",
+                "buscar": base + "transacciones/?q=sku:ABC tipo:salida desde:AAAA-MM-DD",
                 "detalle": base + "transacciones/<id>/",
             },
             "stock": base + "stock/<id>/",
+            "stock_historico": base + "stock/<id>/historico/?fecha=AAAA-MM-DD",
+            "stock_por_vencer": base + "stock/por-vencer/?dias=30",
+            "stock_conteo": base + "stock/conteo/",
+            "productos_bajo_stock": base + "productos/bajo-stock/",
+            "auditoria": base + "auditoria/",
             "auth": {
                 "token_obtain": request.build_absolute_uri("/api/token/"),
                 "token_refresh": request.build_absolute_uri("/api/token/refresh/"),
+                "token_revoke": request.build_absolute_uri("/api/token/revoke/"),
             },
             "documentación": {
                 "swagger": request.build_absolute_uri("/swagger/"),
@@ -68,6 +93,32 @@ def api_root(request):
     })
 
 
+# ============================
+#   REVOCAR TOKENS (logout API)
+# ============================
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def token_revoke(request):
+    """
+    Revoca el access token usado en la petición y, si se envía,
+    el refresh token: {"refresh": "<token>"}.
+    """
+    if request.auth is not None and hasattr(request.auth, "get"):
+        revocar_token(request.auth, motivo="logout")
+
+    raw_refresh = request.data.get("refresh")
+    if raw_refresh:
+        try:
+            refresh = RefreshToken(raw_refresh)
+        except TokenError:
+            return Response({"detail": "Refresh token inválido."}, status=400)
+        if str(refresh.get(jwt_settings.USER_ID_CLAIM)) != str(request.user.pk):
+            return Response({"detail": "El refresh token no pertenece al usuario."}, status=403)
+        revocar_token(refresh, motivo="logout")
+
+    return Response(status=204)
+
+
 # ============================
 #   USUARIOS
 # ============================
@@ -206,16 +257,40 @@ def proveedores_detail(request, pk):
 @api_view(["GET", "POST"])
 @permission_classes([IsAdminRole])
 def transacciones_list_create(request):
+    """
+    GET ?q= usa el mismo lenguaje de búsqueda que el listado web
+    (sku:, tipo:, bodega:, desde:, hasta:, lote:, id:, ...; ver
+    apps/transactional/busqueda.py), resuelto sobre MovimientoVista.
+    Si desde:/hasta: llegan al archivo, se agregan los movimientos
+    archivados (mismas claves) después de los activos.
+    """
     if request.method == "GET":
         movs = Movimiento.objects.all()
+        archivados = []
+        q = (request.GET.get("q") or "").strip()
+        if q:
+            expr, errores = parsear_busqueda(q)
+            if errores:
+                return Response({"detail": f"Términos de búsqueda inválidos: {', '.join(errores)}."}, status=400)
+            activa, archivo = tablas_archivo(*rango_fechas(q))
+            if activa:
+                movs = movs.filter(pk__in=MovimientoVista.objects.filter(expr).values("pk")).order_by("-id")
+            else:
+                movs = movs.none()
+            if archivo:
+                archivados = MovimientoArchivoSerializer(
+                    MovimientoArchivo.objects.filter(expr).order_by("-id"), many=True
+                ).data
         serializer = MovimientoInventarioSerializer(movs, many=True)
-        return Response(serializer.data)
+        return Response(serializer.data + archivados)
 
     if request.method == "POST":
         serializer = MovimientoInventarioSerializer(data=request.data)
         if serializer.is_valid():
-            instance = serializer.save(creado_por=request.user)
+            # request.user puede ser un UsuarioToken (claims), no una instancia de BD
+            instance = serializer.save(creado_por_id=request.user.pk)
             instance.aplicar_a_stock()
+            auditar_movimiento(request.user, instance)
             return Response(MovimientoInventarioSerializer(instance).data, status=201)
         return Response(serializer.errors, status=400)
 
@@ -245,6 +320,49 @@ def transacciones_detail(request, pk):
         return Response(status=204)
 
 
+# ============================
+#   AUDITORÍA (cursor)
+# ============================
+@api_view(["GET"])
+@permission_classes([IsAdminRole])
+def auditoria_list(request):
+    """
+    GET /api/auditoria/?usuario=&accion=&objeto_tipo=&objeto_id=
+                       &desde=ISO&hasta=ISO&cursor=&limite=
+    Paginación por cursor: usar 'siguiente' como cursor de la próxima página.
+    """
+    desde = parse_datetime(request.GET.get("desde") or "")
+    hasta = parse_datetime(request.GET.get("hasta") or "")
+    try:
+        limite = max(1, min(int(request.GET.get("limite") or 50), 500))
+    except ValueError:
+        limite = 50
+
+    eventos, siguiente = buscar_eventos(
+        usuario=(request.GET.get("usuario") or "").strip(),
+        accion=(request.GET.get("accion") or "").strip().upper(),
+        objeto_tipo=(request.GET.get("objeto_tipo") or "").strip(),
+        objeto_id=(request.GET.get("objeto_id") or "").strip(),
+        desde=make_aware(desde) if desde and is_naive(desde) else desde,
+        hasta=make_aware(hasta) if hasta and is_naive(hasta) else hasta,
+        cursor=request.GET.get("cursor"),
+        limite=limite,
+    )
+    return Response({
+        "results": [{
+            "id": e.id,
+            "fecha": e.fecha.isoformat(),
+            "usuario": e.usuario,
+            "accion": e.accion,
+            "objeto_tipo": e.objeto_tipo,
+            "objeto_id": e.objeto_id,
+            "objeto": e.objeto,
+            "detalle": e.detalle,
+        } for e in eventos],
+        "siguiente": siguiente,
+    })
+
+
 # ============================
 #   ENDPOINT: STOCK REAL
 # ============================
@@ -256,17 +374,19 @@ def stock_producto(request, pk):
     except Producto.DoesNotExist:
         return Response({"detail": "Producto no encontrado."}, status=404)
 
-    entradas = (
-        Movimiento.objects.filter(producto=producto, tipo="INGRESO")
-        .aggregate(total=models.Sum("cantidad"))["total"]
-        or 0
-    )
+    # Movimientos activos + archivados (el archivo conserva el producto_id)
+    def total(tipo):
+        return sum(
+            (
+                modelo.objects.filter(producto_id=producto.id, tipo=tipo)
+                .aggregate(total=models.Sum("cantidad"))["total"] or 0
+                for modelo in (Movimiento, MovimientoArchivo)
+            ),
+            0,
+        )
 
-    salidas = (
-        Movimiento.objects.filter(producto=producto, tipo="SALIDA")
-        .aggregate(total=models.Sum("cantidad"))["total"]
-        or 0
-    )
+    entradas = total("INGRESO")
+    salidas = total("SALIDA")
 
     stock_actual = entradas - salidas
 
@@ -275,3 +395,150 @@ def stock_producto(request, pk):
         "producto": producto.nombre,
         "stock": stock_actual
     })
+
+
+# ============================
+#   ENDPOINT: STOCK EN UNA FECHA
+# ============================
+@api_view(["GET"])
+@permission_classes([IsAdminRole])
+def stock_producto_historico(request, pk):
+    """
+    GET /api/stock/<pk>/historico/?fecha=AAAA-MM-DD[&bodega=<id>]
+    Stock al cierre del día indicado, por bodega (snapshot + kardex).
+    """
+    try:
+        producto = Producto.objects.get(pk=pk)
+    except Producto.DoesNotExist:
+        return Response({"detail": "Producto no encontrado."}, status=404)
+
+    fecha = parse_date(request.GET.get("fecha") or "")
+    if not fecha:
+        return Response({"detail": "Parámetro 'fecha' requerido (AAAA-MM-DD)."}, status=400)
+    # Cierre del día = inicio del día siguiente (hora local)
+    momento = make_aware(datetime.combine(fecha + timedelta(days=1), time.min)) - timedelta(microseconds=1)
+
+    bodegas = Bodega.objects.order_by("nombre")
+    if request.GET.get("bodega"):
+        bodegas = bodegas.filter(pk=request.GET["bodega"])
+
+    detalle = [
+        {"bodega_id": b.id, "bodega": b.nombre, "stock": stock_en_fecha(producto, b, momento)}
+        for b in bodegas
+    ]
+    return Response({
+        "producto_id": producto.id,
+        "producto": producto.nombre,
+        "fecha": fecha.isoformat(),
+        "bodegas": detalle,
+        "stock": sum((d["stock"] for d in detalle), 0),
+    })
+
+
+# ============================
+#   ENDPOINT: LOTES POR VENCER
+# ============================
+@api_view(["GET"])
+@permission_classes([IsAdminRole])
+def stock_por_vencer(request):
+    """GET /api/stock/por-vencer/?dias=30[&bodega=<id>] (incluye vencidos)."""
+    try:
+        dias = max(0, min(int(request.GET.get("dias") or 30), 365))
+    except ValueError:
+        return Response({"detail": "Parámetro 'dias' inválido."}, status=400)
+
+    qs = Stock.objects.por_vencer(dias).values(
+        "id", "fecha_vencimiento", "lote", "serie", "cantidad",
+        "bodega_id", "bodega__nombre", "producto_id", "producto__sku", "producto__nombre",
+    )
+    bodega = request.GET.get("bodega") or ""
+    if bodega.isascii() and bodega.isdigit():
+        qs = qs.filter(bodega_id=int(bodega))
+
+    return Response({
+        "dias": dias,
+        "results": [{
+            "stock_id": s["id"],
+            "fecha_vencimiento": s["fecha_vencimiento"],
+            "bodega_id": s["bodega_id"],
+            "bodega": s["bodega__nombre"],
+            "producto_id": s["producto_id"],
+            "sku": s["producto__sku"],
+            "producto": s["producto__nombre"],
+            "lote": s["lote"],
+            "serie": s["serie"],
+            "cantidad": s["cantidad"],
+        } for s in qs[:1000]],
+    })
+
+
+# ============================
+#   ENDPOINT: CONTEO FÍSICO
+# ============================
+@api_view(["POST"])
+@permission_classes([IsAdminRole])
+def stock_conteo(request):
+    """
+    POST /api/stock/conteo/
+    {"bodega": <id>, "observacion": "...", "lineas": [
+        {"producto": <id>, "lote": "...", "serie": "...", "fecha_vencimiento": "AAAA-MM-DD", "cantidad": "12.5"}, ...
+    ]}
+    Cada producto de 'lineas' queda con exactamente lo contado por lote en la
+    bodega (sus lotes no contados, en 0). Sólo se escriben las filas que
+    cambian; un AJUSTE por producto con diferencias (ver apps/transactional/conteo.py).
+    """
+    try:
+        bodega = Bodega.objects.get(pk=request.data.get("bodega"))
+    except (Bodega.DoesNotExist, ValueError, TypeError):
+        return Response({"detail": "Bodega no encontrada."}, status=404)
+
+    lineas = request.data.get("lineas")
+    if not isinstance(lineas, list) or not lineas:
+        return Response({"detail": "'lineas' debe ser una lista no vacía."}, status=400)
+
+    try:
+        resultado = aplicar_conteo(
+            bodega, lineas, usuario=request.user, observacion=request.data.get("observacion") or "",
+        )
+    except ValidationError as e:
+        return Response({"detail": e.messages}, status=400)
+
+    auditar_conteo(request.user, bodega, resultado)
+    return Response({"bodega_id": bodega.id, **resultado})
+
+
+# ============================
+#   ENDPOINT: PRODUCTOS BAJO STOCK
+# ============================
+@api_view(["GET"])
+@permission_classes([IsAdminRole])
+def productos_bajo_stock(request):
+    """
+    GET /api/productos/bajo-stock/[?categoria=<id>&incluir_inactivos=1]
+    Productos con umbral COALESCE(punto_reorden, stock_minimo) > 0 y stock
+    total <= umbral (Producto.objects.bajo_stock()), en una sola consulta
+    agrupada. Por defecto sólo activos.
+    """
+    qs = Producto.objects.bajo_stock()
+    if request.GET.get("incluir_inactivos") not in {"1", "true"}:
+        qs = qs.filter(activo=True)
+    categoria = request.GET.get("categoria") or ""
+    if categoria.isascii() and categoria.isdigit():
+        qs = qs.filter(categoria_id=int(categoria))
+
+    filas = qs.values(
+        "id", "sku", "nombre", "categoria__nombre", "stock_total", "umbral_stock",
+        "stock_minimo", "punto_reorden",
+    ).order_by("sku")
+    results = [{
+        "producto_id": p["id"],
+        "sku": p["sku"],
+        "producto": p["nombre"],
+        "categoria": p["categoria__nombre"],
+        "stock": p["stock_total"],
+        "umbral": p["umbral_stock"],
+        "stock_minimo": p["stock_minimo"],
+        "punto_reorden": p["punto_reorden"],
+        "faltante": p["umbral_stock"] - p["stock_total"],
+    } for p in filas]
+    return Response({"count": len(results), "results": results})
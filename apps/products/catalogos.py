@@ -0,0 +1,39 @@
+# apps/products/catalogos.py
+"""
+Catálogos chicos que se repiten en cada render del listado de productos
+(categorías y bodegas para los <select> de los modales).
+
+Se cachean como listas de {"id", "nombre"} y se invalidan desde el
+save()/delete() de Categoria y Bodega. Los modelos se resuelven con
+apps.get_model para que este módulo pueda importarse desde models.py.
+"""
+from django.apps import apps
+from django.core.cache import cache
+
+CACHE_TTL = 10 * 60  # segundos
+_KEY_CATEGORIAS = "products:catalogos:categorias"
+_KEY_BODEGAS = "products:catalogos:bodegas"
+
+
+def _lista(key, app_label, modelo):
+    data = cache.get(key)
+    if data is None:
+        try:
+            Modelo = apps.get_model(app_label, modelo)
+        except LookupError:
+            return []
+        data = list(Modelo.objects.order_by("nombre").values("id", "nombre"))
+        cache.set(key, data, CACHE_TTL)
+    return data
+
+
+def categorias():
+    return _lista(_KEY_CATEGORIAS, "products", "Categoria")
+
+
+def bodegas():
+    return _lista(_KEY_BODEGAS, "transactional", "Bodega")
+
+
+def invalidar_catalogos():
+    cache.delete_many([_KEY_CATEGORIAS, _KEY_BODEGAS])
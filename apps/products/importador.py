@@ -0,0 +1,378 @@
+# apps/products/importador.py
+"""
+Importación masiva del catálogo de productos (CSV o XLSX).
+
+- XLSX con openpyxl en modo read_only (no carga el libro completo en memoria).
+- Validación en lote: formato SKU/EAN (valida_sku / valida_ean), números,
+  UoM, reglas de Producto (precio >= costo, IVA 0-25, máx >= mín,
+  reorden >= mín) y duplicados dentro del archivo.
+- Categorías resueltas desde un único mapa nombre -> id.
+- Upsert por SKU con bulk_create(update_conflicts=True), por bloques y
+  cada bloque en su transacción.
+- Devuelve un reporte con los errores por fila (las filas válidas se importan).
+"""
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.validators import DecimalValidator
+from django.db import IntegrityError, connection, transaction
+
+from .models import Categoria, Producto, valida_ean, valida_sku
+
+# Excel opcional
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    load_workbook = None
+
+BLOQUE = 1000
+MAX_ERRORES = 1000
+
+# Encabezado del archivo -> campo del modelo
+ALIAS = {
+    "sku": "sku",
+    "codigo": "sku",
+    "nombre": "nombre",
+    "descripcion": "descripcion",
+    "descripción": "descripcion",
+    "categoria": "categoria",
+    "categoría": "categoria",
+    "ean": "ean_upc",
+    "ean_upc": "ean_upc",
+    "ean/upc": "ean_upc",
+    "marca": "marca",
+    "modelo": "modelo",
+    "uom_compra": "uom_compra",
+    "uom_venta": "uom_venta",
+    "factor_conversion": "factor_conversion",
+    "costo": "costo_estandar",
+    "costo_estandar": "costo_estandar",
+    "precio_compra": "costo_estandar",
+    "precio": "precio_venta",
+    "precio_venta": "precio_venta",
+    "iva": "impuesto_iva",
+    "impuesto_iva": "impuesto_iva",
+    "stock_minimo": "stock_minimo",
+    "stock_maximo": "stock_maximo",
+    "punto_reorden": "punto_reorden",
+    "perecible": "perecible",
+    "control_por_lote": "control_por_lote",
+    "control_por_serie": "control_por_serie",
+    "activo": "activo",
+}
+
+DECIMALES = {
+    "factor_conversion", "costo_estandar", "precio_venta", "impuesto_iva",
+    "stock_minimo", "stock_maximo", "punto_reorden",
+}
+BOOLEANOS = {"perecible", "control_por_lote", "control_por_serie", "activo"}
+TEXTOS = {"nombre", "descripcion", "marca", "modelo"}
+UOMS = {codigo for codigo, _ in Producto.UOMS}
+VERDADEROS = {"1", "si", "sí", "s", "true", "verdadero", "x", "y", "yes"}
+FALSOS = {"0", "no", "n", "false", "falso", ""}
+
+
+class ErrorImportacion(Exception):
+    """El archivo completo no se puede leer (formato, encabezados, dependencias)."""
+
+
+# ================================================================
+# LECTURA
+# ================================================================
+
+def _normalizar_encabezado(valor):
+    return str(valor or "").strip().lower().replace(" ", "_")
+
+
+def _mapear_encabezados(encabezados, alias, obligatorias):
+    columnas = [alias.get(_normalizar_encabezado(h)) for h in encabezados]
+    faltan = set(obligatorias) - set(columnas)
+    if faltan:
+        raise ErrorImportacion(f"Faltan columnas obligatorias: {', '.join(sorted(faltan))}.")
+    return columnas
+
+
+def _filas_csv(archivo):
+    texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+    muestra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+    except csv.Error:
+        dialecto = csv.excel
+    yield from csv.reader(texto, dialecto)
+
+
+def _filas_xlsx(archivo):
+    if load_workbook is None:
+        raise ErrorImportacion("Falta dependencia: pip install openpyxl")
+    wb = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        yield from wb.worksheets[0].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def leer_archivo(archivo, nombre, alias=ALIAS, obligatorias=("sku", "nombre", "categoria")):
+    """
+    Itera (numero_fila, dict campo -> valor) de un CSV o XLSX.
+    numero_fila es la fila del archivo (la 1 es el encabezado).
+    alias: encabezado normalizado -> campo; las columnas sin alias se ignoran.
+    """
+    nombre = (nombre or "").lower()
+    if nombre.endswith(".xlsx"):
+        filas = _filas_xlsx(archivo)
+    elif nombre.endswith(".csv") or nombre.endswith(".txt"):
+        filas = _filas_csv(archivo)
+    else:
+        raise ErrorImportacion("Formato no soportado (use .csv o .xlsx).")
+
+    try:
+        encabezados = next(filas)
+    except StopIteration:
+        raise ErrorImportacion("El archivo está vacío.")
+    columnas = _mapear_encabezados(encabezados, alias, obligatorias)
+
+    for numero, valores in enumerate(filas, start=2):
+        if not valores or all(v in (None, "") for v in valores):
+            continue
+        # Filas cortas: las columnas que faltan llegan vacías, no se omiten
+        valores = list(valores) + [None] * (len(columnas) - len(valores))
+        yield numero, {
+            campo: valor
+            for campo, valor in zip(columnas, valores)
+            if campo is not None
+        }
+
+
+# ================================================================
+# VALIDACIÓN DE UNA FILA
+# ================================================================
+
+def a_texto(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)  # EAN leído como número desde Excel
+    return str(valor).strip()
+
+
+def a_decimal(valor, campo, columna=None):
+    """
+    Texto/número de una celda -> Decimal (None si está vacía).
+    columna: DecimalField del modelo destino; si se indica, el valor debe
+    caber en su max_digits / decimal_places.
+    """
+    texto = a_texto(valor).replace(",", ".")
+    if not texto:
+        return None
+    try:
+        numero = Decimal(texto)
+    except InvalidOperation:
+        raise ValidationError(f"{campo}: número inválido ({texto}).")
+    if not numero.is_finite():
+        raise ValidationError(f"{campo}: número inválido ({texto}).")
+    if numero < 0:
+        raise ValidationError(f"{campo}: no puede ser negativo.")
+    if columna is not None:
+        # Sin los ceros a la derecha, que no cambian el valor
+        # ("10.000" en un precio con 2 decimales)
+        try:
+            DecimalValidator(columna.max_digits, columna.decimal_places)(numero.normalize())
+        except ValidationError as e:
+            raise ValidationError(f"{campo}: {e.messages[0]} ({texto})")
+    return numero
+
+
+def a_booleano(valor, campo):
+    if isinstance(valor, bool):
+        return valor
+    texto = a_texto(valor).lower()
+    if texto in VERDADEROS:
+        return True
+    if texto in FALSOS:
+        return False
+    raise ValidationError(f"{campo}: valor booleano inválido ({texto}).")
+
+
+def _limpiar_fila(datos, categorias):
+    """dict crudo -> dict de campos del modelo; lanza ValidationError con el motivo."""
+    limpio = {}
+    errores = []
+
+    sku = a_texto(datos.get("sku")).upper()
+    try:
+        valida_sku(sku)
+    except ValidationError as e:
+        errores.append(f"sku: {e.messages[0]}")
+    limpio["sku"] = sku
+
+    for campo in TEXTOS & datos.keys():
+        limpio[campo] = a_texto(datos[campo])
+        largo = Producto._meta.get_field(campo).max_length
+        if largo and len(limpio[campo]) > largo:
+            errores.append(f"{campo}: máximo {largo} caracteres.")
+    if not limpio.get("nombre"):
+        errores.append("nombre: obligatorio.")
+
+    nombre_cat = a_texto(datos.get("categoria"))
+    categoria_id = categorias.get(nombre_cat.lower())
+    if categoria_id is None:
+        errores.append(f"categoria: no existe ({nombre_cat or 'vacía'}).")
+    limpio["categoria_id"] = categoria_id
+
+    if "ean_upc" in datos:
+        ean = a_texto(datos["ean_upc"])
+        if ean:
+            try:
+                valida_ean(ean)
+            except ValidationError as e:
+                errores.append(f"ean_upc: {e.messages[0]}")
+        limpio["ean_upc"] = ean or None
+
+    for campo in ("uom_compra", "uom_venta"):
+        if campo in datos:
+            uom = a_texto(datos[campo]).upper() or "UN"
+            if uom not in UOMS:
+                errores.append(f"{campo}: UoM inválida ({uom}).")
+            limpio[campo] = uom
+
+    for campo in DECIMALES & datos.keys():
+        try:
+            limpio[campo] = a_decimal(datos[campo], campo, Producto._meta.get_field(campo))
+        except ValidationError as e:
+            errores.append(e.messages[0])
+    for campo in BOOLEANOS & datos.keys():
+        try:
+            limpio[campo] = a_booleano(datos[campo], campo)
+        except ValidationError as e:
+            errores.append(e.messages[0])
+
+    # Mismas reglas que los CheckConstraint de Producto
+    if "stock_minimo" in limpio and limpio["stock_minimo"] is None:
+        limpio["stock_minimo"] = Decimal("0")
+    if "impuesto_iva" in limpio and limpio["impuesto_iva"] is None:
+        limpio["impuesto_iva"] = Decimal("19")
+    if "factor_conversion" in limpio and not limpio["factor_conversion"]:
+        limpio["factor_conversion"] = Decimal("1")
+    minimo = limpio.get("stock_minimo") or Decimal("0")
+    costo, precio = limpio.get("costo_estandar"), limpio.get("precio_venta")
+    if costo is not None and precio is not None and precio < costo:
+        errores.append("precio_venta: no puede ser menor que el costo estándar.")
+    if limpio.get("impuesto_iva") is not None and limpio["impuesto_iva"] > 25:
+        errores.append("impuesto_iva: debe estar entre 0 y 25.")
+    if limpio.get("stock_maximo") is not None and limpio["stock_maximo"] < minimo:
+        errores.append("stock_maximo: debe ser mayor o igual al stock mínimo.")
+    if limpio.get("punto_reorden") is not None and limpio["punto_reorden"] < minimo:
+        errores.append("punto_reorden: debe ser mayor o igual al stock mínimo.")
+
+    if errores:
+        raise ValidationError(errores)
+    return limpio
+
+
+# ================================================================
+# IMPORTACIÓN
+# ================================================================
+
+def _guardar_bloque(bloque, resultado, simular):
+    """Valida contra la BD (EAN de otro SKU) y hace el upsert del bloque."""
+    skus = [limpio["sku"] for _, limpio in bloque]
+    existentes = set(Producto.objects.filter(sku__in=skus).values_list("sku", flat=True))
+
+    # ON DUPLICATE KEY UPDATE (MySQL) también salta con el EAN único:
+    # un EAN que ya es de otro SKU se rechaza antes del upsert.
+    eans = [limpio["ean_upc"] for _, limpio in bloque if limpio.get("ean_upc")]
+    duenos_ean = dict(Producto.objects.filter(ean_upc__in=eans).values_list("ean_upc", "sku"))
+
+    objetos = []
+    campos = set()
+    for numero, limpio in bloque:
+        ean = limpio.get("ean_upc")
+        if ean and duenos_ean.get(ean, limpio["sku"]) != limpio["sku"]:
+            _error(resultado, numero, limpio["sku"], f"ean_upc: ya registrado en {duenos_ean[ean]}.")
+            continue
+        objetos.append(Producto(**limpio))
+        campos.update(limpio)
+        if limpio["sku"] in existentes:
+            resultado["actualizados"] += 1
+        else:
+            resultado["creados"] += 1
+
+    if simular or not objetos:
+        return
+
+    campos.discard("sku")
+    kwargs = {"update_conflicts": True, "update_fields": sorted(campos) + ["actualizado_en"]}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = ["sku"]
+    try:
+        with transaction.atomic():
+            Producto.objects.bulk_create(objetos, batch_size=BLOQUE, **kwargs)
+    except IntegrityError:
+        # Un CheckConstraint puede fallar al combinar la fila con lo que ya
+        # hay en la BD (p. ej. sólo se actualiza el precio y queda bajo el
+        # costo). Se reintenta fila a fila para aislar y reportar la culpable.
+        filas = {limpio["sku"]: numero for numero, limpio in bloque}
+        for obj in objetos:
+            try:
+                with transaction.atomic():
+                    Producto.objects.bulk_create([obj], **kwargs)
+            except IntegrityError as e:
+                if obj.sku in existentes:
+                    resultado["actualizados"] -= 1
+                else:
+                    resultado["creados"] -= 1
+                _error(resultado, filas[obj.sku], obj.sku, f"Rechazado por la base de datos: {e}")
+
+
+def _error(resultado, numero, sku, mensaje):
+    resultado["con_error"] += 1
+    if len(resultado["errores"]) < MAX_ERRORES:
+        resultado["errores"].append({"fila": numero, "sku": sku, "error": mensaje})
+
+
+def importar_productos(archivo, nombre, simular=False, bloque=BLOQUE):
+    """
+    Importa el archivo y devuelve:
+      {"filas", "creados", "actualizados", "con_error", "errores": [{fila, sku, error}]}
+    Con simular=True sólo valida (no escribe).
+    Lanza ErrorImportacion si el archivo completo es ilegible.
+    """
+    categorias = {
+        n.lower(): pk for pk, n in Categoria.objects.values_list("id", "nombre")
+    }
+    resultado = {"filas": 0, "creados": 0, "actualizados": 0, "con_error": 0, "errores": []}
+    vistos = {}
+    eans_vistos = {}
+    pendiente = []
+
+    for numero, datos in leer_archivo(archivo, nombre):
+        resultado["filas"] += 1
+        try:
+            limpio = _limpiar_fila(datos, categorias)
+        except ValidationError as e:
+            _error(resultado, numero, a_texto(datos.get("sku")).upper(), " | ".join(e.messages))
+            continue
+
+        if limpio["sku"] in vistos:
+            _error(resultado, numero, limpio["sku"], f"sku: repetido en el archivo (fila {vistos[limpio['sku']]}).")
+            continue
+        ean = limpio.get("ean_upc")
+        if ean and ean in eans_vistos:
+            _error(resultado, numero, limpio["sku"], f"ean_upc: repetido en el archivo (fila {eans_vistos[ean]}).")
+            continue
+        vistos[limpio["sku"]] = numero
+        if ean:
+            eans_vistos[ean] = numero
+
+        pendiente.append((numero, limpio))
+        if len(pendiente) >= bloque:
+            _guardar_bloque(pendiente, resultado, simular)
+            pendiente = []
+
+    if pendiente:
+        _guardar_bloque(pendiente, resultado, simular)
+    return resultado
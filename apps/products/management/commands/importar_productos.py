@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.account.utils import registrar_auditoria
+from apps.products.importador import BLOQUE, ErrorImportacion, importar_productos
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa/actualiza productos desde un CSV o XLSX (upsert por SKU). "
+        "Columnas obligatorias: sku, nombre, categoria."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivo", help="Ruta al archivo .csv o .xlsx.")
+        parser.add_argument("--simular", action="store_true",
+                            help="Sólo valida y reporta; no escribe en la base de datos.")
+        parser.add_argument("--bloque", type=int, default=BLOQUE,
+                            help=f"Filas por bloque/transacción (default {BLOQUE}).")
+
+    def handle(self, *args, **opts):
+        try:
+            with open(opts["archivo"], "rb") as fh:
+                r = importar_productos(fh, opts["archivo"], simular=opts["simular"], bloque=opts["bloque"])
+        except OSError as e:
+            raise CommandError(f"No se pudo abrir el archivo: {e}")
+        except ErrorImportacion as e:
+            raise CommandError(str(e))
+
+        for err in r["errores"]:
+            self.stdout.write(self.style.WARNING(f"Fila {err['fila']} [{err['sku']}]: {err['error']}"))
+        if r["con_error"] > len(r["errores"]):
+            self.stdout.write(f"... y {r['con_error'] - len(r['errores'])} errores más.")
+
+        if not opts["simular"]:
+            registrar_auditoria("sistema", "IMPORT", f"Productos archivo={opts['archivo']}",
+                                objeto_tipo="Producto", creados=r["creados"],
+                                actualizados=r["actualizados"], con_error=r["con_error"])
+        prefijo = "Simulación" if opts["simular"] else "Importación"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefijo}: {r['filas']} filas, {r['creados']} nuevos, "
+            f"{r['actualizados']} actualizados, {r['con_error']} con error."
+        ))
@@ -1,6 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from django.core.exceptions import ValidationError
+from django.db.models.functions import Coalesce
+
+from .catalogos import invalidar_catalogos
 
 valida_sku = RegexValidator(r'^[A-Z0-9\-_.]{3,50}$', "SKU inválido (usa A-Z, 0-9, -, _, .)")
 valida_ean = RegexValidator(r'^\d{8}(\d{4,6})?$', "EAN/UPC debe ser 8/12/13/14 dígitos")
@@ -18,6 +21,72 @@ class Categoria(models.Model):
     def __str__(self):
         return self.nombre
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        transaction.on_commit(invalidar_catalogos)
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        transaction.on_commit(invalidar_catalogos)
+        return resultado
+
+
+STOCK_DEC = models.DecimalField(max_digits=14, decimal_places=3)
+
+
+# Producto en alerta de stock: tiene umbral (> 0) y su stock total no lo supera
+_EN_ALERTA = models.Q(umbral_stock__gt=0, stock_total__lte=models.F("umbral_stock"))
+
+
+class ProductoQuerySet(models.QuerySet):
+    """
+    Stock total y alerta de bajo stock para todo el catálogo en una sola
+    consulta agrupada (JOIN + SUM sobre related_name='stocks'), en vez de
+    un aggregate por producto.
+
+    Con subconsulta=True el total sale de un SUM correlacionado en vez del
+    JOIN + GROUP BY: la consulta no queda agrupada y admite funciones de
+    ventana (p. ej. COUNT(*) OVER () en el listado de productos).
+    """
+
+    def con_stock_total(self, subconsulta=False):
+        if "stock_total" in self.query.annotations:
+            return self
+        if subconsulta:
+            Stock = self.model._meta.get_field("stocks").related_model
+            suma = models.Subquery(
+                Stock.objects.filter(producto=models.OuterRef("pk"))
+                .order_by()
+                .values("producto")
+                .annotate(total=models.Sum("cantidad"))
+                .values("total"),
+                output_field=STOCK_DEC,
+            )
+        else:
+            suma = models.Sum("stocks__cantidad", output_field=STOCK_DEC)
+        return self.annotate(
+            stock_total=Coalesce(suma, models.Value(0, output_field=STOCK_DEC), output_field=STOCK_DEC)
+        )
+
+    def con_alerta_stock(self, subconsulta=False):
+        """
+        Anota stock_total, umbral_stock = COALESCE(punto_reorden, stock_minimo)
+        y alerta_stock = umbral_stock > 0 y stock_total <= umbral_stock (sin
+        umbral definido no hay alerta).
+        """
+        return self.con_stock_total(subconsulta).annotate(
+            umbral_stock=Coalesce("punto_reorden", "stock_minimo", output_field=STOCK_DEC),
+            alerta_stock=models.ExpressionWrapper(
+                _EN_ALERTA,
+                output_field=models.BooleanField(),
+            ),
+        )
+
+    def bajo_stock(self):
+        """Sólo los productos en o bajo su umbral (> 0): listado web, API y KPIs."""
+        qs = self if "umbral_stock" in self.query.annotations else self.con_alerta_stock()
+        return qs.filter(_EN_ALERTA)
+
 
 class Producto(models.Model):
     UOMS = (
@@ -67,6 +136,8 @@ class Producto(models.Model):
     creado_en = models.DateTimeField("Creado en", auto_now_add=True)
     actualizado_en = models.DateTimeField("Actualizado en", auto_now=True)
 
+    objects = ProductoQuerySet.as_manager()
+
     class Meta:
         ordering = ["nombre"]
         verbose_name = "Producto"
@@ -125,9 +196,12 @@ class Producto(models.Model):
 
     @property
     def alerta_bajo_stock(self):
-        from transactional.models import Stock
+        # Si viene de Producto.objects.con_alerta_stock() no se consulta nada
+        if hasattr(self, "alerta_stock"):
+            return self.alerta_stock
+        from apps.transactional.models import Stock
         total = (Stock.objects
                  .filter(producto=self)
                  .aggregate(models.Sum("cantidad"))["cantidad__sum"] or 0)
-        umbral = self.punto_reorden or self.stock_minimo or 0
-        return total <= umbral
+        umbral = self.punto_reorden if self.punto_reorden is not None else self.stock_minimo
+        return bool(umbral) and umbral > 0 and total <= umbral
@@ -1,3 +1,77 @@
+import io
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from .importador import ErrorImportacion, importar_productos
+from .models import Categoria, Producto
+
+
+def _csv(texto):
+    return io.BytesIO(texto.encode("utf-8"))
+
+
+class ImportadorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = Categoria.objects.create(nombre="Dulces")
+
+    def test_crea_y_actualiza_por_sku(self):
+        resultado = importar_productos(_csv(
+            "SKU;Nombre;Categoría;Costo;Precio\n"
+            "cho-1;Chocolate;dulces;100;150\n"
+            "CAR-1;Caramelo;Dulces;10,5;20\n"
+        ), "catalogo.csv")
+        self.assertEqual((resultado["creados"], resultado["actualizados"], resultado["con_error"]), (2, 0, 0))
+
+        resultado = importar_productos(_csv(
+            "sku,nombre,categoria,precio\n"
+            "CHO-1,Chocolate amargo,Dulces,180\n"
+            "GOM-1,Gomita,Dulces,\n"
+        ), "catalogo.csv")
+        self.assertEqual((resultado["creados"], resultado["actualizados"], resultado["con_error"]), (1, 1, 0))
+
+        chocolate = Producto.objects.get(sku="CHO-1")
+        self.assertEqual(chocolate.nombre, "Chocolate amargo")
+        self.assertEqual(chocolate.precio_venta, Decimal("180"))
+        self.assertEqual(chocolate.costo_estandar, Decimal("100"))  # columna ausente: no se toca
+        self.assertEqual(Producto.objects.get(sku="CAR-1").costo_estandar, Decimal("10.5"))
+        self.assertEqual(Producto.objects.count(), 3)
+
+    def test_errores_por_fila(self):
+        resultado = importar_productos(_csv(
+            "sku,nombre,categoria,costo,precio,iva\n"
+            "OK-1,Bueno,Dulces,1,2,19\n"
+            "OK-1,Repetido,Dulces,1,2,19\n"
+            "X,Sku corto,Dulces,1,2,19\n"
+            "CAT-1,Sin categoría,Bebidas,1,2,19\n"
+            "BIG-1,Enorme,Dulces,1,1e15,19\n"
+            "DEC-1,Decimales,Dulces,1,2.345,19\n"
+            "NAN-1,No número,Dulces,NaN,2,19\n"
+            "BAJO-1,Bajo costo,Dulces,5,2,19\n"
+            "IVA-1,IVA alto,Dulces,1,2,30\n"
+        ), "catalogo.csv")
+
+        self.assertEqual((resultado["filas"], resultado["creados"], resultado["con_error"]), (9, 1, 8))
+        errores = {e["fila"]: e["error"] for e in resultado["errores"]}
+        self.assertIn("repetido en el archivo (fila 2)", errores[3])
+        self.assertTrue(errores[4].startswith("sku:"))
+        self.assertIn("categoria: no existe (Bebidas)", errores[5])
+        self.assertTrue(errores[6].startswith("precio_venta:"))
+        self.assertTrue(errores[7].startswith("precio_venta:"))
+        self.assertIn("costo_estandar: número inválido", errores[8])
+        self.assertIn("no puede ser menor que el costo", errores[9])
+        self.assertIn("impuesto_iva: debe estar entre 0 y 25", errores[10])
+        self.assertEqual(list(Producto.objects.values_list("sku", flat=True)), ["OK-1"])
+
+    def test_simular_no_escribe(self):
+        resultado = importar_productos(_csv("sku,nombre,categoria\nSIM-1,Simulado,Dulces\n"), "c.csv", simular=True)
+        self.assertEqual(resultado["creados"], 1)
+        self.assertFalse(Producto.objects.exists())
+
+    def test_archivo_ilegible(self):
+        with self.assertRaises(ErrorImportacion):
+            importar_productos(_csv("sku,nombre\nA-1,Sin categoría\n"), "c.csv")
+        with self.assertRaises(ErrorImportacion):
+            importar_productos(_csv(""), "c.pdf")
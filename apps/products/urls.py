@@ -7,6 +7,7 @@ urlpatterns = [
     path('', views.product_list_view, name='list'),
     path('search/', views.search_products, name='search'),
     path('crear/', views.crear_producto, name='crear'),
+    path('importar/', views.importar_productos_view, name='importar'),
     path('editar/<int:prod_id>/', views.editar_producto, name='editar'),
     path('eliminar/<int:prod_id>/', views.eliminar_producto, name='eliminar'),
 ]
\ No newline at end of file
@@ -4,19 +4,19 @@ import traceback
 from decimal import Decimal, InvalidOperation
 
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.db import transaction, models, IntegrityError
-from django.db.models import Q, CharField, DecimalField, Value
-from django.db.models.functions import Cast, Coalesce
+from django.db.models import Q, CharField
+from django.db.models.functions import Cast
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404
 from django.views.decorators.http import require_POST
 from django.forms.models import model_to_dict
-from django.core.exceptions import FieldError, ValidationError
-from django.apps import apps  # <- para cargar Bodega de forma segura
+from django.core.exceptions import ValidationError
 from django.db.models.deletion import ProtectedError, RestrictedError  # 👈 NUEVO
 
+from lilis_erp.pagination import pagina_con_total
 from lilis_erp.roles import require_roles
+from apps.account.utils import registrar_auditoria
 
 # Excel opcional
 try:
@@ -28,20 +28,21 @@ except ImportError:
 from .models import Producto as Product
 from .models import Categoria
 from .forms import ProductoForm
+from . import catalogos
+from .importador import ErrorImportacion, importar_productos
 
 
 # -------------------------- Constantes / helpers --------------------------
 
-ALLOWED_SORT_FIELDS = {
-    "id", "-id",
-    "sku", "-sku",
-    "nombre", "-nombre",
-    "categoria", "-categoria",
-    "stock", "-stock",
+# sort del query string -> campo de order_by (validado sin tocar la BD)
+SORT_FIELDS = {
+    "id": "id",
+    "sku": "sku",
+    "nombre": "nombre",
+    "categoria": "categoria__nombre",
+    "stock": "stock_total",
 }
-
-# Campo decimal único para todas las anotaciones de stock
-DEC = DecimalField(max_digits=14, decimal_places=3)
+ALLOWED_SORT_FIELDS = {f"{signo}{k}" for k in SORT_FIELDS for signo in ("", "-")}
 
 
 def _display_categoria(obj):
@@ -59,27 +60,26 @@ def _qs_to_dicts(qs):
             "nombre": p.nombre or "",
             "categoria": _display_categoria(p),
             "stock": int(st or 0),
+            "alerta": bool(getattr(p, "alerta_stock", False)),
         })
     return out
 
 
 def _base_queryset():
     """
-    - id_text para buscar por ID (icontains)
-    - stock_total por JOIN + SUM sobre related_name='stocks'
-    - Tipado como Decimal para evitar 'mixed types'
+    stock_total / alerta_stock como subconsulta correlacionada (sin GROUP BY),
+    así el listado puede traer el total con COUNT(*) OVER ()
+    (ver ProductoQuerySet.con_alerta_stock).
     """
-    return (
-        Product.objects.select_related("categoria")
-        .annotate(
-            id_text=Cast("id", output_field=CharField()),
-            stock_total=Coalesce(
-                models.Sum("stocks__cantidad", output_field=DEC),
-                Value(Decimal("0"), output_field=DEC),
-                output_field=DEC,
-            ),
-        )
-    )
+    return Product.objects.select_related("categoria").con_alerta_stock(subconsulta=True)
+
+
+def _filtrar_busqueda(qs, q: str):
+    """id_text (para buscar por ID con icontains) sólo se anota si hay búsqueda."""
+    q = (q or "").strip()
+    if not q:
+        return qs
+    return qs.annotate(id_text=Cast("id", output_field=CharField())).filter(_build_search_q(q))
 
 
 def _build_search_q(q: str):
@@ -102,6 +102,7 @@ def _apply_filters(qs, request):
     Filtros ligeros SIN romper nada de lo tuyo.
     - categoría: ?categoria=<id>  (o ?cat=<id>)
     - estado/activo: ?estado=activos | inactivos   (si el modelo tiene 'activo')
+    - bajo stock: ?alerta=1  (Producto.objects.bajo_stock(): el mismo criterio que la API y los KPIs)
     """
     cat = (request.GET.get("categoria") or request.GET.get("cat") or "").strip()
     if cat.isdigit():
@@ -111,6 +112,9 @@ def _apply_filters(qs, request):
     if estado in {"activos", "inactivos"} and hasattr(Product, "activo"):
         qs = qs.filter(activo=(estado == "activos"))
 
+    if (request.GET.get("alerta") or "").strip() in {"1", "true", "si"}:
+        qs = qs.bajo_stock()
+
     return qs
 
 
@@ -118,39 +122,8 @@ def _apply_sort(qs, sort_by: str):
     sort_by = (sort_by or "").strip()
     if sort_by not in ALLOWED_SORT_FIELDS:
         sort_by = "sku"
-
-    reverse = sort_by.startswith("-")
-    key = sort_by.lstrip("-")
-
-    sort_field = {
-        "categoria": "categoria__nombre",
-        "stock": "stock_total",
-    }.get(key, key)
-
-    try:
-        ordered = qs.order_by(f"-{sort_field}" if reverse else sort_field, "id")
-        list(ordered[:1])  # evalúa 1 fila para cazar errores
-        return ordered
-    except FieldError as e:
-        print("[productos] FieldError en order_by:", e)
-        traceback.print_exc()
-        try:
-            ordered = qs.order_by("-sku" if reverse else "sku", "id")
-            list(ordered[:1])
-            return ordered
-        except Exception as e2:
-            print("[productos] Fallback a sku también falló, usando id:", e2)
-            traceback.print_exc()
-            return qs.order_by("-id" if reverse else "id")
-
-
-def _load_bodegas_safe():
-    """Devuelve queryset de Bodega si existe; [] si no existe el modelo."""
-    try:
-        Bodega = apps.get_model("transactional", "Bodega")
-        return Bodega.objects.all() if Bodega is not None else []
-    except Exception:
-        return []
+    campo = SORT_FIELDS[sort_by.lstrip("-")]
+    return qs.order_by(f"-{campo}" if sort_by.startswith("-") else campo, "id")
 
 
 def _json_or_empty(request):
@@ -177,7 +150,7 @@ def _to_decimal_or_none(val):
 @require_roles("ADMIN", "INVENTARIO", "PRODUCCION", "VENTAS")
 def product_list_view(request):
     """
-    GET /productos/?q=...&sort=...&page=...&categoria=...&estado=...
+    GET /productos/?q=...&sort=...&page=...&categoria=...&estado=...&alerta=1
     Renderiza productos.html (compatible con AJAX).
     """
     query = (request.GET.get("q") or "").strip()
@@ -185,9 +158,7 @@ def product_list_view(request):
     export = (request.GET.get("export") or "").strip()
 
     try:
-        qs = _base_queryset()
-        if query:
-            qs = qs.filter(_build_search_q(query))
+        qs = _filtrar_busqueda(_base_queryset(), query)
         qs = _apply_filters(qs, request)  # <- aplica filtros si vienen
         qs = _apply_sort(qs, sort_by)
     except Exception as e:
@@ -202,9 +173,9 @@ def product_list_view(request):
         wb = Workbook()
         ws = wb.active
         ws.title = "Productos"
-        ws.append(["ID", "SKU", "Nombre", "Categoría", "Stock"])
+        ws.append(["ID", "SKU", "Nombre", "Categoría", "Stock", "Bajo stock"])
         for p in _qs_to_dicts(qs):
-            ws.append([p["id"], p["sku"], p["nombre"], p["categoria"], p["stock"]])
+            ws.append([p["id"], p["sku"], p["nombre"], p["categoria"], p["stock"], "Sí" if p["alerta"] else ""])
         resp = HttpResponse(
             content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
@@ -212,17 +183,17 @@ def product_list_view(request):
         wb.save(resp)
         return resp
 
-    paginator = Paginator(qs, 10)
-    page_obj = paginator.get_page(request.GET.get("page"))
+    page_obj = pagina_con_total(request, qs, 10)
 
     ctx = {
         "productos": _qs_to_dicts(page_obj.object_list),
         "page_obj": page_obj,
         "query": query,
         "sort_by": sort_by,
-        "categorias": Categoria.objects.all(),
+        "alerta": (request.GET.get("alerta") or "").strip(),
+        "categorias": catalogos.categorias(),
         "uom_choices": getattr(Product, "UOMS", []),
-        "bodegas": _load_bodegas_safe(),
+        "bodegas": catalogos.bodegas(),
     }
     ctx["query"] = query
     ctx["sort_by"] = sort_by
@@ -240,10 +211,7 @@ def product_list_view(request):
 def search_products(request):
     q = (request.GET.get("q") or "").strip()
     try:
-        qs = _base_queryset()
-        if q:
-            qs = qs.filter(_build_search_q(q))
-        qs = _apply_sort(qs, "id")[:10]
+        qs = _apply_sort(_filtrar_busqueda(_base_queryset(), q), "id")[:10]
         data = _qs_to_dicts(qs)
     except Exception as e:
         print("[productos.search] ERROR:", e)
@@ -284,6 +252,8 @@ def crear_producto(request):
             # --- FIN DE LA MODIFICACIÓN ---
 
             producto.save()  # Guardamos el producto
+            registrar_auditoria(request.user, "CREATE", f"Producto id={producto.id} SKU={producto.sku}",
+                                objeto_tipo="Producto", objeto_id=producto.id)
 
             return JsonResponse({"ok": True, "id": producto.id})
 
@@ -313,7 +283,7 @@ def editar_producto(request, prod_id: int):
             ]
         )
         data["categoria_nombre"] = getattr(producto.categoria, "nombre", "")
-        data["categorias"] = list(Categoria.objects.values("id", "nombre").order_by("nombre"))
+        data["categorias"] = catalogos.categorias()
         return JsonResponse({"ok": True, "data": data})
 
     if request.method != "POST":
@@ -407,6 +377,8 @@ def editar_producto(request, prod_id: int):
             # si no vino ningún campo actualizable, igual asegura persistencia
             producto.save()
 
+        registrar_auditoria(request.user, "UPDATE", f"Producto id={producto.id} SKU={producto.sku}",
+                            objeto_tipo="Producto", objeto_id=producto.id, campos=update_fields)
         return JsonResponse({"ok": True, "message": "Producto actualizado."})
 
     except Exception as e:
@@ -435,7 +407,10 @@ def eliminar_producto(request, prod_id: int):
         )
 
     try:
+        producto_id, sku = producto.id, producto.sku
         producto.delete()
+        registrar_auditoria(request.user, "DELETE", f"Producto id={producto_id} SKU={sku}",
+                            objeto_tipo="Producto", objeto_id=producto_id)
         return JsonResponse(
             {"status": "ok", "message": "Producto eliminado correctamente."}
         )
@@ -486,4 +461,29 @@ def eliminar_producto(request, prod_id: int):
                 "message": f"Error inesperado al eliminar el producto: {e}",
             },
             status=500,
-        )
\ No newline at end of file
+        )
+
+# ---------------- IMPORTACIÓN MASIVA (CSV / XLSX) ----------------
+@login_required
+@require_roles("ADMIN", "INVENTARIO")
+@require_POST
+def importar_productos_view(request):
+    """
+    POST multipart: archivo=<.csv|.xlsx> [&simular=1]
+    Upsert por SKU; devuelve el reporte con errores por fila.
+    """
+    archivo = request.FILES.get("archivo")
+    if not archivo:
+        return JsonResponse({"ok": False, "error": "Adjunta un archivo .csv o .xlsx."}, status=400)
+    simular = (request.POST.get("simular") or "").strip() in {"1", "true", "si"}
+
+    try:
+        r = importar_productos(archivo, archivo.name, simular=simular)
+    except ErrorImportacion as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=400)
+
+    if not simular:
+        registrar_auditoria(request.user, "IMPORT", f"Productos archivo={archivo.name}",
+                            objeto_tipo="Producto", creados=r["creados"],
+                            actualizados=r["actualizados"], con_error=r["con_error"])
+    return JsonResponse({"ok": True, "simulado": simular, **r})
@@ -0,0 +1,14 @@
+from django.contrib import admin
+from .models import ValorizacionCierre
+
+
+@admin.register(ValorizacionCierre)
+class ValorizacionCierreAdmin(admin.ModelAdmin):
+    list_display = ("periodo", "metodo", "movimientos", "calculado_en")
+    list_filter = ("metodo",)
+    ordering = ("-periodo",)
+    readonly_fields = ("periodo", "metodo", "movimientos", "calculado_en")
+
+    # Los cierres se generan con el comando valorizar_inventario
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,275 @@
+# apps/reports/analitica.py
+"""
+Analítica de inventario: clasificación ABC, rotación y estacionalidad.
+
+Dos etapas:
+  1. actualizar_resumen_mensual(): lee SOLO los movimientos que tiene
+     pendientes (MovimientoPendiente, ver incremental.py), los pasa a
+     arreglos NumPy y suma por (producto, mes) con np.unique + np.bincount.
+     Acumula en ResumenMensualProducto.
+  2. calcular_analisis(): toma los últimos 12 meses del resumen (tabla
+     pequeña), arma una matriz producto x mes y calcula ABC, rotación y
+     estacionalidad de forma vectorizada. Guarda en AnalisisProducto.
+
+NumPy es opcional para el resto del sistema: sólo este módulo lo requiere.
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from apps.products.models import Categoria, Producto
+from apps.transactional.models import MovimientoArchivo, MovimientoInventario, MovimientoPendiente, Stock
+
+from . import incremental
+from .models import AnalisisProducto, ResumenMensualProducto
+from .valorizacion import cargar_costos, periodo_de
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BLOQUE = 50000
+LIMITE_A = 0.80  # % acumulado del valor
+LIMITE_B = 0.95
+
+DASHBOARD_CACHE_KEY = "reports:analitica:dashboard"
+DASHBOARD_CACHE_TTL = 300
+
+# Columnas del resumen por tipo de movimiento (AJUSTE/TRANSFERENCIA sólo cuentan como movimiento)
+_COLUMNAS = {
+    MovimientoInventario.TIPO_INGRESO: 0,
+    MovimientoInventario.TIPO_SALIDA: 1,
+    MovimientoInventario.TIPO_DEVOLUCION: 2,
+}
+_CAMPOS_MOVIMIENTO = ("id", "producto_id", "tipo", "cantidad", "fecha")
+
+
+def _requiere_numpy():
+    if np is None:
+        raise RuntimeError("Falta dependencia: pip install numpy")
+
+
+def _a_decimal(valor, decimales=3):
+    return Decimal(str(round(float(valor), decimales)))
+
+
+# ================================================================
+# ETAPA 1: RESUMEN MENSUAL INCREMENTAL
+# ================================================================
+
+def _aplicar_resumen(filas):
+    n = len(filas)
+    producto = np.fromiter((f[1] for f in filas), dtype=np.int64, count=n)
+    columna = np.fromiter((_COLUMNAS.get(f[2], 3) for f in filas), dtype=np.int8, count=n)
+    cantidad = np.fromiter((f[3] for f in filas), dtype=np.float64, count=n)
+    periodo = np.fromiter((periodo_de(timezone.localtime(f[4])) for f in filas), dtype=np.int64, count=n)
+
+    # Agrupación vectorizada por (producto, periodo)
+    claves, inversa = np.unique(producto * 1_000_000 + periodo, return_inverse=True)
+    k = len(claves)
+    sumas = [
+        np.bincount(inversa, weights=np.where(columna == c, cantidad, 0.0), minlength=k)
+        for c in range(3)
+    ]
+    conteos = np.bincount(inversa, minlength=k)
+    prod_clave = claves // 1_000_000
+    periodo_clave = claves % 1_000_000
+
+    acumulado = {
+        (int(prod_clave[i]), int(periodo_clave[i])): [
+            _a_decimal(sumas[0][i]), _a_decimal(sumas[1][i]), _a_decimal(sumas[2][i]), int(conteos[i]),
+        ]
+        for i in range(k)
+    }
+    incremental.sumar_en(
+        ResumenMensualProducto, ("producto_id", "periodo"),
+        ("ingresos", "salidas", "devoluciones", "movimientos"), acumulado,
+    )
+
+
+def actualizar_resumen_mensual(bloque=BLOQUE):
+    """
+    Suma al resumen mensual los movimientos pendientes de este proceso
+    (MovimientoPendiente). Cada bloque se aplica en su propia transacción
+    junto con el borrado de sus pendientes, así una interrupción no
+    duplica ni pierde movimientos.
+    Devuelve la cantidad de movimientos procesados.
+    """
+    _requiere_numpy()
+    return incremental.consumir(
+        MovimientoPendiente.RESUMEN, _aplicar_resumen, _CAMPOS_MOVIMIENTO, bloque=bloque
+    )
+
+
+def reconstruir_resumen_mensual(bloque=BLOQUE):
+    """
+    Recalcula el resumen desde los movimientos archivados (de productos que
+    siguen existiendo: el archivo guarda ids sin FK) y los activos ya
+    sumados; los que siguen pendientes los suma el próximo
+    actualizar_resumen_mensual().
+    """
+    _requiere_numpy()
+    with transaction.atomic():
+        ResumenMensualProducto.objects.all().delete()
+        archivados = MovimientoArchivo.objects.filter(producto_id__in=Producto.objects.values("id"))
+        sumados = MovimientoInventario.objects.exclude(pendientes__proceso=MovimientoPendiente.RESUMEN)
+        for qs in (archivados, sumados):
+            for filas in incremental.por_bloques(qs, _CAMPOS_MOVIMIENTO, bloque):
+                _aplicar_resumen(filas)
+
+
+# ================================================================
+# ETAPA 2: ABC / ROTACIÓN / ESTACIONALIDAD
+# ================================================================
+
+def calcular_analisis(hoy=None):
+    """Recalcula AnalisisProducto para todo el catálogo activo. Devuelve la cantidad de productos."""
+    _requiere_numpy()
+    hoy = hoy or timezone.localdate()
+    total_meses_fin = hoy.year * 12 + hoy.month - 1
+    total_meses_ini = total_meses_fin - 11
+    periodo_ini = (total_meses_ini // 12) * 100 + total_meses_ini % 12 + 1
+
+    catalogo = list(Producto.objects.filter(activo=True).order_by("id").values_list("id", "categoria_id"))
+    if not catalogo:
+        AnalisisProducto.objects.all().delete()
+        return 0
+    ids = np.fromiter((p[0] for p in catalogo), dtype=np.int64, count=len(catalogo))
+    n = len(ids)
+
+    # Matriz producto x mes (12 columnas, la última es el mes actual)
+    resumen = list(
+        ResumenMensualProducto.objects.filter(periodo__gte=periodo_ini, producto__activo=True)
+        .values_list("producto_id", "periodo", "salidas")
+    )
+    matriz = np.zeros((n, 12), dtype=np.float64)
+    if resumen:
+        r_prod = np.fromiter((r[0] for r in resumen), dtype=np.int64, count=len(resumen))
+        r_per = np.fromiter((r[1] for r in resumen), dtype=np.int64, count=len(resumen))
+        r_sal = np.fromiter((r[2] for r in resumen), dtype=np.float64, count=len(resumen))
+        filas = np.searchsorted(ids, r_prod)
+        columnas = (r_per // 100) * 12 + (r_per % 100) - 1 - total_meses_ini
+        np.add.at(matriz, (filas, columnas), r_sal)
+
+    salidas = matriz.sum(axis=1)
+
+    _, referencia = cargar_costos()
+    costo = np.fromiter((float(referencia.get(int(i), 0)) for i in ids), dtype=np.float64, count=n)
+    valor = salidas * costo
+
+    # ABC por % acumulado del valor (de mayor a menor)
+    total = valor.sum()
+    clases = np.full(n, "C", dtype="<U1")
+    participacion = np.zeros(n)
+    if total > 0:
+        participacion = valor / total
+        orden = np.argsort(-valor, kind="stable")
+        acumulado_previo = np.cumsum(participacion[orden]) - participacion[orden]
+        clase_orden = np.where(acumulado_previo < LIMITE_A, "A", np.where(acumulado_previo < LIMITE_B, "B", "C"))
+        clase_orden[valor[orden] <= 0] = "C"
+        clases[orden] = clase_orden
+
+    # Rotación anual = salidas 12m / stock actual
+    stock_dict = dict(
+        Stock.objects.values("producto_id").annotate(total=models.Sum("cantidad")).order_by()
+        .values_list("producto_id", "total")
+    )
+    stock = np.fromiter((float(stock_dict.get(int(i)) or 0) for i in ids), dtype=np.float64, count=n)
+    con_stock = stock > 0
+    rotacion = np.divide(salidas, stock, out=np.zeros(n), where=con_stock)
+
+    # Estacionalidad: coeficiente de variación mensual y mes de mayor salida
+    media = matriz.mean(axis=1)
+    con_ventas = media > 0
+    cv = np.divide(matriz.std(axis=1), media, out=np.zeros(n), where=con_ventas)
+    meses_calendario = (np.arange(total_meses_ini, total_meses_fin + 1) % 12) + 1
+    pico = meses_calendario[matriz.argmax(axis=1)]
+
+    objetos = []
+    for i, (pid, categoria_id) in enumerate(catalogo):
+        rot = float(rotacion[i]) if con_stock[i] and salidas[i] > 0 else None
+        objetos.append(AnalisisProducto(
+            producto_id=pid,
+            categoria_id=categoria_id,
+            clase_abc=str(clases[i]),
+            salidas_12m=_a_decimal(salidas[i]),
+            valor_12m=_a_decimal(valor[i], 2),
+            participacion=_a_decimal(participacion[i] * 100, 4),
+            stock_actual=_a_decimal(stock[i]),
+            rotacion=_a_decimal(rot, 2) if rot is not None else None,
+            dias_inventario=min(int(365 / rot), 99999) if rot else None,
+            mes_pico=int(pico[i]) if con_ventas[i] else None,
+            estacionalidad=_a_decimal(cv[i]) if con_ventas[i] else None,
+        ))
+
+    campos = [
+        "categoria_id", "clase_abc", "salidas_12m", "valor_12m", "participacion", "stock_actual",
+        "rotacion", "dias_inventario", "mes_pico", "estacionalidad", "actualizado_en",
+    ]
+    # MySQL no admite unique_fields en el upsert
+    kwargs = {"update_conflicts": True, "update_fields": campos}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = ["producto"]
+    with transaction.atomic():
+        AnalisisProducto.objects.bulk_create(objetos, batch_size=1000, **kwargs)
+        AnalisisProducto.objects.exclude(producto__activo=True).delete()
+
+    cache.delete(DASHBOARD_CACHE_KEY)
+    return n
+
+
+# ================================================================
+# DATOS PARA EL DASHBOARD
+# ================================================================
+
+def resumen_dashboard():
+    """ABC por clase, por categoría y top de rotación; cacheado unos minutos."""
+    data = cache.get(DASHBOARD_CACHE_KEY)
+    if data is not None:
+        return data
+
+    qs = AnalisisProducto.objects.all()
+    por_clase = {
+        r["clase_abc"]: r
+        for r in qs.values("clase_abc").annotate(
+            productos=models.Count("producto_id"), valor=models.Sum("valor_12m")
+        ).order_by()
+    }
+    nombres = dict(Categoria.objects.values_list("id", "nombre"))
+    por_categoria = [
+        {
+            "nombre": nombres.get(r["categoria_id"], "-"),
+            "valor": r["valor"] or 0,
+            "salidas": r["salidas"] or 0,
+            "clase_a": r["clase_a"],
+            "rotacion": (r["salidas"] / r["stock"]) if r["stock"] else None,
+        }
+        for r in qs.values("categoria_id").annotate(
+            valor=models.Sum("valor_12m"),
+            salidas=models.Sum("salidas_12m"),
+            stock=models.Sum("stock_actual"),
+            clase_a=models.Count("producto_id", filter=models.Q(clase_abc="A")),
+        ).order_by("-valor")[:10]
+    ]
+    top_rotacion = list(
+        qs.filter(rotacion__isnull=False)
+        .order_by("-rotacion")
+        .values("producto__sku", "producto__nombre", "clase_abc", "rotacion", "dias_inventario")[:10]
+    )
+    ultima = qs.aggregate(m=models.Max("actualizado_en"))["m"]
+
+    data = {
+        "clases": [
+            {"clase": c, "productos": por_clase.get(c, {}).get("productos", 0),
+             "valor": por_clase.get(c, {}).get("valor") or 0}
+            for c in ("A", "B", "C")
+        ],
+        "por_categoria": por_categoria,
+        "top_rotacion": top_rotacion,
+        "actualizado_en": ultima,
+    }
+    cache.set(DASHBOARD_CACHE_KEY, data, DASHBOARD_CACHE_TTL)
+    return data
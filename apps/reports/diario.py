@@ -0,0 +1,166 @@
+# apps/reports/diario.py
+"""
+Rollup diario de movimientos: MovimientoDiario(fecha, producto, bodega, tipo).
+
+- actualizar_movimiento_diario(movimiento_ids): suma los movimientos
+  pendientes de este proceso (MovimientoPendiente, ver incremental.py). Al
+  confirmar cada movimiento corre sólo para los de esa transacción (junto
+  con las métricas del dashboard); el comando actualizar_movimiento_diario
+  suma todo lo que quede pendiente.
+- reconstruir_movimiento_diario(): recalcula el rollup desde los
+  movimientos archivados (MovimientoArchivo) y los activos ya sumados.
+- verificar_movimiento_diario(): recalcula desde los movimientos (activos
+  sin pendiente y archivados) y devuelve las diferencias con el rollup.
+- totales(): consultas de los reportes (consumo, top SKUs) sobre el
+  rollup; su costo depende de días x productos, no de la cantidad de
+  movimientos.
+"""
+from collections import defaultdict
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from apps.products.models import Producto
+from apps.transactional.models import Bodega, MovimientoArchivo, MovimientoInventario, MovimientoPendiente
+
+from . import incremental
+from .models import MovimientoDiario
+
+BLOQUE = incremental.BLOQUE
+
+# Tipos que se registran en la bodega de origen; el resto en la de destino
+_TIPOS_ORIGEN = (MovimientoInventario.TIPO_SALIDA, MovimientoInventario.TIPO_TRANSFERENCIA)
+_COLUMNAS = ("id", "fecha", "producto_id", "bodega_origen_id", "bodega_destino_id", "tipo", "cantidad")
+
+
+def bodega_de(tipo, origen_id, destino_id):
+    if tipo in _TIPOS_ORIGEN:
+        return origen_id or destino_id
+    return destino_id or origen_id
+
+
+def _acumular(acumulado, filas):
+    for _, fecha, producto_id, origen_id, destino_id, tipo, cantidad in filas:
+        clave = (timezone.localdate(fecha), producto_id, bodega_de(tipo, origen_id, destino_id), tipo)
+        a = acumulado[clave]
+        a[0] += 1
+        a[1] += cantidad
+
+
+def _nuevo_acumulado():
+    return defaultdict(lambda: [0, Decimal("0")])
+
+
+def _archivados():
+    """
+    Movimientos archivados cuyo producto y bodegas siguen existiendo (el
+    archivo guarda ids sin FK; lo borrado ya no tiene filas en el rollup).
+    """
+    bodegas = Bodega.objects.values("id")
+    return MovimientoArchivo.objects.filter(
+        models.Q(bodega_origen_id__isnull=True) | models.Q(bodega_origen_id__in=bodegas),
+        models.Q(bodega_destino_id__isnull=True) | models.Q(bodega_destino_id__in=bodegas),
+        producto_id__in=Producto.objects.values("id"),
+    )
+
+
+# ================================================================
+# ACTUALIZACIÓN INCREMENTAL
+# ================================================================
+
+def _aplicar(filas):
+    """Suma las filas de movimientos al rollup (dentro de la transacción de quien llama)."""
+    acumulado = _nuevo_acumulado()
+    _acumular(acumulado, filas)
+    incremental.sumar_en(
+        MovimientoDiario, ("fecha", "producto_id", "bodega_id", "tipo"),
+        ("n_movimientos", "cantidad_total"), acumulado,
+    )
+
+
+def actualizar_movimiento_diario(movimiento_ids=None, bloque=BLOQUE):
+    """
+    Suma al rollup los movimientos pendientes de este proceso: sólo los de
+    movimiento_ids si se indican (hook on_commit), todos si no (comando).
+    Devuelve la cantidad de movimientos procesados.
+    """
+    return incremental.consumir(
+        MovimientoPendiente.DIARIO, _aplicar, _COLUMNAS, movimiento_ids, bloque
+    )
+
+
+def _sumados():
+    """Movimientos activos que ya están en el rollup (sin pendiente de este proceso)."""
+    return MovimientoInventario.objects.exclude(pendientes__proceso=MovimientoPendiente.DIARIO)
+
+
+def reconstruir_movimiento_diario(bloque=BLOQUE):
+    """
+    Recalcula el rollup desde los movimientos archivados y los activos ya
+    sumados, en una transacción; los pendientes los suma el próximo
+    actualizar_movimiento_diario().
+    """
+    with transaction.atomic():
+        MovimientoDiario.objects.all().delete()
+        for qs in (_archivados(), _sumados()):
+            for filas in incremental.por_bloques(qs, _COLUMNAS, bloque):
+                _aplicar(filas)
+
+
+def verificar_movimiento_diario(desde=None):
+    """
+    Compara el rollup con los movimientos ya sumados (activos sin pendiente
+    y archivados), desde la fecha 'desde' (date) si se indica. Devuelve una lista de
+    (fecha, producto_id, bodega_id, tipo, esperado, actual), donde
+    esperado/actual son (n_movimientos, cantidad_total) o None.
+    La agrupación por día se hace en Python con la misma zona horaria que
+    la actualización (no depende de las tablas de zonas del motor).
+    """
+    movimientos = _sumados()
+    archivados = _archivados()
+    rollup = MovimientoDiario.objects.all()
+    if desde is not None:
+        inicio = timezone.make_aware(datetime.combine(desde, time.min))
+        movimientos = movimientos.filter(fecha__gte=inicio)
+        archivados = archivados.filter(fecha__gte=inicio)
+        rollup = rollup.filter(fecha__gte=desde)
+
+    esperado = _nuevo_acumulado()
+    for qs in (archivados, movimientos):
+        _acumular(esperado, qs.order_by().values_list(*_COLUMNAS).iterator(chunk_size=5000))
+
+    actual = {}
+    for fecha, producto_id, bodega_id, tipo, n, cantidad in rollup.values_list(
+        "fecha", "producto_id", "bodega_id", "tipo", "n_movimientos", "cantidad_total"
+    ).iterator(chunk_size=5000):
+        clave = (fecha, producto_id, bodega_id, tipo)
+        previo = actual.get(clave, (0, Decimal("0")))  # bodega NULL puede repetirse
+        actual[clave] = (previo[0] + n, previo[1] + cantidad)
+
+    diferencias = []
+    for clave in sorted(set(esperado) | set(actual), key=lambda k: (k[0], k[1], k[2] or 0, k[3])):
+        e = tuple(esperado[clave]) if clave in esperado else None
+        a = actual.get(clave)
+        if e != a:
+            diferencias.append((*clave, e, a))
+    return diferencias
+
+
+# ================================================================
+# LECTURA PARA REPORTES
+# ================================================================
+
+def totales(tipo, desde, hasta=None, por=("producto_id",)):
+    """
+    Suma de cantidad y de movimientos de un tipo entre dos días (date,
+    inclusivo), agrupada por los campos 'por' del rollup.
+    """
+    qs = MovimientoDiario.objects.filter(tipo=tipo, fecha__gte=desde)
+    if hasta is not None:
+        qs = qs.filter(fecha__lte=hasta)
+    return qs.values(*por).annotate(
+        cantidad=models.Sum("cantidad_total"),
+        movimientos=models.Sum("n_movimientos"),
+    ).order_by()
@@ -0,0 +1,110 @@
+# apps/reports/incremental.py
+"""
+Procesos incrementales de reportes sobre la cola MovimientoPendiente.
+
+Cada movimiento nuevo deja una fila pendiente por proceso en su misma
+transacción (MovimientoInventario.save / conteo). Un proceso suma a su
+tabla los movimientos que tiene pendientes y borra esos pendientes en la
+misma transacción, así:
+- un movimiento cuenta exactamente una vez, confirme en el orden que
+  confirme (no hay marca por id que un commit tardío pueda saltarse);
+- el hook on_commit procesa sólo los movimientos de su transacción y no
+  compite por una fila de marca común; lo que quede pendiente (un hook que
+  falló, un reintento) lo recupera el comando programado.
+
+- consumir(proceso, aplicar, columnas, movimiento_ids): toma los
+  pendientes (select_for_update skip_locked), aplica y borra.
+- sumar_en(modelo, claves, sumas, acumulado): suma a las filas de un rollup
+  bloqueando sólo las claves afectadas.
+- por_bloques(qs, columnas): recorrido por id para las reconstrucciones.
+"""
+from django.db import IntegrityError, models, transaction
+
+from apps.transactional.models import MovimientoInventario, MovimientoPendiente
+
+BLOQUE = 20000
+BLOQUE_CLAVES = 500  # claves por SELECT ... FOR UPDATE
+
+
+def _consumir_bloque(proceso, aplicar, columnas, movimiento_ids, bloque):
+    with transaction.atomic():
+        pendientes = MovimientoPendiente.objects.filter(proceso=proceso)
+        if movimiento_ids is not None:
+            pendientes = pendientes.filter(movimiento_id__in=movimiento_ids)
+        tomados = list(
+            pendientes.select_for_update(skip_locked=True)
+            .order_by("movimiento_id")
+            .values_list("pk", "movimiento_id")[:bloque]
+        )
+        if tomados:
+            aplicar(list(
+                MovimientoInventario.objects.filter(id__in=[m for _, m in tomados])
+                .order_by("id")
+                .values_list(*columnas)
+            ))
+            MovimientoPendiente.objects.filter(pk__in=[p for p, _ in tomados]).delete()
+    return len(tomados)
+
+
+def consumir(proceso, aplicar, columnas, movimiento_ids=None, bloque=BLOQUE):
+    """
+    Aplica los movimientos pendientes de 'proceso' por bloques, cada bloque
+    en su transacción junto con el borrado de sus pendientes.
+    aplicar(filas) recibe values_list(*columnas) de los movimientos.
+    Con movimiento_ids sólo mira esos (hook on_commit); sin ellos, todos
+    (comando). Los pendientes que otro proceso tiene tomados se saltan.
+    Devuelve cuántos movimientos procesó.
+    """
+    procesados = 0
+    while True:
+        try:
+            n = _consumir_bloque(proceso, aplicar, columnas, movimiento_ids, bloque)
+        except IntegrityError:
+            # Otra transacción creó a la vez una fila nueva del rollup con la
+            # misma clave: al reintentar ya existe y se suma sobre ella.
+            n = _consumir_bloque(proceso, aplicar, columnas, movimiento_ids, bloque)
+        procesados += n
+        if n < bloque:
+            return procesados
+
+
+def sumar_en(modelo, claves, sumas, acumulado, batch_size=1000):
+    """
+    Suma 'acumulado' ({clave: [valores]}) a las filas de 'modelo' (dentro de
+    la transacción de quien llama). 'claves' son los campos de la clave en
+    el orden de la tupla y 'sumas' los campos que reciben los valores.
+    Bloquea sólo las filas de esas claves (una clave con None se compara
+    con IS NULL).
+    """
+    pedidas = list(acumulado)
+    existentes = {}
+    for i in range(0, len(pedidas), BLOQUE_CLAVES):
+        filtro = models.Q()
+        for clave in pedidas[i:i + BLOQUE_CLAVES]:
+            filtro |= models.Q(**dict(zip(claves, clave)))
+        for fila in modelo.objects.select_for_update().filter(filtro):
+            existentes.setdefault(tuple(getattr(fila, c) for c in claves), fila)
+
+    nuevos, modificados = [], []
+    for clave, valores in acumulado.items():
+        fila = existentes.get(clave)
+        if fila is None:
+            nuevos.append(modelo(**dict(zip(claves, clave)), **dict(zip(sumas, valores))))
+        else:
+            for campo, valor in zip(sumas, valores):
+                setattr(fila, campo, getattr(fila, campo) + valor)
+            modificados.append(fila)
+    modelo.objects.bulk_create(nuevos, batch_size=batch_size)
+    modelo.objects.bulk_update(modificados, list(sumas), batch_size=batch_size)
+
+
+def por_bloques(qs, columnas, bloque=BLOQUE):
+    """Filas values_list(*columnas) de 'qs' en bloques ordenados por id ('id' va primero)."""
+    ultimo = None
+    while True:
+        parte = qs if ultimo is None else qs.filter(id__gt=ultimo)
+        filas = list(parte.order_by("id").values_list(*columnas)[:bloque])
+        if not filas:
+            return
+        yield filas
+        ultimo = filas[-1][0]
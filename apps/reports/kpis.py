@@ -0,0 +1,199 @@
+# apps/reports/kpis.py
+"""
+KPIs del dashboard.
+
+- MetricaDiaria: movimientos por día y tipo. Se actualiza de forma
+  incremental (cola MovimientoPendiente, ver incremental.py) al confirmar
+  cada movimiento y desde el comando refrescar_kpis.
+- Indicador: KPIs puntuales (valor del stock, bajo stock, top SKUs,
+  proveedores, lotes por vencer). Los calcula el comando programado;
+  la página nunca ejecuta esos GROUP BY.
+- payload_kpis(): un único JSON cacheado que arma el dashboard.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import models, transaction
+from django.utils import timezone
+
+from apps.products.models import Producto
+from apps.suppliers.models import Proveedor, ProveedorProducto
+from apps.transactional.models import MovimientoArchivo, MovimientoInventario, MovimientoPendiente, Stock
+
+from . import diario, incremental
+from .models import Indicador, MetricaDiaria
+from .valorizacion import cargar_costos
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "reports:kpis"
+CACHE_TTL = 60  # segundos
+DIAS_SERIE = 30
+DIAS_VENCIMIENTO = 30
+TOP_SKUS = 10
+
+
+def _invalidar():
+    cache.delete(CACHE_KEY)
+
+
+# ================================================================
+# MÉTRICAS DIARIAS (INCREMENTAL)
+# ================================================================
+
+_COLUMNAS = ("id", "tipo", "cantidad", "fecha")
+
+
+def _aplicar_metricas(filas):
+    acumulado = defaultdict(lambda: [0, Decimal("0")])
+    for _, tipo, cantidad, fecha in filas:
+        a = acumulado[(timezone.localdate(fecha), tipo)]
+        a[0] += 1
+        a[1] += cantidad
+    incremental.sumar_en(MetricaDiaria, ("fecha", "tipo"), ("movimientos", "cantidad"), acumulado)
+
+
+def actualizar_metricas_diarias(movimiento_ids=None, bloque=incremental.BLOQUE):
+    """
+    Suma a MetricaDiaria los movimientos pendientes de este proceso (sólo
+    los de movimiento_ids, si se indican). Devuelve cuántos procesó.
+    """
+    procesados = incremental.consumir(
+        MovimientoPendiente.METRICAS, _aplicar_metricas, _COLUMNAS, movimiento_ids, bloque
+    )
+    if procesados:
+        _invalidar()
+    return procesados
+
+
+def reconstruir_metricas_diarias(bloque=incremental.BLOQUE):
+    """
+    Recalcula MetricaDiaria desde los movimientos archivados y los activos
+    ya sumados; los que siguen pendientes los suma el próximo
+    actualizar_metricas_diarias(). La métrica no tiene FK a producto ni
+    bodega: cuenta todo el archivo, aunque lo referido ya no exista.
+    """
+    with transaction.atomic():
+        MetricaDiaria.objects.all().delete()
+        sumados = MovimientoInventario.objects.exclude(pendientes__proceso=MovimientoPendiente.METRICAS)
+        for qs in (MovimientoArchivo.objects.all(), sumados):
+            for filas in incremental.por_bloques(qs, _COLUMNAS, bloque):
+                _aplicar_metricas(filas)
+    _invalidar()
+
+
+def al_confirmar_movimiento(movimiento_ids):
+    """
+    Para transaction.on_commit: suma los movimientos recién confirmados a las
+    métricas y al rollup diario por producto y bodega.
+    """
+    # Las métricas nunca deben romper el registro de un movimiento; lo que
+    # quede pendiente lo recupera el comando programado.
+    for actualizar in (actualizar_metricas_diarias, diario.actualizar_movimiento_diario):
+        try:
+            actualizar(movimiento_ids)
+        except Exception:
+            logger.exception("%s falló para los movimientos %s", actualizar.__name__, movimiento_ids)
+
+
+# ================================================================
+# INDICADORES PUNTUALES (COMANDO PROGRAMADO)
+# ================================================================
+
+def _guardar(clave, valor):
+    Indicador.objects.update_or_create(clave=clave, defaults={"valor": valor})
+
+
+def calcular_indicadores():
+    """Recalcula los KPIs puntuales. Pocas consultas agregadas, fuera del request."""
+    stock_por_producto = dict(
+        Stock.objects.values("producto_id").annotate(total=models.Sum("cantidad")).order_by()
+        .values_list("producto_id", "total")
+    )
+
+    # Valor del stock a costo de referencia
+    _, referencia = cargar_costos()
+    valor = sum(
+        ((cantidad or 0) * referencia.get(pid, 0) for pid, cantidad in stock_por_producto.items()),
+        Decimal("0"),
+    )
+    unidades = sum((c or 0 for c in stock_por_producto.values()), Decimal("0"))
+    _guardar("valor_stock", {"valor": str(valor.quantize(Decimal("0.01"))), "unidades": str(unidades)})
+
+    # Productos activos en o bajo su umbral (punto de reorden o stock mínimo)
+    activos = Producto.objects.filter(activo=True).count()
+    bajo = Producto.objects.filter(activo=True).bajo_stock().count()
+    _guardar("bajo_stock", {"productos": bajo, "activos": activos})
+
+    # Top SKUs por salidas de los últimos 30 días (desde el rollup diario)
+    desde = timezone.localdate() - timedelta(days=DIAS_SERIE - 1)
+    top = list(
+        diario.totales(MovimientoInventario.TIPO_SALIDA, desde, por=("producto__sku", "producto__nombre"))
+        .order_by("-cantidad")[:TOP_SKUS]
+    )
+    _guardar("top_skus", {"dias": DIAS_SERIE, "items": [
+        {"sku": t["producto__sku"], "nombre": t["producto__nombre"],
+         "cantidad": str(t["cantidad"]), "movimientos": t["movimientos"]}
+        for t in top
+    ]})
+
+    # Proveedores
+    proveedores = Proveedor.objects.aggregate(
+        total=models.Count("id"),
+        activos=models.Count("id", filter=models.Q(estado=Proveedor.ESTADO_ACTIVO)),
+    )
+    proveedores["con_productos"] = ProveedorProducto.objects.values("proveedor_id").distinct().count()
+    _guardar("proveedores", proveedores)
+
+    # Lotes por vencer / vencidos
+    hoy = timezone.localdate()
+    lotes = Stock.objects.por_vencer(DIAS_VENCIMIENTO, desde=hoy).aggregate(
+        lotes=models.Count("id"),
+        vencidos=models.Count("id", filter=models.Q(fecha_vencimiento__lt=hoy)),
+    )
+    lotes["dias"] = DIAS_VENCIMIENTO
+    _guardar("lotes_por_vencer", lotes)
+
+    _invalidar()
+
+
+# ================================================================
+# JSON DEL DASHBOARD
+# ================================================================
+
+def payload_kpis():
+    """Todo lo que muestra el dashboard, desde tablas precalculadas y con cache."""
+    data = cache.get(CACHE_KEY)
+    if data is not None:
+        return data
+
+    indicadores = {}
+    actualizado = None
+    for clave, valor, en in Indicador.objects.values_list("clave", "valor", "actualizado_en"):
+        indicadores[clave] = valor
+        actualizado = max(actualizado, en) if actualizado else en
+
+    desde = timezone.localdate() - timedelta(days=DIAS_SERIE - 1)
+    serie = defaultdict(dict)
+    for fecha, tipo, n in MetricaDiaria.objects.filter(fecha__gte=desde).values_list(
+        "fecha", "tipo", "movimientos"
+    ):
+        serie[fecha.isoformat()][tipo] = n
+    dias = [(desde + timedelta(days=i)).isoformat() for i in range(DIAS_SERIE)]
+
+    data = {
+        "indicadores": indicadores,
+        "movimientos_por_dia": {
+            "dias": dias,
+            "tipos": {
+                tipo: [serie.get(d, {}).get(tipo, 0) for d in dias]
+                for tipo, _ in MovimientoInventario.TIPOS
+            },
+        },
+        "actualizado_en": actualizado.isoformat() if actualizado else None,
+    }
+    cache.set(CACHE_KEY, data, CACHE_TTL)
+    return data
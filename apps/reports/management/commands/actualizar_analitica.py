@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.reports import analitica
+
+
+class Command(BaseCommand):
+    help = (
+        "Actualiza el resumen mensual con los movimientos nuevos (incremental) "
+        "y recalcula ABC, rotación y estacionalidad. Pensado para cron (diario)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reconstruir", action="store_true",
+                            help="Descarta el resumen mensual y lo vuelve a calcular desde cero.")
+        parser.add_argument("--lote", type=int, default=analitica.BLOQUE,
+                            help=f"Movimientos por bloque (default {analitica.BLOQUE}).")
+
+    def handle(self, *args, **opts):
+        if analitica.np is None:
+            raise CommandError("Falta dependencia: pip install numpy")
+
+        inicio = timezone.now()
+        if opts["reconstruir"]:
+            analitica.reconstruir_resumen_mensual()
+        procesados = analitica.actualizar_resumen_mensual(bloque=max(1, opts["lote"]))
+        productos = analitica.calcular_analisis()
+
+        segundos = (timezone.now() - inicio).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f"Analítica: {procesados} movimientos nuevos, {productos} productos clasificados ({segundos:.1f}s)."
+        ))
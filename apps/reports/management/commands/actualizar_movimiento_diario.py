@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.reports import diario
+
+
+class Command(BaseCommand):
+    help = (
+        "Actualiza el rollup diario de movimientos por producto, bodega y tipo (incremental). "
+        "Con --reconstruir lo recalcula desde el primer movimiento; con --verificar lo compara "
+        "con los movimientos y falla si hay diferencias."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reconstruir", action="store_true",
+                            help="Descarta el rollup y lo vuelve a calcular desde cero.")
+        parser.add_argument("--verificar", action="store_true",
+                            help="No actualiza: recalcula desde los movimientos y lista las diferencias.")
+        parser.add_argument("--desde", default="",
+                            help="Con --verificar, sólo desde este día (AAAA-MM-DD).")
+        parser.add_argument("--bloque", type=int, default=diario.BLOQUE,
+                            help=f"Movimientos por bloque (default {diario.BLOQUE}).")
+
+    def handle(self, *args, **opts):
+        if opts["verificar"]:
+            desde = None
+            if opts["desde"]:
+                desde = parse_date(opts["desde"])
+                if desde is None:
+                    raise CommandError("--desde debe tener formato AAAA-MM-DD.")
+            diferencias = diario.verificar_movimiento_diario(desde)
+            for fecha, producto_id, bodega_id, tipo, esperado, actual in diferencias[:50]:
+                self.stdout.write(
+                    f"{fecha} producto={producto_id} bodega={bodega_id} {tipo}: "
+                    f"esperado={esperado} rollup={actual}"
+                )
+            if diferencias:
+                raise CommandError(
+                    f"{len(diferencias)} diferencias; corregir con --reconstruir."
+                )
+            self.stdout.write(self.style.SUCCESS("Rollup diario consistente con los movimientos."))
+            return
+
+        inicio = timezone.now()
+        bloque = max(1, opts["bloque"])
+        if opts["reconstruir"]:
+            diario.reconstruir_movimiento_diario(bloque=bloque)
+        procesados = diario.actualizar_movimiento_diario(bloque=bloque)
+
+        segundos = (timezone.now() - inicio).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rollup diario: {procesados} movimientos nuevos ({segundos:.1f}s)."
+        ))
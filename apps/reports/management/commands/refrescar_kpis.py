@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.reports import diario, kpis
+
+
+class Command(BaseCommand):
+    help = (
+        "Actualiza las métricas diarias de movimientos (incremental) y recalcula "
+        "los KPIs del dashboard. Pensado para cron (p. ej. cada 5 minutos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reconstruir", action="store_true",
+                            help="Recalcula las métricas diarias desde los movimientos activos.")
+
+    def handle(self, *args, **opts):
+        inicio = timezone.now()
+        if opts["reconstruir"]:
+            kpis.reconstruir_metricas_diarias()
+        procesados = kpis.actualizar_metricas_diarias()
+        diario.actualizar_movimiento_diario()  # top SKUs lee el rollup
+        kpis.calcular_indicadores()
+
+        segundos = (timezone.now() - inicio).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f"KPIs: {procesados} movimientos nuevos en métricas diarias, indicadores recalculados ({segundos:.1f}s)."
+        ))
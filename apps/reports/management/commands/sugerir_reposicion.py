@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from apps.reports.reposicion import (
+    DIAS_OBJETIVO,
+    VENTANA_DIAS,
+    acotar,
+    agrupar_por_proveedor,
+    reposicion_cacheada,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula las sugerencias de reposición de todo el catálogo y refresca "
+        "la cache (compartida) que usa la página de reportes. Pensado para cron "
+        "(p. ej. cada hora). Ventana y objetivo se acotan igual que en la página."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ventana", type=int, default=VENTANA_DIAS,
+                            help=f"Días de historia de SALIDA para el consumo (default {VENTANA_DIAS}).")
+        parser.add_argument("--objetivo", type=int, default=DIAS_OBJETIVO,
+                            help=f"Días de cobertura a reponer si no hay stock máximo (default {DIAS_OBJETIVO}).")
+
+    def handle(self, *args, **opts):
+        ventana, objetivo = acotar(opts["ventana"], opts["objetivo"])
+        sugerencias, _ = reposicion_cacheada(ventana, objetivo, recalcular=True)
+
+        for g in agrupar_por_proveedor(sugerencias):
+            self.stdout.write(f"{g['proveedor']}: {len(g['items'])} productos, ${g['total']:,.2f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Reposición: {len(sugerencias)} productos bajo punto de reorden."
+        ))
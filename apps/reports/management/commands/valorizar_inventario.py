@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.reports.models import ValorizacionCierre
+from apps.reports.valorizacion import (
+    calcular_valorizacion,
+    periodo_anterior,
+    periodo_de,
+    periodo_valido,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula y guarda la valorización de inventario al cierre de un mes "
+        "(por defecto, el último mes cerrado) para los métodos indicados. "
+        "Pensado para ejecutarse el día 1 de cada mes (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--periodo", help="Mes a valorizar, AAAA-MM (default: mes anterior).")
+        parser.add_argument("--metodo", choices=[m for m, _ in ValorizacionCierre.METODOS],
+                            action="append",
+                            help="PROMEDIO y/o FIFO (default: ambos).")
+        parser.add_argument("--recalcular", action="store_true",
+                            help="Descarta los cierres guardados desde ese mes y los vuelve a calcular.")
+
+    def handle(self, *args, **opts):
+        if opts["periodo"]:
+            try:
+                anio, mes = opts["periodo"].split("-", 1)
+                periodo = int(anio) * 100 + int(mes)
+            except ValueError:
+                periodo = 0
+            if not periodo_valido(periodo):
+                raise CommandError("Periodo inválido, use AAAA-MM.")
+        else:
+            periodo = periodo_anterior(periodo_de(timezone.localdate()))
+
+        for metodo in opts["metodo"] or [m for m, _ in ValorizacionCierre.METODOS]:
+            inicio = timezone.now()
+            lineas = calcular_valorizacion(periodo, metodo, recalcular=opts["recalcular"], guardar=True)
+            total = sum((l["valor"] for l in lineas), 0)
+            segundos = (timezone.now() - inicio).total_seconds()
+            self.stdout.write(self.style.SUCCESS(
+                f"Valorización {periodo} {metodo}: {len(lineas)} líneas, total {total:,.2f} ({segundos:.1f}s)."
+            ))
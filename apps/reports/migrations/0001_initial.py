@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('transactional', '0003_movimiento_producto_fecha_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ValorizacionCierre',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periodo', models.PositiveIntegerField()),
+                ('metodo', models.CharField(choices=[('PROMEDIO', 'Costo promedio ponderado'), ('FIFO', 'FIFO')], max_length=10)),
+                ('calculado_en', models.DateTimeField(auto_now=True)),
+                ('movimientos', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('-periodo', 'metodo'),
+                'constraints': [models.UniqueConstraint(fields=('periodo', 'metodo'), name='uniq_valorizacion_periodo_metodo')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ValorizacionLinea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad', models.DecimalField(decimal_places=3, max_digits=14)),
+                ('valor', models.DecimalField(decimal_places=4, max_digits=18)),
+                ('capas', models.JSONField(blank=True, default=list)),
+                ('bodega', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='transactional.bodega')),
+                ('cierre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lineas', to='reports.valorizacioncierre')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.producto')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('cierre', 'producto', 'bodega'), name='uniq_valorizacion_linea')],
+            },
+        ),
+    ]
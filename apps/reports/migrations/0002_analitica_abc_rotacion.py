@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalisisProducto',
+            fields=[
+                ('producto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='analisis', serialize=False, to='products.producto')),
+                ('categoria_id', models.BigIntegerField(db_index=True, null=True)),
+                ('clase_abc', models.CharField(choices=[('A', 'A'), ('B', 'B'), ('C', 'C')], db_index=True, max_length=1)),
+                ('salidas_12m', models.DecimalField(decimal_places=3, default=0, max_digits=16)),
+                ('valor_12m', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('participacion', models.DecimalField(decimal_places=4, default=0, max_digits=7)),
+                ('stock_actual', models.DecimalField(decimal_places=3, default=0, max_digits=16)),
+                ('rotacion', models.DecimalField(decimal_places=2, max_digits=12, null=True)),
+                ('dias_inventario', models.PositiveIntegerField(null=True)),
+                ('mes_pico', models.PositiveSmallIntegerField(null=True)),
+                ('estacionalidad', models.DecimalField(decimal_places=3, max_digits=8, null=True)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MarcaProceso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=60, unique=True)),
+                ('ultimo_id', models.BigIntegerField(default=0)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumenMensualProducto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periodo', models.PositiveIntegerField()),
+                ('ingresos', models.DecimalField(decimal_places=3, default=0, max_digits=16)),
+                ('salidas', models.DecimalField(decimal_places=3, default=0, max_digits=16)),
+                ('devoluciones', models.DecimalField(decimal_places=3, default=0, max_digits=16)),
+                ('movimientos', models.PositiveIntegerField(default=0)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.producto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['periodo'], name='resumen_periodo_idx')],
+                'constraints': [models.UniqueConstraint(fields=('producto', 'periodo'), name='uniq_resumen_producto_periodo')],
+            },
+        ),
+    ]
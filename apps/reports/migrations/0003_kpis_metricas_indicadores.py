@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_analitica_abc_rotacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Indicador',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=60, unique=True)),
+                ('valor', models.JSONField(default=dict)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MetricaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('tipo', models.CharField(max_length=20)),
+                ('movimientos', models.PositiveIntegerField(default=0)),
+                ('cantidad', models.DecimalField(decimal_places=3, default=0, max_digits=16)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'tipo'), name='uniq_metrica_fecha_tipo')],
+            },
+        ),
+    ]
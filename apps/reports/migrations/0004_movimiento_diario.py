@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('reports', '0003_kpis_metricas_indicadores'),
+        ('transactional', '0006_movimiento_vista_busqueda_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('tipo', models.CharField(max_length=20)),
+                ('cantidad_total', models.DecimalField(decimal_places=3, default=0, max_digits=18)),
+                ('n_movimientos', models.PositiveIntegerField(default=0)),
+                ('bodega', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='transactional.bodega')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.producto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tipo', 'fecha'], name='movdiario_tipo_fecha_idx'), models.Index(fields=['producto', 'fecha'], name='movdiario_prod_fecha_idx')],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'producto', 'bodega', 'tipo'), name='uniq_movdiario')],
+            },
+        ),
+    ]
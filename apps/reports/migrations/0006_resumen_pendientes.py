@@ -0,0 +1,53 @@
+from django.db import migrations
+
+MARCA = "analitica_resumen_mensual"
+PROCESO = "resumen"
+BLOQUE = 5000
+
+
+def marca_a_pendientes(apps, schema_editor):
+    """Los movimientos posteriores a la marca quedan pendientes del proceso; la marca se borra."""
+    MarcaProceso = apps.get_model("reports", "MarcaProceso")
+    MovimientoInventario = apps.get_model("transactional", "MovimientoInventario")
+    MovimientoPendiente = apps.get_model("transactional", "MovimientoPendiente")
+
+    ultimo = MarcaProceso.objects.filter(nombre=MARCA).values_list("ultimo_id", flat=True).first() or 0
+    while True:
+        ids = list(
+            MovimientoInventario.objects.filter(id__gt=ultimo).order_by("id").values_list("id", flat=True)[:BLOQUE]
+        )
+        if not ids:
+            break
+        MovimientoPendiente.objects.bulk_create(
+            [MovimientoPendiente(proceso=PROCESO, movimiento_id=i) for i in ids], ignore_conflicts=True
+        )
+        ultimo = ids[-1]
+    MarcaProceso.objects.filter(nombre=MARCA).delete()
+
+
+def pendientes_a_marca(apps, schema_editor):
+    """Vuelta atrás: la marca queda justo antes del primer pendiente."""
+    MarcaProceso = apps.get_model("reports", "MarcaProceso")
+    MovimientoInventario = apps.get_model("transactional", "MovimientoInventario")
+    MovimientoPendiente = apps.get_model("transactional", "MovimientoPendiente")
+
+    pendientes = MovimientoPendiente.objects.filter(proceso=PROCESO)
+    primero = pendientes.order_by("movimiento_id").values_list("movimiento_id", flat=True).first()
+    if primero is None:
+        ultimo = MovimientoInventario.objects.order_by("-id").values_list("id", flat=True).first() or 0
+    else:
+        ultimo = primero - 1
+    MarcaProceso.objects.update_or_create(nombre=MARCA, defaults={"ultimo_id": ultimo})
+    pendientes.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0005_metricas_pendientes"),
+        ("transactional", "0009_movimiento_pendiente"),
+    ]
+
+    operations = [
+        migrations.RunPython(marca_a_pendientes, pendientes_a_marca),
+    ]
@@ -0,0 +1,147 @@
+from django.db import models
+
+from apps.products.models import Producto
+from apps.transactional.models import Bodega
+
+
+class ValorizacionCierre(models.Model):
+    """
+    Cabecera de una valorización de inventario ya calculada para un mes
+    cerrado (periodo AAAAMM) y un método de costeo. Las líneas guardan el
+    estado de cierre por (producto, bodega), que además sirve de punto de
+    partida para calcular el mes siguiente sin releer toda la historia.
+    """
+    METODO_PROMEDIO = "PROMEDIO"
+    METODO_FIFO = "FIFO"
+    METODOS = (
+        (METODO_PROMEDIO, "Costo promedio ponderado"),
+        (METODO_FIFO, "FIFO"),
+    )
+
+    periodo = models.PositiveIntegerField()  # AAAAMM
+    metodo = models.CharField(max_length=10, choices=METODOS)
+    calculado_en = models.DateTimeField(auto_now=True)
+    movimientos = models.PositiveIntegerField(default=0)  # procesados en este cálculo
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["periodo", "metodo"], name="uniq_valorizacion_periodo_metodo"),
+        ]
+        ordering = ("-periodo", "metodo")
+
+    def __str__(self):
+        return f"{self.periodo} {self.metodo}"
+
+
+class ValorizacionLinea(models.Model):
+    cierre = models.ForeignKey(ValorizacionCierre, on_delete=models.CASCADE, related_name="lineas")
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name="+")
+    bodega = models.ForeignKey(Bodega, on_delete=models.CASCADE, related_name="+")
+    cantidad = models.DecimalField(max_digits=14, decimal_places=3)
+    valor = models.DecimalField(max_digits=18, decimal_places=4)
+    # Sólo FIFO: capas abiertas [[cantidad, costo_unitario], ...] como texto
+    capas = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["cierre", "producto", "bodega"], name="uniq_valorizacion_linea"),
+        ]
+
+    def __str__(self):
+        return f"{self.cierre} {self.producto_id}@{self.bodega_id} = {self.valor}"
+
+
+class ResumenMensualProducto(models.Model):
+    """Cantidades movidas por producto y mes (AAAAMM), acumuladas incrementalmente."""
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name="+")
+    periodo = models.PositiveIntegerField()
+    ingresos = models.DecimalField(max_digits=16, decimal_places=3, default=0)
+    salidas = models.DecimalField(max_digits=16, decimal_places=3, default=0)
+    devoluciones = models.DecimalField(max_digits=16, decimal_places=3, default=0)
+    movimientos = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["producto", "periodo"], name="uniq_resumen_producto_periodo"),
+        ]
+        indexes = [
+            models.Index(fields=["periodo"], name="resumen_periodo_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.producto_id} {self.periodo}"
+
+
+class AnalisisProducto(models.Model):
+    """Clase ABC, rotación y estacionalidad por producto (últimos 12 meses)."""
+    CLASES = (("A", "A"), ("B", "B"), ("C", "C"))
+
+    producto = models.OneToOneField(Producto, on_delete=models.CASCADE, primary_key=True, related_name="analisis")
+    categoria_id = models.BigIntegerField(null=True, db_index=True)  # copia para agrupar sin JOIN
+    clase_abc = models.CharField(max_length=1, choices=CLASES, db_index=True)
+    salidas_12m = models.DecimalField(max_digits=16, decimal_places=3, default=0)
+    valor_12m = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    participacion = models.DecimalField(max_digits=7, decimal_places=4, default=0)  # % del valor total
+    stock_actual = models.DecimalField(max_digits=16, decimal_places=3, default=0)
+    rotacion = models.DecimalField(max_digits=12, decimal_places=2, null=True)  # veces al año
+    dias_inventario = models.PositiveIntegerField(null=True)
+    mes_pico = models.PositiveSmallIntegerField(null=True)  # 1..12
+    estacionalidad = models.DecimalField(max_digits=8, decimal_places=3, null=True)  # coef. de variación mensual
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.producto_id} {self.clase_abc}"
+
+
+class MetricaDiaria(models.Model):
+    """Movimientos y cantidad por día (hora local) y tipo, mantenidos incrementalmente."""
+    fecha = models.DateField()
+    tipo = models.CharField(max_length=20)
+    movimientos = models.PositiveIntegerField(default=0)
+    cantidad = models.DecimalField(max_digits=16, decimal_places=3, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["fecha", "tipo"], name="uniq_metrica_fecha_tipo"),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} {self.tipo}: {self.movimientos}"
+
+
+class MovimientoDiario(models.Model):
+    """
+    Cantidad y número de movimientos por día (hora local), producto, bodega
+    y tipo, mantenidos incrementalmente (ver apps.reports.diario). La bodega
+    es la que el movimiento afecta primero: origen en SALIDA y
+    TRANSFERENCIA, destino en el resto.
+    """
+    fecha = models.DateField()
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name="+")
+    bodega = models.ForeignKey(Bodega, on_delete=models.CASCADE, null=True, related_name="+")
+    tipo = models.CharField(max_length=20)
+    cantidad_total = models.DecimalField(max_digits=18, decimal_places=3, default=0)
+    n_movimientos = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["fecha", "producto", "bodega", "tipo"], name="uniq_movdiario"),
+        ]
+        indexes = [
+            # Consumo / top por tipo en una ventana de días; historia de un producto
+            models.Index(fields=["tipo", "fecha"], name="movdiario_tipo_fecha_idx"),
+            models.Index(fields=["producto", "fecha"], name="movdiario_prod_fecha_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} {self.producto_id}@{self.bodega_id} {self.tipo}: {self.cantidad_total}"
+
+
+class Indicador(models.Model):
+    """KPI precalculado (clave -> valor JSON) que el dashboard lee sin agregar en vivo."""
+    clave = models.CharField(max_length=60, unique=True)
+    valor = models.JSONField(default=dict)
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.clave
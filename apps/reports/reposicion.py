@@ -0,0 +1,162 @@
+# apps/reports/reposicion.py
+"""
+Motor de sugerencias de reposición.
+
+Para todo el catálogo activo, con un puñado de consultas agregadas
+(no una por producto):
+  1. consumo: salidas por producto en la ventana, desde el rollup diario
+     (MovimientoDiario), no desde los movimientos
+  2. stock actual: SUM(cantidad) de Stock por producto
+  3. parámetros del producto (mínimo, máximo, punto de reorden)
+  4. proveedor a usar por producto (preferente o, si no hay, el más barato)
+
+Reglas:
+  consumo_diario = salidas de la ventana / días de la ventana
+  punto          = max(punto_reorden, consumo_diario * lead_time + stock_minimo)
+  objetivo       = stock_maximo o, si no está definido,
+                   punto + consumo_diario * dias_objetivo
+  sugerido       = objetivo - stock, redondeado hacia arriba a minimo_lote
+Se sugiere comprar sólo si stock <= punto.
+"""
+from datetime import timedelta
+from decimal import ROUND_CEILING, Decimal
+
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.products.models import Producto
+from apps.suppliers.models import ProveedorProducto
+from apps.transactional.models import MovimientoInventario, Stock
+
+from .diario import totales
+
+CERO = Decimal("0")
+CIEN = Decimal("100")
+LEAD_TIME_SIN_PROVEEDOR = 7  # días, igual al default de ProveedorProducto
+
+VENTANA_DIAS = 90
+DIAS_OBJETIVO = 30
+CACHE_TTL = 15 * 60  # segundos
+
+
+def acotar(ventana_dias, dias_objetivo):
+    """Rangos admitidos por la página y el comando (ventana 7..365, objetivo 1..180)."""
+    return max(7, min(ventana_dias, 365)), max(1, min(dias_objetivo, 180))
+
+
+def _cache_key(ventana_dias, dias_objetivo):
+    return f"reports:reposicion:{ventana_dias}:{dias_objetivo}"
+
+
+def _redondear_a_lote(cantidad, lote):
+    if not lote or lote <= 0:
+        return cantidad.quantize(Decimal("0.001"), rounding=ROUND_CEILING)
+    return (cantidad / lote).to_integral_value(rounding=ROUND_CEILING) * lote
+
+
+def calcular_reposicion(ventana_dias=VENTANA_DIAS, dias_objetivo=DIAS_OBJETIVO):
+    """
+    Devuelve la lista de sugerencias (dicts), sólo productos bajo su punto
+    de reorden, ordenada por días de cobertura (los más urgentes primero).
+    """
+    desde = timezone.localdate() - timedelta(days=ventana_dias - 1)
+    dias = Decimal(ventana_dias)
+
+    consumo = dict(
+        totales(MovimientoInventario.TIPO_SALIDA, desde).values_list("producto_id", "cantidad")
+    )
+    stock = dict(
+        Stock.objects.values("producto_id")
+        .annotate(total=Sum("cantidad"))
+        .order_by()
+        .values_list("producto_id", "total")
+    )
+
+    # Preferente primero; si no hay, el de menor costo
+    proveedores = {}
+    filas = ProveedorProducto.objects.filter(producto__activo=True).values_list(
+        "producto_id", "proveedor_id", "proveedor__razon_social",
+        "costo", "descuento_porcentaje", "lead_time_dias", "minimo_lote",
+    ).order_by("producto_id", "-preferente", "costo")
+    for producto_id, proveedor_id, razon_social, costo, descuento, lead, lote in filas.iterator(chunk_size=2000):
+        if producto_id in proveedores:
+            continue
+        proveedores[producto_id] = {
+            "proveedor_id": proveedor_id,
+            "proveedor": razon_social,
+            "costo": costo * (CIEN - (descuento or CERO)) / CIEN,
+            "lead_time_dias": lead,
+            "minimo_lote": lote,
+        }
+
+    productos = Producto.objects.filter(activo=True).values_list(
+        "id", "sku", "nombre", "stock_minimo", "stock_maximo", "punto_reorden", "costo_estandar",
+    )
+
+    sugerencias = []
+    for pid, sku, nombre, minimo, maximo, reorden, costo_estandar in productos.iterator(chunk_size=2000):
+        actual = stock.get(pid) or CERO
+        consumo_diario = (consumo.get(pid) or CERO) / dias
+        prov = proveedores.get(pid)
+        lead = prov["lead_time_dias"] if prov else LEAD_TIME_SIN_PROVEEDOR
+
+        punto = max(reorden or CERO, consumo_diario * lead + (minimo or CERO))
+        if actual > punto or punto <= 0:
+            continue
+
+        objetivo = maximo if maximo is not None else punto + consumo_diario * dias_objetivo
+        faltante = objetivo - actual
+        if faltante <= 0:
+            continue
+        sugerido = _redondear_a_lote(faltante, prov["minimo_lote"] if prov else None)
+
+        costo_unitario = prov["costo"] if prov else costo_estandar
+        sugerencias.append({
+            "producto_id": pid,
+            "sku": sku,
+            "producto": nombre,
+            "stock": actual,
+            "consumo_diario": consumo_diario.quantize(Decimal("0.001")),
+            "dias_cobertura": int(actual / consumo_diario) if consumo_diario > 0 else None,
+            "punto_reorden": punto.quantize(Decimal("0.001")),
+            "objetivo": objetivo.quantize(Decimal("0.001")),
+            "sugerido": sugerido,
+            "proveedor_id": prov["proveedor_id"] if prov else None,
+            "proveedor": prov["proveedor"] if prov else "",
+            "lead_time_dias": lead,
+            "costo_unitario": costo_unitario,
+            "costo_total": (sugerido * costo_unitario).quantize(Decimal("0.01")) if costo_unitario is not None else None,
+        })
+
+    # Sin consumo (cobertura None) al final
+    sugerencias.sort(key=lambda s: (s["dias_cobertura"] is None, s["dias_cobertura"] or 0, s["sku"]))
+    return sugerencias
+
+
+def reposicion_cacheada(ventana_dias=VENTANA_DIAS, dias_objetivo=DIAS_OBJETIVO, recalcular=False):
+    """Devuelve (sugerencias, calculado_en) desde cache; recalcula si no hay o si se pide."""
+    key = _cache_key(ventana_dias, dias_objetivo)
+    data = None if recalcular else cache.get(key)
+    if data is None:
+        data = {
+            "sugerencias": calcular_reposicion(ventana_dias, dias_objetivo),
+            "calculado_en": timezone.now(),
+        }
+        cache.set(key, data, CACHE_TTL)
+    return data["sugerencias"], data["calculado_en"]
+
+
+def agrupar_por_proveedor(sugerencias):
+    """[{proveedor, proveedor_id, items: [...], total}] ordenado por total."""
+    grupos = {}
+    for s in sugerencias:
+        g = grupos.setdefault(s["proveedor_id"], {
+            "proveedor_id": s["proveedor_id"],
+            "proveedor": s["proveedor"] or "Sin proveedor asignado",
+            "items": [],
+            "total": CERO,
+        })
+        g["items"].append(s)
+        g["total"] += s["costo_total"] or CERO
+    return sorted(grupos.values(), key=lambda g: (g["proveedor_id"] is None, -g["total"]))
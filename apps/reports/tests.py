@@ -0,0 +1,149 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import skipIf
+
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.products.models import Categoria, Producto
+from apps.transactional.models import Bodega, MovimientoArchivo, MovimientoInventario, MovimientoPendiente
+
+from . import analitica, diario, kpis
+from .models import MetricaDiaria, MovimientoDiario, ResumenMensualProducto
+from .valorizacion import PoolFIFO, PoolPromedio, periodo_de
+
+
+class BaseMovimientos(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="General")
+        cls.producto = Producto.objects.create(sku="SKU-1", nombre="Producto", categoria=categoria)
+        cls.bodega = Bodega.objects.create(nombre="Central")
+
+    def crear(self, tipo, cantidad):
+        origen = self.bodega if tipo in ("SALIDA", "TRANSFERENCIA") else None
+        destino = None if origen else self.bodega
+        return MovimientoInventario.objects.create(
+            tipo=tipo, producto=self.producto, cantidad=Decimal(cantidad),
+            bodega_origen=origen, bodega_destino=destino,
+        )
+
+    def archivar(self, id, tipo, cantidad, fecha, producto_id=None):
+        return MovimientoArchivo.objects.create(
+            id=id, tipo=tipo, cantidad=Decimal(cantidad), fecha=fecha, periodo=periodo_de(fecha),
+            sku="SKU-1", producto_nombre="Producto",
+            producto_id=producto_id or self.producto.id, bodega_destino_id=self.bodega.id,
+        )
+
+
+# ================================================================
+# COLA DE PENDIENTES
+# ================================================================
+
+class PendientesTests(BaseMovimientos):
+
+    def test_cada_movimiento_queda_pendiente_de_cada_proceso(self):
+        mov = self.crear("INGRESO", "5")
+        self.assertEqual(
+            sorted(MovimientoPendiente.objects.filter(movimiento=mov).values_list("proceso", flat=True)),
+            sorted(MovimientoPendiente.PROCESOS),
+        )
+
+    def test_metricas_suman_una_sola_vez(self):
+        self.crear("INGRESO", "5")
+        self.crear("INGRESO", "2.5")
+        self.crear("SALIDA", "1")
+
+        self.assertEqual(kpis.actualizar_metricas_diarias(), 3)
+        self.assertEqual(kpis.actualizar_metricas_diarias(), 0)
+
+        hoy = timezone.localdate()
+        ingreso = MetricaDiaria.objects.get(fecha=hoy, tipo="INGRESO")
+        self.assertEqual((ingreso.movimientos, ingreso.cantidad), (2, Decimal("7.5")))
+        self.assertFalse(MovimientoPendiente.objects.filter(proceso=MovimientoPendiente.METRICAS).exists())
+        # Los demás procesos conservan sus pendientes
+        self.assertEqual(MovimientoPendiente.objects.filter(proceso=MovimientoPendiente.DIARIO).count(), 3)
+
+    def test_solo_los_movimientos_indicados(self):
+        primero = self.crear("INGRESO", "5")
+        self.crear("INGRESO", "2")
+        self.assertEqual(kpis.actualizar_metricas_diarias([primero.id]), 1)
+        self.assertEqual(MovimientoPendiente.objects.filter(proceso=MovimientoPendiente.METRICAS).count(), 1)
+
+    def test_rollup_diario_y_verificacion(self):
+        self.crear("INGRESO", "5")
+        self.crear("SALIDA", "2")
+        self.assertEqual(diario.actualizar_movimiento_diario(), 2)
+
+        fila = MovimientoDiario.objects.get(tipo="SALIDA")
+        self.assertEqual((fila.bodega_id, fila.n_movimientos, fila.cantidad_total), (self.bodega.id, 1, Decimal("2")))
+        self.assertEqual(diario.verificar_movimiento_diario(), [])
+
+
+# ================================================================
+# RECONSTRUCCIONES (INCLUYEN EL ARCHIVO)
+# ================================================================
+
+class ReconstruccionTests(BaseMovimientos):
+
+    def setUp(self):
+        self.antes = timezone.now() - timedelta(days=400)
+        self.archivar(10_000_001, "INGRESO", "4", self.antes)
+        self.archivar(10_000_002, "INGRESO", "6", self.antes, producto_id=999_999)  # producto ya borrado
+        self.crear("INGRESO", "5")
+        MovimientoPendiente.objects.all().delete()  # ya sumado por todos los procesos
+
+    def test_metricas_cuentan_todo_el_archivo(self):
+        kpis.reconstruir_metricas_diarias()
+        self.assertEqual(
+            MetricaDiaria.objects.aggregate(n=Sum("movimientos"), total=Sum("cantidad")),
+            {"n": 3, "total": Decimal("15")},
+        )
+
+    def test_rollup_diario_omite_lo_borrado(self):
+        diario.reconstruir_movimiento_diario()
+        self.assertEqual(MovimientoDiario.objects.aggregate(n=Sum("n_movimientos"))["n"], 2)
+
+    @skipIf(analitica.np is None, "requiere numpy")
+    def test_resumen_mensual_incluye_el_archivo(self):
+        analitica.reconstruir_resumen_mensual()
+        periodos = dict(
+            ResumenMensualProducto.objects.filter(producto=self.producto).values_list("periodo", "ingresos")
+        )
+        self.assertEqual(periodos, {
+            periodo_de(timezone.localtime(self.antes)): Decimal("4"),
+            periodo_de(timezone.localtime()): Decimal("5"),
+        })
+
+    def test_los_pendientes_los_suma_la_actualizacion(self):
+        self.crear("SALIDA", "1")
+        kpis.reconstruir_metricas_diarias()
+        self.assertEqual(MetricaDiaria.objects.aggregate(n=Sum("movimientos"))["n"], 3)
+        self.assertEqual(kpis.actualizar_metricas_diarias(), 1)
+        self.assertEqual(MetricaDiaria.objects.aggregate(n=Sum("movimientos"))["n"], 4)
+
+
+# ================================================================
+# VALORIZACIÓN
+# ================================================================
+
+class PoolsTests(SimpleTestCase):
+
+    def test_promedio_ponderado(self):
+        pool = PoolPromedio()
+        pool.entrar(Decimal("10"), Decimal("100"))
+        pool.entrar(Decimal("10"), Decimal("200"))
+        self.assertEqual(pool.salir(Decimal("5")), [(Decimal("5"), Decimal("150"))])
+        self.assertEqual((pool.cantidad, pool.valor), (Decimal("15"), Decimal("2250")))
+        pool.salir(Decimal("99"))
+        self.assertEqual((pool.cantidad, pool.valor), (0, 0))
+
+    def test_fifo_sale_la_capa_mas_antigua(self):
+        pool = PoolFIFO()
+        pool.entrar(Decimal("3"), Decimal("10"))
+        pool.entrar(Decimal("3"), Decimal("20"))
+        self.assertEqual(pool.salir(Decimal("4")), [(Decimal("3"), Decimal("10")), (Decimal("1"), Decimal("20"))])
+        self.assertEqual(pool.capas(), [["2", "20"]])
+        self.assertEqual(pool.valor, Decimal("40"))
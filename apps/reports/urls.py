@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'reports'
+
+urlpatterns = [
+    path('', views.panel_view, name='panel'),
+    path('reposicion/', views.reposicion_view, name='reposicion'),
+    path('kpis.json', views.kpis_json, name='kpis'),
+]
@@ -0,0 +1,408 @@
+# apps/reports/valorizacion.py
+"""
+Motor de valorización de inventario al cierre de mes.
+
+- Recorre MovimientoInventario en orden (producto, fecha, id) con un
+  iterador por bloques: en memoria sólo hay un bloque de filas y un
+  pool por (producto, bodega), nunca toda la historia. Si el rango llega
+  a movimientos archivados (MovimientoArchivo) se leen con UNION ALL.
+- Cada (producto, bodega) es un pool de costo promedio ponderado o de
+  capas FIFO.
+- Los meses cerrados los guarda el comando valorizar_inventario en
+  ValorizacionCierre/ValorizacionLinea. El cálculo de un mes parte del
+  último cierre guardado y sólo lee los movimientos posteriores. El reporte
+  web no escribe: lo que no está guardado (mes en curso o cierre pendiente)
+  se calcula y se cachea unos minutos.
+- Aritmética Decimal, movimiento por movimiento, a propósito: cada
+  movimiento depende del estado del pool que dejó el anterior (costo
+  promedio vigente, capas FIFO, AJUSTE que fija la cantidad absoluta), así
+  que no se puede reescribir como operaciones por columna sobre un bloque,
+  y el valor en punto flotante (NumPy) no cuadraría al centavo con los
+  cierres guardados. Lo que sí se hace por bloques es la lectura.
+
+Costo de entrada de un INGRESO (el movimiento no trae costo propio):
+  1. ProveedorProducto del proveedor del movimiento (neto de descuento)
+  2. proveedor preferente del producto
+  3. Producto.costo_estandar
+  4. proveedor más barato
+  5. 0
+DEVOLUCION y AJUSTE positivo entran al costo vigente del pool.
+"""
+from collections import deque
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.products.models import Producto
+from apps.suppliers.models import ProveedorProducto
+from apps.transactional.archivo import limite_archivo
+from apps.transactional.models import Bodega, MovimientoArchivo, MovimientoInventario
+
+from .models import ValorizacionCierre, ValorizacionLinea
+
+CERO = Decimal("0")
+CIEN = Decimal("100")
+CUATRO_DECIMALES = Decimal("0.0001")
+
+BLOQUE = 5000  # filas por lectura del iterador
+CACHE_TTL = 300  # segundos (mes en curso o cierre no guardado)
+
+
+# ================================================================
+# PERIODOS (AAAAMM, hora local)
+# ================================================================
+
+def periodo_de(fecha):
+    return fecha.year * 100 + fecha.month
+
+
+def periodo_anterior(periodo):
+    anio, mes = divmod(periodo, 100)
+    return (anio - 1) * 100 + 12 if mes == 1 else periodo - 1
+
+
+def rango_periodo(periodo):
+    """(inicio, fin) aware del mes; 'fin' es exclusivo (primer instante del mes siguiente)."""
+    anio, mes = divmod(periodo, 100)
+    siguiente = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    inicio = timezone.make_aware(datetime.combine(datetime(anio, mes, 1), time.min))
+    fin = timezone.make_aware(datetime.combine(datetime(*siguiente, 1), time.min))
+    return inicio, fin
+
+
+def periodo_valido(periodo):
+    anio, mes = divmod(periodo, 100)
+    return 1 <= mes <= 12 and 2000 <= anio <= 2999
+
+
+# ================================================================
+# POOLS DE COSTO
+# ================================================================
+
+class PoolPromedio:
+    """Costo promedio ponderado móvil."""
+    __slots__ = ("cantidad", "valor")
+
+    def __init__(self, cantidad=CERO, valor=CERO):
+        self.cantidad = cantidad
+        self.valor = valor
+
+    def costo_unitario(self):
+        return self.valor / self.cantidad if self.cantidad > 0 else None
+
+    def entrar(self, cantidad, costo):
+        self.cantidad += cantidad
+        self.valor += cantidad * costo
+
+    def salir(self, cantidad):
+        """Descuenta y devuelve [(cantidad, costo_unitario)] de lo que salió."""
+        sale = min(cantidad, self.cantidad)
+        if sale <= 0:
+            return []
+        costo = self.valor / self.cantidad
+        if sale == self.cantidad:
+            valor = self.valor  # sin residuos de redondeo al vaciar
+        else:
+            valor = sale * costo
+        self.cantidad -= sale
+        self.valor -= valor
+        return [(sale, costo)]
+
+    def capas(self):
+        return []
+
+
+class PoolFIFO:
+    """Capas FIFO [cantidad, costo_unitario]; sale primero la más antigua."""
+    __slots__ = ("_capas",)
+
+    def __init__(self, capas=()):
+        self._capas = deque([cantidad, costo] for cantidad, costo in capas)
+
+    @property
+    def cantidad(self):
+        return sum((c[0] for c in self._capas), CERO)
+
+    @property
+    def valor(self):
+        return sum((c[0] * c[1] for c in self._capas), CERO)
+
+    def costo_unitario(self):
+        cantidad = self.cantidad
+        if cantidad > 0:
+            return self.valor / cantidad
+        return self._capas[-1][1] if self._capas else None
+
+    def entrar(self, cantidad, costo):
+        if self._capas and self._capas[-1][1] == costo:
+            self._capas[-1][0] += cantidad
+        else:
+            self._capas.append([cantidad, costo])
+
+    def salir(self, cantidad):
+        salidas = []
+        while cantidad > 0 and self._capas:
+            capa = self._capas[0]
+            sale = min(capa[0], cantidad)
+            salidas.append((sale, capa[1]))
+            capa[0] -= sale
+            cantidad -= sale
+            if capa[0] <= 0:
+                self._capas.popleft()
+        return salidas
+
+    def capas(self):
+        return [[str(c), str(k)] for c, k in self._capas]
+
+
+def _nuevo_pool(metodo, linea=None):
+    if metodo == ValorizacionCierre.METODO_FIFO:
+        if linea is None:
+            return PoolFIFO()
+        return PoolFIFO((Decimal(c), Decimal(k)) for c, k in linea.capas)
+    if linea is None:
+        return PoolPromedio()
+    return PoolPromedio(linea.cantidad, linea.valor)
+
+
+# ================================================================
+# COSTOS DE REFERENCIA
+# ================================================================
+
+def cargar_costos():
+    """
+    Devuelve (por_proveedor, referencia):
+      por_proveedor[(proveedor_id, producto_id)] = costo neto
+      referencia[producto_id] = costo a usar si el movimiento no tiene proveedor
+    Dos consultas para todo el catálogo.
+    """
+    por_proveedor = {}
+    preferentes = {}
+    mas_baratos = {}
+    filas = ProveedorProducto.objects.values_list(
+        "proveedor_id", "producto_id", "costo", "descuento_porcentaje", "preferente"
+    ).order_by("producto_id", "costo")
+    for proveedor_id, producto_id, costo, descuento, preferente in filas.iterator(chunk_size=BLOQUE):
+        neto = costo * (CIEN - (descuento or CERO)) / CIEN
+        por_proveedor[(proveedor_id, producto_id)] = neto
+        mas_baratos.setdefault(producto_id, neto)
+        if preferente:
+            preferentes.setdefault(producto_id, neto)
+
+    estandar = dict(
+        Producto.objects.filter(costo_estandar__isnull=False).values_list("id", "costo_estandar")
+    )
+
+    referencia = dict(mas_baratos)
+    referencia.update(estandar)
+    referencia.update(preferentes)
+    return por_proveedor, referencia
+
+
+# ================================================================
+# CÁLCULO
+# ================================================================
+
+def _procesar(metodo, pools, desde, hasta):
+    """
+    Aplica los movimientos [desde, hasta) sobre 'pools' {(producto, bodega): pool}.
+    Devuelve la cantidad de movimientos leídos.
+    """
+    por_proveedor, referencia = cargar_costos()
+
+    columnas = (
+        "tipo", "producto_id", "proveedor_id", "bodega_origen_id", "bodega_destino_id", "cantidad", "fecha", "id",
+    )
+    rango = {"fecha__lt": hasta}
+    if desde is not None:
+        rango["fecha__gte"] = desde
+    filas = MovimientoInventario.objects.filter(**rango).values_list(*columnas)
+    # Sin un cierre previo que cubra el archivo, también se leen los movimientos archivados
+    limite = limite_archivo()
+    if limite is not None and (desde is None or desde <= limite):
+        filas = filas.union(MovimientoArchivo.objects.filter(**rango).values_list(*columnas), all=True)
+    filas = filas.order_by("producto_id", "fecha", "id")
+
+    def pool(producto_id, bodega_id):
+        clave = (producto_id, bodega_id)
+        p = pools.get(clave)
+        if p is None:
+            p = pools[clave] = _nuevo_pool(metodo)
+        return p
+
+    leidos = 0
+    for tipo, producto_id, proveedor_id, origen_id, destino_id, cantidad, _, _ in filas.iterator(chunk_size=BLOQUE):
+        leidos += 1
+
+        if tipo == MovimientoInventario.TIPO_INGRESO:
+            bodega_id = destino_id or origen_id
+            costo = por_proveedor.get((proveedor_id, producto_id))
+            if costo is None:
+                costo = referencia.get(producto_id, CERO)
+            pool(producto_id, bodega_id).entrar(cantidad, costo)
+
+        elif tipo == MovimientoInventario.TIPO_DEVOLUCION:
+            p = pool(producto_id, destino_id or origen_id)
+            costo = p.costo_unitario()
+            p.entrar(cantidad, referencia.get(producto_id, CERO) if costo is None else costo)
+
+        elif tipo == MovimientoInventario.TIPO_SALIDA:
+            pool(producto_id, origen_id).salir(cantidad)
+
+        elif tipo == MovimientoInventario.TIPO_TRANSFERENCIA:
+            destino = pool(producto_id, destino_id)
+            for sale, costo in pool(producto_id, origen_id).salir(cantidad):
+                destino.entrar(sale, costo)
+
+        elif tipo == MovimientoInventario.TIPO_AJUSTE:
+            # AJUSTE fija la cantidad absoluta de la bodega
+            p = pool(producto_id, destino_id or origen_id)
+            diferencia = cantidad - p.cantidad
+            if diferencia > 0:
+                costo = p.costo_unitario()
+                p.entrar(diferencia, referencia.get(producto_id, CERO) if costo is None else costo)
+            elif diferencia < 0:
+                p.salir(-diferencia)
+
+    return leidos
+
+
+def _lineas_desde_pools(pools):
+    lineas = []
+    for (producto_id, bodega_id), p in pools.items():
+        cantidad = p.cantidad
+        valor = p.valor
+        if not cantidad and not valor:
+            continue
+        lineas.append({
+            "producto_id": producto_id,
+            "bodega_id": bodega_id,
+            "cantidad": cantidad,
+            "valor": valor.quantize(CUATRO_DECIMALES),
+            "capas": p.capas(),
+        })
+    return lineas
+
+
+def _lineas_guardadas(cierre):
+    return [
+        {"producto_id": p, "bodega_id": b, "cantidad": c, "valor": v, "capas": k}
+        for p, b, c, v, k in cierre.lineas.values_list("producto_id", "bodega_id", "cantidad", "valor", "capas")
+    ]
+
+
+def calcular_valorizacion(periodo, metodo=ValorizacionCierre.METODO_PROMEDIO, recalcular=False, guardar=False):
+    """
+    Valorización al cierre del mes 'periodo' (AAAAMM).
+    Devuelve una lista de dicts {producto_id, bodega_id, cantidad, valor, capas}.
+    Los cierres guardados se reutilizan. 'guardar' persiste el cierre de un
+    mes ya terminado (comandos); sin él sólo se cachea. 'recalcular' descarta
+    el cierre de ese mes y de los posteriores (dependen de él) y lo vuelve a
+    guardar.
+    """
+    inicio, fin = rango_periodo(periodo)
+    cerrado = fin <= timezone.now()
+    cache_key = f"reports:valorizacion:{periodo}:{metodo}"
+
+    if recalcular:
+        ValorizacionCierre.objects.filter(metodo=metodo, periodo__gte=periodo).delete()
+        guardar = True
+    else:
+        if cerrado:
+            cierre = ValorizacionCierre.objects.filter(periodo=periodo, metodo=metodo).first()
+            if cierre:
+                return _lineas_guardadas(cierre)
+        lineas = None if guardar else cache.get(cache_key)
+        if lineas is not None:
+            return lineas
+
+    # Punto de partida: el último cierre guardado anterior a este mes
+    pools = {}
+    desde = None
+    base = (
+        ValorizacionCierre.objects.filter(metodo=metodo, periodo__lt=periodo)
+        .order_by("-periodo")
+        .first()
+    )
+    if base:
+        for linea in base.lineas.all().iterator(chunk_size=BLOQUE):
+            pools[(linea.producto_id, linea.bodega_id)] = _nuevo_pool(metodo, linea)
+        desde = rango_periodo(base.periodo)[1]
+
+    leidos = _procesar(metodo, pools, desde, fin)
+    lineas = _lineas_desde_pools(pools)
+
+    if not (cerrado and guardar):
+        cache.set(cache_key, lineas, CACHE_TTL)
+        return lineas
+
+    with transaction.atomic():
+        cierre, _ = ValorizacionCierre.objects.update_or_create(
+            periodo=periodo, metodo=metodo, defaults={"movimientos": leidos}
+        )
+        cierre.lineas.all().delete()
+        ValorizacionLinea.objects.bulk_create(
+            [ValorizacionLinea(cierre=cierre, **linea) for linea in lineas],
+            batch_size=1000,
+        )
+    cache.delete(cache_key)
+    return lineas
+
+
+# ================================================================
+# RESÚMENES PARA EL REPORTE
+# ================================================================
+
+def resumir(lineas):
+    """
+    Agrupa las líneas por bodega y por categoría y arma el detalle con
+    nombres. Dos consultas (bodegas y productos involucrados).
+    """
+    bodegas = dict(Bodega.objects.values_list("id", "nombre"))
+    productos = {
+        pid: (sku, nombre, categoria)
+        for pid, sku, nombre, categoria in Producto.objects.filter(
+            id__in={l["producto_id"] for l in lineas}
+        ).values_list("id", "sku", "nombre", "categoria__nombre")
+    }
+
+    por_bodega = {}
+    por_categoria = {}
+    detalle = []
+    total = CERO
+    for l in lineas:
+        sku, nombre, categoria = productos.get(l["producto_id"], ("", "", ""))
+        bodega = bodegas.get(l["bodega_id"], "")
+        valor = l["valor"]
+        total += valor
+
+        fila_b = por_bodega.setdefault(bodega, {"nombre": bodega, "cantidad": CERO, "valor": CERO})
+        fila_b["cantidad"] += l["cantidad"]
+        fila_b["valor"] += valor
+        fila_c = por_categoria.setdefault(categoria, {"nombre": categoria or "-", "cantidad": CERO, "valor": CERO})
+        fila_c["cantidad"] += l["cantidad"]
+        fila_c["valor"] += valor
+
+        detalle.append({
+            "sku": sku,
+            "producto": nombre,
+            "categoria": categoria or "-",
+            "bodega": bodega,
+            "cantidad": l["cantidad"],
+            "valor": valor,
+            "costo_unitario": (valor / l["cantidad"]).quantize(CUATRO_DECIMALES) if l["cantidad"] else None,
+        })
+
+    def ordenar(filas):
+        return sorted(filas, key=lambda f: f["valor"], reverse=True)
+
+    detalle.sort(key=lambda d: (d["categoria"], d["producto"], d["bodega"]))
+    return {
+        "por_bodega": ordenar(por_bodega.values()),
+        "por_categoria": ordenar(por_categoria.values()),
+        "detalle": detalle,
+        "total": total,
+    }
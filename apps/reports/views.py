@@ -0,0 +1,169 @@
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+from lilis_erp.roles import require_roles
+
+from .kpis import payload_kpis
+from .models import ValorizacionCierre
+from .reposicion import DIAS_OBJETIVO, VENTANA_DIAS, acotar, agrupar_por_proveedor, reposicion_cacheada
+from .valorizacion import (
+    calcular_valorizacion,
+    periodo_anterior,
+    periodo_de,
+    periodo_valido,
+    resumir,
+)
+
+# Excel
+try:
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+except ImportError:
+    Workbook = None
+
+
+def _leer_periodo(texto):
+    """'AAAA-MM' (input type=month) -> AAAAMM o None."""
+    try:
+        anio, mes = (texto or "").split("-", 1)
+        periodo = int(anio) * 100 + int(mes)
+    except ValueError:
+        return None
+    return periodo if periodo_valido(periodo) else None
+
+
+# ==============================================================
+#               PANEL DE REPORTES (FINANZAS)
+# ==============================================================
+@login_required
+@require_roles("ADMIN", "FINANZAS")
+def panel_view(request):
+    # Por defecto: último mes cerrado
+    periodo = _leer_periodo(request.GET.get("periodo")) or periodo_anterior(periodo_de(timezone.localdate()))
+    metodo = (request.GET.get("metodo") or "").upper()
+    if metodo not in dict(ValorizacionCierre.METODOS):
+        metodo = ValorizacionCierre.METODO_PROMEDIO
+    export = (request.GET.get("export") or "").strip()
+
+    resumen = resumir(calcular_valorizacion(periodo, metodo))
+    periodo_texto = f"{periodo // 100:04d}-{periodo % 100:02d}"
+
+    # --- Exportar Excel ---
+    if export == "xlsx":
+        if Workbook is None:
+            return HttpResponse("Falta dependencia: pip install openpyxl", status=500)
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Por bodega"
+        ws.append(["Bodega", "Cantidad", "Valor"])
+        for f in resumen["por_bodega"]:
+            ws.append([f["nombre"], f["cantidad"], f["valor"]])
+
+        ws_cat = wb.create_sheet("Por categoría")
+        ws_cat.append(["Categoría", "Cantidad", "Valor"])
+        for f in resumen["por_categoria"]:
+            ws_cat.append([f["nombre"], f["cantidad"], f["valor"]])
+
+        ws_det = wb.create_sheet("Detalle")
+        ws_det.append(["SKU", "Producto", "Categoría", "Bodega", "Cantidad", "Costo unitario", "Valor"])
+        for d in resumen["detalle"]:
+            ws_det.append([
+                d["sku"], d["producto"], d["categoria"], d["bodega"],
+                d["cantidad"], d["costo_unitario"], d["valor"],
+            ])
+
+        for hoja in (ws, ws_cat, ws_det):
+            for col in hoja.columns:
+                max_len = max((len(str(cell.value)) for cell in col if cell.value), default=0)
+                hoja.column_dimensions[get_column_letter(col[0].column)].width = max_len + 2
+
+        filename = f"valorizacion_{periodo}_{metodo.lower()}.xlsx"
+        response = HttpResponse(
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        wb.save(response)
+        return response
+
+    return render(request, "reportes_panel.html", {
+        "periodo": periodo_texto,
+        "metodo": metodo,
+        "metodos": ValorizacionCierre.METODOS,
+        "por_bodega": resumen["por_bodega"],
+        "por_categoria": resumen["por_categoria"],
+        "total": resumen["total"],
+        "lineas": len(resumen["detalle"]),
+    })
+
+
+# ==============================================================
+#               SUGERENCIAS DE REPOSICIÓN
+# ==============================================================
+@login_required
+@require_roles("ADMIN", "COMPRAS", "INVENTARIO", "FINANZAS")
+def reposicion_view(request):
+    try:
+        ventana, dias_objetivo = acotar(
+            int(request.GET.get("ventana") or VENTANA_DIAS), int(request.GET.get("objetivo") or DIAS_OBJETIVO)
+        )
+    except ValueError:
+        ventana, dias_objetivo = VENTANA_DIAS, DIAS_OBJETIVO
+    export = (request.GET.get("export") or "").strip()
+
+    sugerencias, calculado_en = reposicion_cacheada(
+        ventana, dias_objetivo, recalcular=request.GET.get("recalcular") == "1"
+    )
+    grupos = agrupar_por_proveedor(sugerencias)
+
+    # --- Exportar Excel ---
+    if export == "xlsx":
+        if Workbook is None:
+            return HttpResponse("Falta dependencia: pip install openpyxl", status=500)
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Reposición"
+        ws.append([
+            "Proveedor", "SKU", "Producto", "Stock", "Consumo diario", "Días cobertura",
+            "Punto reorden", "Objetivo", "Sugerido", "Costo unitario", "Costo total",
+        ])
+        for g in grupos:
+            for s in g["items"]:
+                ws.append([
+                    g["proveedor"], s["sku"], s["producto"], s["stock"], s["consumo_diario"],
+                    s["dias_cobertura"], s["punto_reorden"], s["objetivo"], s["sugerido"],
+                    s["costo_unitario"], s["costo_total"],
+                ])
+
+        for col in ws.columns:
+            max_len = max((len(str(cell.value)) for cell in col if cell.value), default=0)
+            ws.column_dimensions[get_column_letter(col[0].column)].width = max_len + 2
+
+        filename = f"reposicion_{timezone.localdate():%Y%m%d}.xlsx"
+        response = HttpResponse(
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        wb.save(response)
+        return response
+
+    return render(request, "reportes_reposicion.html", {
+        "grupos": grupos,
+        "total_items": len(sugerencias),
+        "ventana": ventana,
+        "objetivo": dias_objetivo,
+        "calculado_en": calculado_en,
+    })
+
+
+# ==============================================================
+#               KPIs DEL DASHBOARD (JSON)
+# ==============================================================
+@login_required
+@require_roles("ADMIN", "FINANZAS")
+def kpis_json(request):
+    """Datos del dashboard desde tablas precalculadas (ver apps.reports.kpis)."""
+    return JsonResponse({"ok": True, **payload_kpis()})
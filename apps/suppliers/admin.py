@@ -1,5 +1,8 @@
 from django.contrib import admin
+from django.db import transaction
+from lilis_erp.admin_base import AdminEscalable, FiltroAutocomplete
 from .models import Proveedor, ProveedorProducto
+from .relaciones import invalidar_relaciones
 
 @admin.register(Proveedor)
 class ProveedorAdmin(admin.ModelAdmin):
@@ -19,8 +22,22 @@ class ProveedorAdmin(admin.ModelAdmin):
     readonly_fields = ("creado_en", "actualizado_en")
 
 @admin.register(ProveedorProducto)
-class ProveedorProductoAdmin(admin.ModelAdmin):
+class ProveedorProductoAdmin(AdminEscalable):
     list_display = ("producto", "proveedor", "costo", "lead_time_dias", "minimo_lote", "descuento_porcentaje", "preferente")
-    list_filter = ("preferente", "proveedor", "producto")
+    list_filter = ("preferente", ("proveedor", FiltroAutocomplete), ("producto", FiltroAutocomplete))
     search_fields = ("producto__nombre", "producto__sku", "proveedor__razon_social", "proveedor__rut_nif")
+    list_select_related = ("producto", "proveedor")
+    autocomplete_fields = ("producto", "proveedor")
     ordering = ("producto__nombre", "proveedor__razon_social")
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        transaction.on_commit(invalidar_relaciones)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        transaction.on_commit(invalidar_relaciones)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        transaction.on_commit(invalidar_relaciones)
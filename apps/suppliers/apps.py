@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SuppliersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.suppliers'
+
+    def ready(self):
+        # Invalidación del panel de relaciones (ver signals.py)
+        from . import signals  # noqa: F401
@@ -0,0 +1,114 @@
+# apps/suppliers/busqueda.py
+"""
+Índice de búsqueda de proveedores (tabla ProveedorToken).
+
+En vez de 12 icontains por fila, cada proveedor guarda sus tokens
+normalizados y la búsqueda hace lookups por prefijo sobre un índice:
+- RUT normalizado (normalizar_rut) con y sin dígito verificador
+- palabras de razón social, fantasía, dirección, ciudad, país, contacto
+  y condiciones de pago, en minúscula y sin tildes
+- emails completos y sus partes
+- teléfonos sólo con dígitos (con y sin prefijo 56)
+Los tokens se actualizan en Proveedor.save().
+"""
+import re
+import unicodedata
+
+from django.db.models import Q
+
+from .validators import normalizar_rut
+
+LARGO_TOKEN = 100
+LARGO_MINIMO = 2
+
+CAMPOS_TEXTO = (
+    "razon_social", "nombre_fantasia", "direccion", "ciudad", "pais",
+    "contacto_principal_nombre", "condiciones_pago",
+)
+CAMPOS_EMAIL = ("email", "contacto_principal_email")
+CAMPOS_FONO = ("telefono", "contacto_principal_telefono")
+CAMPOS_INDEXADOS = ("rut_nif",) + CAMPOS_TEXTO + CAMPOS_EMAIL + CAMPOS_FONO
+
+_NO_ALFANUM = re.compile(r"[^0-9a-z]+")
+_NO_DIGITO = re.compile(r"\D+")
+_PARECE_RUT = re.compile(r"^[0-9.]{5,12}-?[0-9kK]?$")
+_PARECE_FONO = re.compile(r"^\+?[0-9()\-\s]{6,30}$")
+
+
+def normalizar_texto(valor: str) -> str:
+    """Minúscula y sin tildes ('Ñuñoa' -> 'nunoa')."""
+    valor = unicodedata.normalize("NFKD", valor or "")
+    return "".join(c for c in valor if not unicodedata.combining(c)).lower().strip()
+
+
+def _palabras(valor):
+    return [p for p in _NO_ALFANUM.split(normalizar_texto(valor)) if len(p) >= LARGO_MINIMO]
+
+
+def _digitos_fono(valor):
+    digitos = _NO_DIGITO.sub("", valor or "")
+    if len(digitos) < 6:
+        return []
+    salida = [digitos]
+    if digitos.startswith("56") and len(digitos) > 9:
+        salida.append(digitos[2:])
+    return salida
+
+
+def tokens_proveedor(datos) -> set:
+    """datos: instancia de Proveedor o dict con sus campos."""
+    valor = datos.get if isinstance(datos, dict) else (lambda campo: getattr(datos, campo, ""))
+
+    tokens = set()
+    rut = normalizar_rut(valor("rut_nif")).lower()
+    if rut:
+        tokens.add(rut)
+        if len(rut) > 1:
+            tokens.add(rut[:-1])  # sin DV: '12345678' encuentra '12.345.678-9'
+    for campo in CAMPOS_TEXTO:
+        tokens.update(_palabras(valor(campo)))
+    for campo in CAMPOS_EMAIL:
+        email = (valor(campo) or "").strip().lower()
+        if email:
+            tokens.add(email)
+            tokens.update(_palabras(email))
+    for campo in CAMPOS_FONO:
+        tokens.update(_digitos_fono(valor(campo)))
+    return {t[:LARGO_TOKEN] for t in tokens if t}
+
+
+def terminos_busqueda(q: str) -> list:
+    """Texto del buscador -> términos normalizados (todos deben coincidir)."""
+    q = (q or "").strip()
+    if not q:
+        return []
+    if _PARECE_RUT.match(q) and ("." in q or "-" in q or not _PARECE_FONO.match(q)):
+        return [normalizar_rut(q).lower()]
+    if _PARECE_FONO.match(q) and any(c in q for c in "+() -"):
+        digitos = _NO_DIGITO.sub("", q)
+        return [digitos[2:] if digitos.startswith("56") and len(digitos) > 9 else digitos]
+    if "@" in q:
+        return [q.lower()]
+    return _palabras(q) or [normalizar_texto(q)]
+
+
+def filtro_busqueda(q: str) -> Q:
+    """
+    Q para Proveedor: cada término debe ser prefijo de algún token.
+    Se usa istartswith: en MySQL genera LIKE 'x%' (usa el índice con la
+    collation *_ci); startswith generaría LIKE BINARY.
+    """
+    from .models import ProveedorToken
+
+    terminos = terminos_busqueda(q)
+    if not terminos:
+        return Q()
+
+    filtro = Q()
+    for termino in terminos:
+        filtro &= Q(id__in=ProveedorToken.objects.filter(token__istartswith=termino).values("proveedor_id"))
+
+    q = q.strip()
+    if q.isascii() and q.isdigit():  # isdigit() solo acepta '²' y otros que int() rechaza
+        filtro |= Q(id=int(q))
+    return filtro
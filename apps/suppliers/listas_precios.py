@@ -0,0 +1,235 @@
+# apps/suppliers/listas_precios.py
+"""
+Sincronización masiva de listas de precios de proveedores (ProveedorProducto).
+
+Una corrida procesa uno o varios archivos (CSV/XLSX) con filas
+rut, sku, costo, lead_time_dias, minimo_lote, descuento, preferente:
+  1. proveedores por RUT normalizado: una consulta
+  2. productos por SKU: una consulta IN
+  3. relaciones existentes de esos pares: una consulta
+  4. se compara en memoria -> agregados / modificados / sin cambios
+  5. preferente: se resuelve por conjunto (un preferente por producto)
+     y se quitan los anteriores con un único UPDATE
+  6. upsert con bulk_create(update_conflicts=True) sólo de lo que cambió
+Todo en una transacción (o nada, con simular=True).
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from apps.products.importador import a_booleano, a_decimal, a_texto, leer_archivo
+from apps.products.models import Producto
+
+from .models import Proveedor, ProveedorProducto
+from .relaciones import invalidar_relaciones
+from .validators import normalizar_rut
+
+BLOQUE = 1000
+MAX_ERRORES = 1000
+
+ALIAS = {
+    "rut": "rut",
+    "rut_nif": "rut",
+    "rut/nif": "rut",
+    "proveedor": "rut",
+    "sku": "sku",
+    "codigo": "sku",
+    "costo": "costo",
+    "precio": "costo",
+    "lead_time": "lead_time_dias",
+    "lead_time_dias": "lead_time_dias",
+    "minimo_lote": "minimo_lote",
+    "lote_minimo": "minimo_lote",
+    "descuento": "descuento_porcentaje",
+    "descuento_porcentaje": "descuento_porcentaje",
+    "preferente": "preferente",
+}
+
+
+def _columna(nombre):
+    return ProveedorProducto._meta.get_field(nombre)
+
+
+def _limpiar_fila(datos):
+    """
+    dict crudo -> (rut, sku, {campo: valor}).
+    Sólo trae las celdas con valor: una celda vacía conserva lo que ya
+    tiene la relación (o el default del modelo si es nueva).
+    """
+    errores = []
+    valores = {}
+
+    rut = normalizar_rut(a_texto(datos.get("rut")))
+    sku = a_texto(datos.get("sku")).upper()
+    if not rut:
+        errores.append("rut: obligatorio.")
+    if not sku:
+        errores.append("sku: obligatorio.")
+
+    try:
+        costo = a_decimal(datos.get("costo"), "costo", _columna("costo"))
+        if costo is not None:
+            valores["costo"] = costo
+        lote = a_decimal(datos.get("minimo_lote"), "minimo_lote", _columna("minimo_lote"))
+        if lote is not None:
+            if lote < Decimal("0.001"):
+                raise ValidationError("minimo_lote: debe ser mayor que 0.")
+            valores["minimo_lote"] = lote
+        desc = a_decimal(datos.get("descuento_porcentaje"), "descuento", _columna("descuento_porcentaje"))
+        if desc is not None:
+            if desc > 100:
+                raise ValidationError("descuento: 0 a 100%.")
+            valores["descuento_porcentaje"] = desc
+        lead = a_decimal(datos.get("lead_time_dias"), "lead_time_dias")
+        if lead is not None:
+            if lead != lead.to_integral_value() or lead > 365:
+                raise ValidationError("lead_time_dias: entero de 0 a 365.")
+            valores["lead_time_dias"] = int(lead)
+        if a_texto(datos.get("preferente")):
+            valores["preferente"] = a_booleano(datos["preferente"], "preferente")
+    except ValidationError as e:
+        errores.extend(e.messages)
+
+    if errores:
+        raise ValidationError(errores)
+    return rut, sku, valores
+
+
+def _distinto(actual, valores):
+    return any(getattr(actual, campo) != valor for campo, valor in valores.items())
+
+
+def sincronizar_listas(archivos, rut=None, simular=False):
+    """
+    archivos: [(archivo_binario, nombre)].
+    rut: RUT a usar cuando el archivo no trae esa columna.
+    Devuelve {"filas", "agregados", "modificados", "sin_cambios",
+              "preferentes_quitados", "con_error", "errores", "por_proveedor"}.
+    """
+    resultado = {
+        "filas": 0, "agregados": 0, "modificados": 0, "sin_cambios": 0,
+        "preferentes_quitados": 0, "con_error": 0, "errores": [],
+        "por_proveedor": defaultdict(lambda: {"agregados": 0, "modificados": 0, "sin_cambios": 0}),
+    }
+
+    def error(origen, numero, sku, mensaje):
+        resultado["con_error"] += 1
+        if len(resultado["errores"]) < MAX_ERRORES:
+            resultado["errores"].append({"archivo": origen, "fila": numero, "sku": sku, "error": mensaje})
+
+    # ---- Lectura y validación de formato ----
+    filas = []  # (origen, numero, rut, sku, valores)
+    for archivo, nombre in archivos:
+        obligatorias = ("sku",) if rut else ("rut", "sku")
+        for numero, datos in leer_archivo(archivo, nombre, alias=ALIAS, obligatorias=obligatorias):
+            resultado["filas"] += 1
+            if rut and not a_texto(datos.get("rut")):
+                datos["rut"] = rut
+            try:
+                filas.append((nombre, numero, *_limpiar_fila(datos)))
+            except ValidationError as e:
+                error(nombre, numero, a_texto(datos.get("sku")).upper(), " | ".join(e.messages))
+
+    # ---- Resolución en lote: proveedores y productos ----
+    proveedores = {
+        normalizar_rut(r): (pk, r)
+        for pk, r in Proveedor.objects.values_list("id", "rut_nif")
+    }
+    skus = {f[3] for f in filas}
+    productos = {}
+    lista = list(skus)
+    for i in range(0, len(lista), BLOQUE):
+        productos.update(Producto.objects.filter(sku__in=lista[i:i + BLOQUE]).values_list("sku", "id"))
+
+    pares = {}  # (proveedor_id, producto_id) -> (origen, numero, rut, sku, valores)
+    for origen, numero, rut_fila, sku, valores in filas:
+        prov = proveedores.get(rut_fila)
+        if prov is None:
+            error(origen, numero, sku, f"rut: proveedor no existe ({rut_fila}).")
+            continue
+        producto_id = productos.get(sku)
+        if producto_id is None:
+            error(origen, numero, sku, "sku: producto no encontrado.")
+            continue
+        clave = (prov[0], producto_id)
+        if clave in pares:
+            error(origen, numero, sku, f"repetido para el mismo proveedor (fila {pares[clave][1]}).")
+            continue
+        pares[clave] = (origen, numero, prov[1], sku, valores)
+
+    # ---- Un solo preferente por producto (por conjunto) ----
+    elegido = {}  # producto_id -> proveedor_id
+    for (proveedor_id, producto_id), (origen, numero, _, sku, valores) in list(pares.items()):
+        if not valores.get("preferente"):
+            continue
+        if producto_id in elegido:
+            error(origen, numero, sku, "preferente: otro proveedor del archivo ya es preferente para este producto.")
+            del pares[(proveedor_id, producto_id)]
+            continue
+        elegido[producto_id] = proveedor_id
+
+    # ---- Relaciones existentes (una consulta por bloque de productos) ----
+    existentes = {}
+    prov_ids = {p for p, _ in pares}
+    prod_ids = list({p for _, p in pares})
+    for i in range(0, len(prod_ids), BLOQUE):
+        for rel in ProveedorProducto.objects.filter(
+            proveedor_id__in=prov_ids, producto_id__in=prod_ids[i:i + BLOQUE]
+        ):
+            existentes[(rel.proveedor_id, rel.producto_id)] = rel
+
+    a_guardar = []
+    campos_usados = set()
+    for clave, (origen, numero, rut_prov, sku, valores) in pares.items():
+        actual = existentes.get(clave)
+        contador = resultado["por_proveedor"][rut_prov]
+        if actual is None:
+            if "costo" not in valores:
+                error(origen, numero, sku, "costo: obligatorio para una relación nueva.")
+                if elegido.get(clave[1]) == clave[0]:
+                    del elegido[clave[1]]
+                continue
+            a_guardar.append(ProveedorProducto(proveedor_id=clave[0], producto_id=clave[1], **valores))
+            resultado["agregados"] += 1
+            contador["agregados"] += 1
+        elif _distinto(actual, valores):
+            for campo, valor in valores.items():
+                setattr(actual, campo, valor)
+            actual.pk = None  # el upsert resuelve por (proveedor, producto), no por id
+            a_guardar.append(actual)
+            resultado["modificados"] += 1
+            contador["modificados"] += 1
+        else:
+            resultado["sin_cambios"] += 1
+            contador["sin_cambios"] += 1
+            continue
+        campos_usados.update(valores)
+
+    # Preferentes actuales de otros proveedores para los productos elegidos
+    quitar = []
+    elegidos = list(elegido)
+    for i in range(0, len(elegidos), BLOQUE):
+        for pk, producto_id, proveedor_id in ProveedorProducto.objects.filter(
+            producto_id__in=elegidos[i:i + BLOQUE], preferente=True
+        ).values_list("id", "producto_id", "proveedor_id"):
+            if elegido[producto_id] != proveedor_id:
+                quitar.append(pk)
+    resultado["preferentes_quitados"] = len(quitar)
+
+    resultado["por_proveedor"] = dict(resultado["por_proveedor"])
+    if simular or not (a_guardar or quitar):
+        return resultado
+
+    kwargs = {"update_conflicts": True, "update_fields": sorted(campos_usados) or ["costo"]}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = ["proveedor", "producto"]
+    with transaction.atomic():
+        # Primero se quitan los preferentes antiguos para no chocar con
+        # unico_proveedor_preferente_por_producto al insertar los nuevos.
+        for i in range(0, len(quitar), BLOQUE):
+            ProveedorProducto.objects.filter(id__in=quitar[i:i + BLOQUE]).update(preferente=False)
+        ProveedorProducto.objects.bulk_create(a_guardar, batch_size=BLOQUE, **kwargs)
+        transaction.on_commit(invalidar_relaciones)
+    return resultado
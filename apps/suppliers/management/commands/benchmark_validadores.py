@@ -0,0 +1,61 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.suppliers.validators import rut_chileno_valido, validar_columnas
+
+
+def _rut_aleatorio(rnd, valido=True):
+    cuerpo = str(rnd.randint(1_000_000, 99_999_999))
+    suma = sum(int(d) * p for d, p in zip(reversed(cuerpo), (2, 3, 4, 5, 6, 7, 2, 3)))
+    resto = 11 - (suma % 11)
+    dv = {11: "0", 10: "K"}.get(resto, str(resto))
+    if not valido:
+        dv = "0" if dv != "0" else "1"
+    return f"{int(cuerpo):,}".replace(",", ".") + "-" + dv
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el throughput (registros/s) de la validación de proveedores: "
+        "RUT uno a uno y la API por columnas (RUT + email + teléfono). "
+        "Con --minimo falla si la API por columnas queda bajo ese umbral."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--n", type=int, default=50000, help="Registros sintéticos (default 50000).")
+        parser.add_argument("--repeticiones", type=int, default=3, help="Se informa la mejor de N corridas.")
+        parser.add_argument("--minimo", type=int, default=0,
+                            help="Registros/s mínimos esperados para validar_columnas (0 = no verificar).")
+        parser.add_argument("--semilla", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        rnd = random.Random(opts["semilla"])
+        n = opts["n"]
+        ruts = [_rut_aleatorio(rnd, valido=rnd.random() > 0.05) for _ in range(n)]
+        emails = [f"contacto{i}@proveedor{i % 97}.cl" if i % 50 else f"malo{i}" for i in range(n)]
+        fonos = [f"+56 9 {rnd.randint(1000, 9999)} {rnd.randint(1000, 9999)}" for _ in range(n)]
+
+        def mejor(funcion):
+            tiempos = []
+            for _ in range(max(1, opts["repeticiones"])):
+                t0 = time.perf_counter()
+                funcion()
+                tiempos.append(time.perf_counter() - t0)
+            return min(tiempos)
+
+        t_rut = mejor(lambda: [rut_chileno_valido(r) for r in ruts])
+        t_columnas = mejor(lambda: validar_columnas(ruts=ruts, emails=emails, fonos=fonos))
+        errores = len(validar_columnas(ruts=ruts, emails=emails, fonos=fonos)["errores"])
+
+        tasa_columnas = n / t_columnas if t_columnas else float("inf")
+        self.stdout.write(f"rut_chileno_valido: {n / t_rut:,.0f} RUT/s ({t_rut * 1000:.1f} ms)")
+        self.stdout.write(
+            f"validar_columnas (rut+email+fono): {tasa_columnas:,.0f} registros/s "
+            f"({t_columnas * 1000:.1f} ms, {errores} filas con error)"
+        )
+
+        if opts["minimo"] and tasa_columnas < opts["minimo"]:
+            raise CommandError(f"Throughput {tasa_columnas:,.0f}/s bajo el mínimo {opts['minimo']:,}/s.")
+        self.stdout.write(self.style.SUCCESS("Benchmark terminado."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.suppliers.models import Proveedor
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye los tokens de búsqueda (ProveedorToken) de todos los proveedores. "
+        "Sólo hace falta tras cargas que no pasan por Proveedor.save() (SQL directo, bulk)."
+    )
+
+    def handle(self, *args, **opts):
+        n = 0
+        for proveedor in Proveedor.objects.iterator(chunk_size=500):
+            proveedor.reindexar()
+            n += 1
+        self.stdout.write(self.style.SUCCESS(f"Proveedores reindexados: {n}"))
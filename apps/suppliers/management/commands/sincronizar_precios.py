@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.account.utils import registrar_auditoria
+from apps.products.importador import ErrorImportacion
+from apps.suppliers.listas_precios import sincronizar_listas
+
+
+class Command(BaseCommand):
+    help = (
+        "Sincroniza listas de precios de proveedores (CSV/XLSX) en ProveedorProducto. "
+        "Columnas: rut, sku, costo, lead_time_dias, minimo_lote, descuento, preferente "
+        "(rut y sku obligatorias). Acepta varios archivos en una sola corrida."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivos", nargs="+", help="Rutas a archivos .csv o .xlsx.")
+        parser.add_argument("--rut", default=None,
+                            help="RUT del proveedor para archivos sin columna rut.")
+        parser.add_argument("--simular", action="store_true",
+                            help="Sólo valida y cuenta cambios; no escribe en la base de datos.")
+
+    def handle(self, *args, **opts):
+        abiertos = []
+        try:
+            for ruta in opts["archivos"]:
+                abiertos.append((open(ruta, "rb"), ruta))
+            r = sincronizar_listas(abiertos, rut=opts["rut"], simular=opts["simular"])
+        except OSError as e:
+            raise CommandError(f"No se pudo abrir el archivo: {e}")
+        except ErrorImportacion as e:
+            raise CommandError(str(e))
+        finally:
+            for fh, _ in abiertos:
+                fh.close()
+
+        for err in r["errores"]:
+            self.stdout.write(self.style.WARNING(
+                f"{err['archivo']} fila {err['fila']} [{err['sku']}]: {err['error']}"
+            ))
+        if r["con_error"] > len(r["errores"]):
+            self.stdout.write(f"... y {r['con_error'] - len(r['errores'])} errores más.")
+        for rut, c in sorted(r["por_proveedor"].items()):
+            self.stdout.write(
+                f"{rut}: {c['agregados']} agregados, {c['modificados']} modificados, "
+                f"{c['sin_cambios']} sin cambios"
+            )
+
+        if not opts["simular"]:
+            registrar_auditoria("sistema", "IMPORT", f"Listas de precios ({len(opts['archivos'])} archivos)",
+                                objeto_tipo="ProveedorProducto", agregados=r["agregados"],
+                                modificados=r["modificados"], con_error=r["con_error"])
+        prefijo = "Simulación" if opts["simular"] else "Sincronización"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefijo}: {r['filas']} filas, {r['agregados']} agregados, {r['modificados']} modificados, "
+            f"{r['sin_cambios']} sin cambios, {r['preferentes_quitados']} preferentes reasignados, "
+            f"{r['con_error']} con error."
+        ))
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:05
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copia congelada de la tokenización de apps/suppliers/busqueda.py tal como
+# estaba al crear la tabla: la migración no debe cambiar si después cambia
+# el tokenizador (para re-tokenizar se escribe una migración nueva).
+LARGO_TOKEN = 100
+LARGO_MINIMO = 2
+CAMPOS_TEXTO = (
+    "razon_social", "nombre_fantasia", "direccion", "ciudad", "pais",
+    "contacto_principal_nombre", "condiciones_pago",
+)
+CAMPOS_EMAIL = ("email", "contacto_principal_email")
+CAMPOS_FONO = ("telefono", "contacto_principal_telefono")
+CAMPOS_INDEXADOS = ("rut_nif",) + CAMPOS_TEXTO + CAMPOS_EMAIL + CAMPOS_FONO
+
+_NO_ALFANUM = re.compile(r"[^0-9a-z]+")
+_NO_DIGITO = re.compile(r"\D+")
+_SIN_SEPARADORES = str.maketrans("", "", ".-")
+
+
+def _palabras(valor):
+    valor = unicodedata.normalize("NFKD", valor or "")
+    valor = "".join(c for c in valor if not unicodedata.combining(c)).lower().strip()
+    return [p for p in _NO_ALFANUM.split(valor) if len(p) >= LARGO_MINIMO]
+
+
+def _digitos_fono(valor):
+    digitos = _NO_DIGITO.sub("", valor or "")
+    if len(digitos) < 6:
+        return []
+    return [digitos, digitos[2:]] if digitos.startswith("56") and len(digitos) > 9 else [digitos]
+
+
+def tokens_proveedor(datos):
+    tokens = set()
+    rut = (datos["rut_nif"] or "").translate(_SIN_SEPARADORES).strip().lower()
+    if rut:
+        tokens.add(rut)
+        if len(rut) > 1:
+            tokens.add(rut[:-1])
+    for campo in CAMPOS_TEXTO:
+        tokens.update(_palabras(datos[campo]))
+    for campo in CAMPOS_EMAIL:
+        email = (datos[campo] or "").strip().lower()
+        if email:
+            tokens.add(email)
+            tokens.update(_palabras(email))
+    for campo in CAMPOS_FONO:
+        tokens.update(_digitos_fono(datos[campo]))
+    return {t[:LARGO_TOKEN] for t in tokens if t}
+
+
+def poblar_tokens(apps, schema_editor):
+    Proveedor = apps.get_model("suppliers", "Proveedor")
+    ProveedorToken = apps.get_model("suppliers", "ProveedorToken")
+    lote = []
+    for datos in Proveedor.objects.values("id", *CAMPOS_INDEXADOS).iterator(chunk_size=2000):
+        lote.extend(ProveedorToken(proveedor_id=datos["id"], token=t) for t in tokens_proveedor(datos))
+        if len(lote) >= 5000:
+            ProveedorToken.objects.bulk_create(lote, ignore_conflicts=True)
+            lote = []
+    ProveedorToken.objects.bulk_create(lote, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProveedorToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100, verbose_name='Token')),
+                ('proveedor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='suppliers.proveedor')),
+            ],
+            options={
+                'verbose_name': 'Token de búsqueda de proveedor',
+                'verbose_name_plural': 'Tokens de búsqueda de proveedores',
+                'indexes': [models.Index(fields=['token', 'proveedor'], name='prov_token_idx')],
+                'unique_together': {('proveedor', 'token')},
+            },
+        ),
+        migrations.RunPython(poblar_tokens, migrations.RunPython.noop),
+    ]
@@ -50,6 +50,41 @@ class Proveedor(models.Model):
     def __str__(self):
         return f"{self.razon_social} ({self.rut_nif})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        from .busqueda import CAMPOS_INDEXADOS
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(update_fields) & set(CAMPOS_INDEXADOS):
+            self.reindexar()
+
+    def reindexar(self):
+        """Sincroniza ProveedorToken con los campos actuales (sólo la diferencia)."""
+        from .busqueda import tokens_proveedor
+        nuevos = tokens_proveedor(self)
+        actuales = set(self.tokens.values_list("token", flat=True))
+        if actuales - nuevos:
+            self.tokens.filter(token__in=actuales - nuevos).delete()
+        if nuevos - actuales:
+            ProveedorToken.objects.bulk_create(
+                [ProveedorToken(proveedor=self, token=t) for t in nuevos - actuales],
+                ignore_conflicts=True,
+            )
+
+
+class ProveedorToken(models.Model):
+    """Tokens normalizados de búsqueda de un proveedor (ver apps.suppliers.busqueda)."""
+    proveedor = models.ForeignKey(Proveedor, on_delete=models.CASCADE, related_name="tokens")
+    token = models.CharField("Token", max_length=100)
+
+    class Meta:
+        verbose_name = "Token de búsqueda de proveedor"
+        verbose_name_plural = "Tokens de búsqueda de proveedores"
+        unique_together = ("proveedor", "token")
+        indexes = [models.Index(fields=["token", "proveedor"], name="prov_token_idx")]
+
+    def __str__(self):
+        return self.token
+
 
 class ProveedorProducto(models.Model):
     proveedor = models.ForeignKey(Proveedor, on_delete=models.CASCADE, related_name="productos", verbose_name="Proveedor")
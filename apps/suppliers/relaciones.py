@@ -0,0 +1,103 @@
+# apps/suppliers/relaciones.py
+"""
+Panel de relaciones proveedor–producto (carga diferida).
+
+La página de proveedores ya no consulta ProveedorProducto: la pestaña
+"Productos Relacionados" pide sus páginas a un endpoint propio.
+- Páginas cacheadas por (versión, página, md5 de q).
+- Sin COUNT(*) por página: se lee una fila extra para saber si hay siguiente.
+- El total sin filtro sale de un conteo cacheado; con filtro no se cuenta.
+- Toda escritura de relaciones llama a invalidar_relaciones(), que sube la
+  versión y deja obsoletas todas las páginas y el total de una vez; los
+  cambios de Proveedor y Producto lo hacen desde signals.py.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import ProveedorProducto
+
+POR_PAGINA = 10
+CACHE_TTL = 5 * 60  # segundos
+_VERSION_KEY = "suppliers:relaciones:version"
+
+
+def _version():
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(_VERSION_KEY, version, None)
+    return version
+
+
+def invalidar_relaciones():
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.set(_VERSION_KEY, 2, None)
+
+
+def filtro_relaciones(q: str) -> Q:
+    q = (q or "").strip()
+    if not q:
+        return Q()
+    return (
+        Q(proveedor__rut_nif__icontains=q) |
+        Q(proveedor__razon_social__icontains=q) |
+        Q(producto__sku__icontains=q) |
+        Q(producto__nombre__icontains=q)
+    )
+
+
+def total_relaciones():
+    key = f"suppliers:relaciones:{_version()}:total"
+    total = cache.get(key)
+    if total is None:
+        total = ProveedorProducto.objects.count()
+        cache.set(key, total, CACHE_TTL)
+    return total
+
+
+def pagina_relaciones(q="", pagina=1, por_pagina=POR_PAGINA):
+    """
+    {"results": [...], "page", "has_previous", "has_next", "total"}
+    total es None cuando hay filtro (no se cuenta).
+    """
+    q = (q or "").strip()
+    pagina = max(1, pagina)
+    digest = hashlib.md5(q.encode()).hexdigest()
+    key = f"suppliers:relaciones:{_version()}:{pagina}:{por_pagina}:{digest}"
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    inicio = (pagina - 1) * por_pagina
+    filas = list(
+        ProveedorProducto.objects.filter(filtro_relaciones(q))
+        .order_by("-id")
+        .values(
+            "id", "costo", "lead_time_dias", "minimo_lote", "descuento_porcentaje", "preferente",
+            "proveedor__razon_social", "proveedor__rut_nif", "producto__nombre", "producto__sku",
+        )[inicio:inicio + por_pagina + 1]
+    )
+    data = {
+        "results": [{
+            "id": r["id"],
+            "proveedor": r["proveedor__razon_social"],
+            "rut": r["proveedor__rut_nif"],
+            "producto": r["producto__nombre"],
+            "sku": r["producto__sku"],
+            "costo": str(r["costo"]),
+            "lead_time": r["lead_time_dias"],
+            "minimo_lote": str(r["minimo_lote"]),
+            "descuento_porcentaje": str(r["descuento_porcentaje"] or 0),
+            "preferente": r["preferente"],
+        } for r in filas[:por_pagina]],
+        "page": pagina,
+        "has_previous": pagina > 1,
+        "has_next": len(filas) > por_pagina,
+        "total": None if q else total_relaciones(),
+    }
+    cache.set(key, data, CACHE_TTL)
+    return data
@@ -0,0 +1,39 @@
+# apps/suppliers/signals.py
+"""
+Invalidación del panel de relaciones ante cambios de Proveedor o Producto.
+
+Las páginas cacheadas (ver relaciones.py) muestran y filtran por RUT y razón
+social del proveedor y por SKU y nombre del producto; borrar cualquiera de
+los dos borra además sus relaciones en cascada. Las señales cubren todo
+camino de escritura (vistas, admin, API).
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.products.models import Producto
+
+from .models import Proveedor
+from .relaciones import invalidar_relaciones
+
+# Columnas que el panel muestra o filtra, por modelo
+CAMPOS_PANEL = {
+    Proveedor: {"rut_nif", "razon_social"},
+    Producto: {"sku", "nombre"},
+}
+
+
+@receiver(post_save, sender=Proveedor)
+@receiver(post_save, sender=Producto)
+def _invalidar_al_guardar(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw or created:
+        return  # sin relaciones todavía
+    if update_fields is not None and not set(update_fields) & CAMPOS_PANEL[sender]:
+        return
+    transaction.on_commit(invalidar_relaciones)
+
+
+@receiver(post_delete, sender=Proveedor)
+@receiver(post_delete, sender=Producto)
+def _invalidar_al_eliminar(sender, instance, **kwargs):
+    transaction.on_commit(invalidar_relaciones)
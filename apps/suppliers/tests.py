@@ -1,3 +1,100 @@
-from django.test import TestCase
+import io
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+
+from apps.products.models import Categoria, Producto
+
+from .listas_precios import sincronizar_listas
+from .models import Proveedor, ProveedorProducto
+from .relaciones import _version, pagina_relaciones
+from .validators import normalizar_rut, rut_chileno_valido, validar_ruts
+
+
+def _csv(texto, nombre="lista.csv"):
+    return io.BytesIO(texto.encode("utf-8")), nombre
+
+
+class ValidatorsTests(SimpleTestCase):
+
+    def test_rut(self):
+        self.assertEqual(normalizar_rut(" 76.123.456-k "), "76123456K")
+        self.assertTrue(rut_chileno_valido("11.111.111-1"))
+        self.assertTrue(rut_chileno_valido("76.086.428-5"))
+        self.assertFalse(rut_chileno_valido("76.086.428-6"))
+
+    def test_columna_de_ruts(self):
+        self.assertEqual(validar_ruts(["11.111.111-1", "", "123", "111111111"]), [
+            ("111111111", ""),
+            (None, "RUT obligatorio."),
+            (None, "RUT inválido."),
+            ("111111111", "RUT repetido (fila 1)."),
+        ])
+
+
+class BaseRelaciones(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Categoria.objects.create(nombre="Dulces")
+        cls.producto = Producto.objects.create(sku="CHO-1", nombre="Chocolate", categoria=categoria)
+        cls.proveedor = Proveedor.objects.create(
+            rut_nif="76.086.428-5", razon_social="Dulces Sur", email="ventas@dulcessur.cl",
+            condiciones_pago="30 días",
+        )
+
+
+class ListasPreciosTests(BaseRelaciones):
+
+    def test_agrega_modifica_y_deja_sin_cambios(self):
+        lista = "rut;sku;costo;lead_time;descuento\n76086428-5;cho-1;100;5;10\n"
+        resultado = sincronizar_listas([_csv(lista)])
+        self.assertEqual((resultado["agregados"], resultado["con_error"]), (1, 0))
+
+        resultado = sincronizar_listas([_csv(lista)])
+        self.assertEqual((resultado["agregados"], resultado["modificados"], resultado["sin_cambios"]), (0, 0, 1))
+
+        resultado = sincronizar_listas([_csv("sku,costo\nCHO-1,95.5\n")], rut="76.086.428-5")
+        self.assertEqual(resultado["modificados"], 1)
+        relacion = ProveedorProducto.objects.get()
+        self.assertEqual((relacion.costo, relacion.lead_time_dias), (Decimal("95.5"), 5))
+
+    def test_errores_por_fila(self):
+        resultado = sincronizar_listas([_csv(
+            "rut,sku,costo,descuento,lead_time\n"
+            "76086428-5,NO-EXISTE,1,,\n"
+            "76086428-5,CHO-1,1e15,,\n"
+            "76086428-5,CHO-1,1,150,\n"
+            "76086428-5,CHO-1,1,,2.5\n"
+        )])
+        self.assertEqual(resultado["con_error"], 4)
+        self.assertFalse(ProveedorProducto.objects.exists())
+
+
+class RelacionesCacheTests(BaseRelaciones):
+
+    def setUp(self):
+        ProveedorProducto.objects.create(proveedor=self.proveedor, producto=self.producto, costo=Decimal("1"))
+
+    def test_cambios_de_producto_y_proveedor_invalidan(self):
+        self.assertEqual(pagina_relaciones()["results"][0]["producto"], "Chocolate")
+
+        self.producto.nombre = "Chocolate amargo"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.producto.save()
+        self.assertEqual(pagina_relaciones()["results"][0]["producto"], "Chocolate amargo")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.proveedor.delete()
+        self.assertEqual(pagina_relaciones()["results"], [])
+
+    def test_campos_que_el_panel_no_muestra_no_invalidan(self):
+        version = _version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.producto.save(update_fields=["activo"])
+        self.assertEqual(_version(), version)
+
+    def test_consulta_con_caracteres_especiales(self):
+        q = 'dulces "sur" ñandú : % ' + "x" * 300
+        self.assertEqual(pagina_relaciones(q)["results"], [])
+        self.assertEqual(len(pagina_relaciones("sur")["results"]), 1)
@@ -10,6 +10,7 @@ urlpatterns = [
     path("eliminar/<int:supplier_id>/", views.eliminar_proveedor, name="delete"),
     path("relations/create/", views.create_relation, name="relations_create"),
     path("search/", views.search_suppliers, name="search"),
+    path("relations/panel/", views.relations_panel, name="relations_panel"),
     path("relations/search/", views.relations_search, name="relations_search"),
     path("relations/export/", views.relations_export, name="relations_export"),
     path('desactivar/<int:supplier_id>/', views.desactivar_proveedor, name='desactivar_proveedor'),
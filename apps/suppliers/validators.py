@@ -0,0 +1,143 @@
+# apps/suppliers/validators.py
+"""
+Validación y normalización de datos de proveedores (RUT, email, teléfono).
+
+Patrones precompilados una sola vez al importar el módulo. Además de las
+funciones por valor (formularios) hay una API por columnas para cargas
+masivas (validar_columnas), que valida y normaliza listas completas de
+RUTs, emails y teléfonos en una pasada.
+"""
+import re
+from itertools import cycle, islice
+
+RE_RUT = re.compile(r"\d{7,8}[0-9K]")
+RE_EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+RE_FONO = re.compile(r"[0-9+()\-\s]{6,30}")
+RE_WEB = re.compile(r"https?://.+", re.I)
+RE_NO_DIGITO = re.compile(r"\D+")
+
+_SIN_SEPARADORES = str.maketrans("", "", ".-")
+# Pesos del módulo 11 desde el dígito menos significativo: 2,3,4,5,6,7,2,3
+_PESOS = tuple(islice(cycle(range(2, 8)), 8))
+_DV = {11: "0", 10: "K"}
+
+
+# ================================================================
+# POR VALOR
+# ================================================================
+
+def normalizar_rut(rut: str) -> str:
+    """
+    Elimina puntos y guión, deja sólo dígitos + K en mayúscula.
+    """
+    return (rut or "").translate(_SIN_SEPARADORES).strip().upper()
+
+
+def _dv_valido(limpio: str) -> bool:
+    """limpio ya pasó RE_RUT: cuerpo de 7-8 dígitos + DV."""
+    cuerpo = limpio[:-1]
+    suma = sum(int(d) * p for d, p in zip(reversed(cuerpo), _PESOS))
+    resto = 11 - (suma % 11)
+    return limpio[-1] == _DV.get(resto, str(resto))
+
+
+def rut_chileno_valido(rut: str) -> bool:
+    """
+    Valida RUT chileno:
+      - 7 u 8 dígitos + DV (0-9 o K)
+      - Usa algoritmo módulo 11
+    """
+    limpio = normalizar_rut(rut)
+    return bool(RE_RUT.fullmatch(limpio)) and _dv_valido(limpio)
+
+
+def email_valido(email: str) -> bool:
+    return bool(RE_EMAIL.fullmatch(email or ""))
+
+
+def fono_valido(fono: str) -> bool:
+    return bool(RE_FONO.fullmatch(fono or ""))
+
+
+def web_valida(url: str) -> bool:
+    return bool(RE_WEB.match(url or ""))
+
+
+def normalizar_fono(fono: str) -> str:
+    """Sólo dígitos (y '+' inicial si venía): '+56 9 8765-4321' -> '+56987654321'."""
+    fono = (fono or "").strip()
+    digitos = RE_NO_DIGITO.sub("", fono)
+    return f"+{digitos}" if fono.startswith("+") and digitos else digitos
+
+
+# ================================================================
+# POR COLUMNAS (CARGAS MASIVAS)
+# ================================================================
+
+def validar_ruts(ruts):
+    """
+    Lista de RUTs -> lista de (rut_normalizado | None, error | "").
+    Marca también los repetidos (mismo RUT normalizado) dentro de la columna.
+    """
+    fullmatch = RE_RUT.fullmatch
+    vistos = {}
+    salida = []
+    for i, rut in enumerate(ruts):
+        limpio = (rut or "").translate(_SIN_SEPARADORES).strip().upper()
+        if not limpio:
+            salida.append((None, "RUT obligatorio."))
+        elif not fullmatch(limpio) or not _dv_valido(limpio):
+            salida.append((None, "RUT inválido."))
+        elif limpio in vistos:
+            salida.append((limpio, f"RUT repetido (fila {vistos[limpio] + 1})."))
+        else:
+            vistos[limpio] = i
+            salida.append((limpio, ""))
+    return salida
+
+
+def validar_emails(emails):
+    """Lista de emails -> lista de (email_normalizado | None, error | "")."""
+    fullmatch = RE_EMAIL.fullmatch
+    salida = []
+    for email in emails:
+        email = (email or "").strip().lower()
+        salida.append((email, "") if fullmatch(email) else (None, "Email inválido."))
+    return salida
+
+
+def validar_fonos(fonos, obligatorio=False):
+    """Lista de teléfonos -> lista de (fono_normalizado | "" | None, error | "")."""
+    fullmatch = RE_FONO.fullmatch
+    salida = []
+    for fono in fonos:
+        fono = (fono or "").strip()
+        if not fono:
+            salida.append((None, "Teléfono obligatorio.") if obligatorio else ("", ""))
+        elif fullmatch(fono):
+            salida.append((normalizar_fono(fono), ""))
+        else:
+            salida.append((None, "Teléfono inválido."))
+    return salida
+
+
+def validar_columnas(ruts=None, emails=None, fonos=None):
+    """
+    Valida columnas completas de una carga (mismo largo).
+    Devuelve {"ruts": [...], "emails": [...], "fonos": [...],
+              "errores": {indice_fila: [mensajes]}} con sólo las columnas pedidas.
+    """
+    resultado = {"errores": {}}
+    for nombre, valores, funcion in (
+        ("ruts", ruts, validar_ruts),
+        ("emails", emails, validar_emails),
+        ("fonos", fonos, validar_fonos),
+    ):
+        if valores is None:
+            continue
+        columna = funcion(valores)
+        resultado[nombre] = [valor for valor, _ in columna]
+        for i, (_, error) in enumerate(columna):
+            if error:
+                resultado["errores"].setdefault(i, []).append(error)
+    return resultado
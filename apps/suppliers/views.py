@@ -1,20 +1,21 @@
 from datetime import datetime
 import json
-import re
 
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.db import transaction
-from django.db.models import Q
 from django.http import JsonResponse, HttpResponse
 from django.shortcuts import render
 from django.views.decorators.http import require_POST
 
+from lilis_erp.pagination import paginar
 from lilis_erp.roles import require_roles
 
 # Modelos
 from apps.suppliers.models import Proveedor, ProveedorProducto
 from apps.products.models import Producto
+from .busqueda import filtro_busqueda
+from .relaciones import filtro_relaciones, invalidar_relaciones, pagina_relaciones
+from .validators import email_valido, fono_valido, rut_chileno_valido, web_valida
 
 # Excel
 try:
@@ -26,52 +27,6 @@ except ImportError:
 
 # -------------------------- Helpers --------------------------
 
-def _valid_email(s: str) -> bool:
-    return bool(re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", s or ""))
-
-# NUEVO: helpers para RUT chileno
-def normalizar_rut(rut: str) -> str:
-    """
-    Elimina puntos y guión, deja sólo dígitos + K en mayúscula.
-    """
-    return (rut or "").replace(".", "").replace("-", "").strip().upper()
-
-def rut_chileno_valido(rut: str) -> bool:
-    """
-    Valida RUT chileno:
-      - 7 u 8 dígitos + DV (0-9 o K)
-      - Usa algoritmo módulo 11
-    """
-    limpio = normalizar_rut(rut)
-    if not limpio or not re.fullmatch(r"\d{7,8}[0-9K]", limpio):
-        return False
-
-    cuerpo = limpio[:-1]
-    dv = limpio[-1]
-
-    try:
-        int(cuerpo)
-    except ValueError:
-        return False
-
-    suma = 0
-    multiplo = 2
-    for d in reversed(cuerpo):
-        suma += int(d) * multiplo
-        multiplo += 1
-        if multiplo > 7:
-            multiplo = 2
-
-    resto = 11 - (suma % 11)
-    if resto == 11:
-        dv_calc = "0"
-    elif resto == 10:
-        dv_calc = "K"
-    else:
-        dv_calc = str(resto)
-
-    return dv == dv_calc
-
 def _estado_from_text(q: str):
     """
     Normaliza a los estados guardados en BD (minúscula para matchear consistentes).
@@ -84,52 +39,6 @@ def _estado_from_text(q: str):
     }
     return mapping.get(q)
 
-def _build_supplier_q(q: str) -> Q:
-    """
-    Búsqueda para proveedores:
-    - rut_nif, razon_social, estado, email (requerido)
-    - extras no invasivos (ayudan)
-    """
-    q = (q or "").strip()
-    if not q:
-        return Q()
-
-    expr = (
-        Q(rut_nif__icontains=q) |
-        Q(razon_social__icontains=q) |
-        Q(email__icontains=q) |
-        # extras útiles
-        Q(nombre_fantasia__icontains=q) |
-        Q(telefono__icontains=q) |
-        Q(direccion__icontains=q) |
-        Q(ciudad__icontains=q) |
-        Q(pais__icontains=q) |
-        Q(contacto_principal_nombre__icontains=q) |
-        Q(contacto_principal_email__icontains=q) |
-        Q(contacto_principal_telefono__icontains=q) |
-        Q(condiciones_pago__icontains=q)
-    )
-
-    # ID exacto si es número
-    try:
-        expr |= Q(id=int(q))
-    except ValueError:
-        pass
-
-    return expr
-
-def _build_relation_q(q: str) -> Q:
-    q = (q or "").strip()
-    if not q:
-        return Q()
-    return (
-        Q(proveedor__rut_nif__icontains=q) |
-        Q(proveedor__razon_social__icontains=q) |
-        Q(producto__sku__icontains=q) |
-        Q(producto__nombre__icontains=q)
-    )
-
-
 # ---------------------------- Vistas ----------------------------
 
 @login_required
@@ -154,7 +63,7 @@ def supplier_list_view(request):
 
     # Luego, sobre el resultado anterior, aplicamos la búsqueda por texto si existe
     if query:
-        qs = qs.filter(_build_supplier_q(query))
+        qs = qs.filter(filtro_busqueda(query))
 
     qs = qs.order_by(sort_by)
 
@@ -207,15 +116,10 @@ def supplier_list_view(request):
         wb.save(response)
         return response
 
-    paginator = Paginator(qs, 10)
-    page_obj = paginator.get_page(request.GET.get("page"))
+    page_obj = paginar(request, qs, 10)
 
-    # Relaciones proveedor-producto (filtradas también por q)
-    relations_qs = ProveedorProducto.objects.select_related('proveedor', 'producto').order_by('-id')
-    if query:
-        relations_qs = relations_qs.filter(_build_relation_q(query))
-    relations_paginator = Paginator(relations_qs, 10)
-    relations_page_obj = relations_paginator.get_page(request.GET.get("page_rel"))
+    # Las relaciones proveedor-producto se cargan aparte, al abrir su
+    # pestaña (ver relations_panel); aquí no se consultan.
 
     # Normaliza estado para visual
     proveedores_list = []
@@ -230,7 +134,6 @@ def supplier_list_view(request):
         "query": query,
         "sort_by": sort_by,
         "ver": ver,
-        "relations": relations_page_obj,
     }
     return render(request, "gestion_proveedores.html", context)
 
@@ -276,13 +179,13 @@ def create_supplier(request):
     if not razon:
         errors["razon_social"] = "Razón social obligatoria."
 
-    if not _valid_email(email):
+    if not email_valido(email):
         errors["email"] = "Email obligatorio y válido."
 
-    if not telefono or not re.match(r"^[0-9+()\-\s]{6,30}$", telefono):
+    if not fono_valido(telefono):
         errors["telefono"] = "Teléfono obligatorio y válido."
 
-    if web and not re.match(r"^https?://.+", web, flags=re.I):
+    if web and not web_valida(web):
         errors["sitio_web"] = "Debe comenzar con http:// o https://"
 
     if not condiciones_pago:
@@ -403,6 +306,7 @@ def create_relation(request):
                 "descuento_porcentaje": desc,
             }
         )
+        transaction.on_commit(invalidar_relaciones)
 
     return JsonResponse({"ok": True, "id": rel.id})
 
@@ -415,7 +319,7 @@ def search_suppliers(request):
     q = (request.GET.get("q") or "").strip()
     qs = Proveedor.objects.all()
     if q:
-        qs = qs.filter(_build_supplier_q(q))
+        qs = qs.filter(filtro_busqueda(q))
     qs = qs.order_by("id")[:10]
     return JsonResponse({"results": [{
         "id": s.id,
@@ -425,13 +329,25 @@ def search_suppliers(request):
         "email": getattr(s, "email", ""),
     } for s in qs]})
 
+@login_required
+@require_roles("ADMIN", "COMPRAS", "INVENTARIO")
+def relations_panel(request):
+    """
+    GET ?q=&page=  -> página de la pestaña "Productos Relacionados" (JSON, cacheada).
+    """
+    try:
+        pagina = int(request.GET.get("page") or 1)
+    except ValueError:
+        pagina = 1
+    return JsonResponse(pagina_relaciones((request.GET.get("q") or "").strip(), pagina))
+
 @login_required
 @require_roles("ADMIN", "COMPRAS", "INVENTARIO")
 def relations_search(request):
     q = (request.GET.get("q") or "").strip()
     qs = ProveedorProducto.objects.select_related("proveedor", "producto")
     if q:
-        qs = qs.filter(_build_relation_q(q))
+        qs = qs.filter(filtro_relaciones(q))
     qs = qs.order_by("id")[:10]
 
     def _rel_to_dict(rel: ProveedorProducto):
@@ -465,7 +381,7 @@ def relations_export(request):
     q = (request.GET.get("q") or "").strip()
     qs = ProveedorProducto.objects.select_related("proveedor", "producto")
     if q:
-        qs = qs.filter(_build_relation_q(q))
+        qs = qs.filter(filtro_relaciones(q))
     qs = qs.order_by("id")
 
     wb = Workbook()
@@ -615,6 +531,7 @@ def eliminar_relacion(request, relation_id):
     try:
         relacion = ProveedorProducto.objects.get(id=relation_id)
         relacion.delete()
+        transaction.on_commit(invalidar_relaciones)
         return JsonResponse({"status": "ok", "message": "Relación eliminada correctamente"})
     except ProveedorProducto.DoesNotExist:
         return JsonResponse({"status": "error", "message": "La relación no fue encontrada."}, status=404)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Bodega, Stock, MovimientoInventario
+from lilis_erp.admin_base import AdminEscalable, FiltroAutocomplete
+from .models import Bodega, Stock, MovimientoInventario, MovimientoArchivo, Kardex, SnapshotStock
 from .forms import MovimientoInventarioForm
 
 @admin.register(Bodega)
@@ -9,23 +10,82 @@ class BodegaAdmin(admin.ModelAdmin):
     ordering = ("nombre",)
 
 @admin.register(Stock)
-class StockAdmin(admin.ModelAdmin):
+class StockAdmin(AdminEscalable):
     list_display = ("producto", "bodega", "cantidad", "lote", "serie", "fecha_vencimiento")
-    list_filter = ("bodega", "producto", "fecha_vencimiento")
+    list_filter = ("bodega", ("producto", FiltroAutocomplete), "fecha_vencimiento")
     search_fields = ("producto__sku", "producto__nombre", "lote", "serie")
+    list_select_related = ("producto", "bodega")
+    autocomplete_fields = ("producto", "bodega")
     ordering = ("producto__nombre",)
-    readonly_fields = ()  
+    readonly_fields = ()
 
 @admin.register(MovimientoInventario)
-class MovimientoInventarioAdmin(admin.ModelAdmin):
+class MovimientoInventarioAdmin(AdminEscalable):
     form = MovimientoInventarioForm
     list_display = ("tipo", "fecha", "producto", "cantidad", "bodega_origen", "bodega_destino", "lote", "serie", "fecha_vencimiento", "creado_por")
-    list_filter = ("tipo", "bodega_origen", "bodega_destino", "producto", "fecha")
+    list_filter = ("tipo", "bodega_origen", "bodega_destino", ("producto", FiltroAutocomplete))
     search_fields = ("producto__sku", "producto__nombre", "lote", "serie", "observacion")
-    ordering = ("-fecha",)
+    list_select_related = ("producto", "bodega_origen", "bodega_destino", "creado_por")
+    autocomplete_fields = ("producto", "bodega_origen", "bodega_destino", "proveedor", "creado_por")
+    date_hierarchy = "fecha"
+    ordering = ("-fecha", "-id")
     fieldsets = (
         ("Datos del movimiento", {"fields": ("tipo", "fecha", "producto", "cantidad", "observacion", "creado_por")}),
         ("Ubicaciones", {"fields": ("bodega_origen", "bodega_destino")}),
         ("Trazabilidad", {"fields": ("lote", "serie", "fecha_vencimiento", "proveedor")}),
     )
     readonly_fields = ("fecha",)
+
+
+@admin.register(MovimientoArchivo)
+class MovimientoArchivoAdmin(AdminEscalable):
+    list_display = ("id", "fecha", "tipo", "sku", "producto_nombre", "cantidad", "bodega_origen", "bodega_destino", "lote", "usuario")
+    list_filter = ("periodo", "tipo")
+    search_fields = ("=id", "^sku", "^lote")
+    date_hierarchy = "fecha"
+    ordering = ("-fecha", "-id")
+
+    # Archivo de sólo lectura (lo llena archivar_movimientos)
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Kardex)
+class KardexAdmin(AdminEscalable):
+    list_display = ("fecha", "producto", "bodega", "lote", "cantidad_antes", "cantidad_despues", "movimiento")
+    list_filter = ("bodega", ("producto", FiltroAutocomplete))
+    date_hierarchy = "fecha"
+    search_fields = ("producto__sku", "producto__nombre", "lote", "serie")
+    list_select_related = ("producto", "bodega", "movimiento")
+    ordering = ("-fecha", "-id")
+
+    # El kardex es un libro: sólo lectura
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SnapshotStock)
+class SnapshotStockAdmin(AdminEscalable):
+    list_display = ("fecha", "producto", "bodega", "cantidad", "tomado_en")
+    list_filter = ("bodega", "fecha")
+    search_fields = ("producto__sku", "producto__nombre")
+    list_select_related = ("producto", "bodega")
+    ordering = ("-fecha",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
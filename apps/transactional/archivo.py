@@ -0,0 +1,93 @@
+# apps/transactional/archivo.py
+"""
+Archivo de movimientos antiguos.
+
+- archivar(corte): mueve a MovimientoArchivo los movimientos con
+  fecha < corte que ningún proceso de reportes tiene pendiente
+  (MovimientoPendiente), por bloques y en orden de id; cada bloque inserta
+  en el archivo y borra de la tabla activa (y su MovimientoVista) en la
+  misma transacción. Reintentar es idempotente.
+- limite_archivo(): fecha del movimiento archivado más reciente (MAX sobre
+  el índice de fecha, sin cache: cambia con cada bloque archivado). Todo
+  lo anterior está en el archivo y todo lo posterior en la tabla activa.
+- tablas(desde, hasta): qué tablas alcanza un rango de fechas. Sin 'desde'
+  sólo se lee la tabla activa: el archivo se consulta cuando el rango lo
+  pide explícitamente.
+- listado(expr, desde, hasta): MovimientoVista, el archivo o UNION ALL de
+  ambos, filtrados con el mismo Q de la búsqueda (ver busqueda.py).
+"""
+from django.db import models, transaction
+
+from .models import MovimientoArchivo, MovimientoInventario, MovimientoVista, MovimientoVistaBase
+
+BLOQUE = 5000
+
+_CAMPOS_VISTA = [f.name for f in MovimientoVistaBase._meta.fields]
+_COLUMNAS_MOVIMIENTO = (
+    "id", "fecha", "producto_id", "proveedor_id", "bodega_origen_id", "bodega_destino_id", "creado_por_id",
+)
+
+
+def limite_archivo():
+    """Fecha (aware) del movimiento archivado más reciente, o None si el archivo está vacío."""
+    return MovimientoArchivo.objects.aggregate(m=models.Max("fecha"))["m"]
+
+
+def tablas(desde=None, hasta=None):
+    """(leer_activa, leer_archivo) para un rango [desde, hasta)."""
+    limite = limite_archivo()
+    if limite is None:
+        return True, False
+    archivo = desde is not None and desde <= limite
+    activa = hasta is None or hasta > limite
+    return activa, archivo
+
+
+def listado(expr, desde=None, hasta=None):
+    """
+    MovimientoVista filtrado por 'expr' y, si el rango llega al archivo,
+    UNION ALL con MovimientoArchivo. El archivo se lee con only() de las
+    columnas comunes: mismas columnas y en el mismo orden que la vista, así
+    las filas archivadas salen como instancias (de sólo lectura) de
+    MovimientoVista y el listado/exportación no distinguen el origen.
+    """
+    activa, archivo = tablas(desde, hasta)
+    qs = MovimientoVista.objects.filter(expr)
+    if not archivo:
+        return qs
+    antiguos = MovimientoArchivo.objects.filter(expr).only(*_CAMPOS_VISTA)
+    return qs.union(antiguos, all=True) if activa else antiguos
+
+
+def archivar(corte, bloque=BLOQUE):
+    """
+    Mueve al archivo los movimientos con fecha < corte sin pendientes de
+    reportes. Devuelve cuántos movió. Si a un movimiento le falta su fila de
+    MovimientoVista se arma con los nombres actuales.
+    """
+    movimientos = MovimientoInventario.objects.filter(fecha__lt=corte, pendientes__isnull=True)
+
+    movidos = 0
+    while True:
+        with transaction.atomic():
+            filas = list(movimientos.order_by("id").values(*_COLUMNAS_MOVIMIENTO)[:bloque])
+            if not filas:
+                break
+            ids = [f["id"] for f in filas]
+            vistas = MovimientoVista.objects.in_bulk(ids)
+            faltantes = [i for i in ids if i not in vistas]
+            if faltantes:
+                for mov in MovimientoInventario.objects.filter(id__in=faltantes).select_related(
+                    "producto", "proveedor", "bodega_origen", "bodega_destino", "creado_por"
+                ):
+                    vistas[mov.id] = MovimientoVista.desde_movimiento(mov)
+
+            MovimientoArchivo.objects.bulk_create(
+                [MovimientoArchivo.desde_vista(vistas[f["id"]], f) for f in filas],
+                batch_size=1000,
+                ignore_conflicts=True,  # reintentos idempotentes
+            )
+            MovimientoVista.objects.filter(movimiento_id__in=ids).delete()
+            MovimientoInventario.objects.filter(id__in=ids).delete()
+        movidos += len(filas)
+    return movidos
@@ -0,0 +1,196 @@
+# apps/transactional/busqueda.py
+"""
+Lenguaje de búsqueda de movimientos (listado web y API):
+
+    sku:ABC tipo:salida bodega:Central desde:2026-01-01 lote:L12 id:123
+    proveedor:"Dulces Sur" rut:76 usuario:jperez producto:choco hasta:2026-02-01
+    cantidad:12,5
+
+Cada término clave:valor va a una columna indexada de MovimientoVista con
+búsqueda exacta o por prefijo (istartswith -> LIKE 'x%', usa el índice).
+Los términos se combinan con AND.
+
+Los términos sueltos se interpretan antes de caer al texto libre:
+  - número entero  -> id exacto, o prefijo de SKU / lote
+  - fecha ISO      -> ese día
+  - nombre de tipo -> tipo
+  - decimal        -> cantidad exacta
+  - otro           -> icontains sobre las columnas de texto (recorre la tabla)
+"""
+import re
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.suppliers.validators import normalizar_rut
+
+from .models import MovimientoInventario
+
+# clave:"valor con espacios" | clave:valor | "frase" | palabra
+RE_TERMINO = re.compile(r'(\w+):"([^"]*)"|(\w+):(\S+)|"([^"]*)"|(\S+)')
+
+TIPOS = {codigo.lower(): codigo for codigo, _ in MovimientoInventario.TIPOS}
+TIPOS.update({etiqueta.lower(): codigo for codigo, etiqueta in MovimientoInventario.TIPOS})
+
+CAMPOS_TEXTO = (
+    "sku", "producto_nombre", "bodega_origen", "bodega_destino",
+    "proveedor", "proveedor_rut", "usuario", "lote",
+)
+
+
+def _tipo(valor):
+    valor = valor.lower()
+    if valor in TIPOS:
+        return TIPOS[valor]
+    candidatos = {codigo for nombre, codigo in TIPOS.items() if nombre.startswith(valor)}
+    return candidatos.pop() if len(candidatos) == 1 else None
+
+
+def _dia(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        return None
+
+
+def _inicio(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def _id(valor):
+    return int(valor) if valor.isascii() and valor.isdigit() else None
+
+
+def _cantidad(valor):
+    try:
+        cantidad = Decimal(valor.replace(",", "."))
+    except InvalidOperation:
+        return None
+    return cantidad if cantidad.is_finite() else None
+
+
+def _prefijo(campo):
+    return lambda valor: Q(**{f"{campo}__istartswith": valor})
+
+
+def _filtro_tipo(valor):
+    codigo = _tipo(valor)
+    return None if codigo is None else Q(tipo=codigo)
+
+
+def _filtro_desde(valor):
+    dia = _dia(valor)
+    return None if dia is None else Q(fecha__gte=_inicio(dia))
+
+
+def _filtro_hasta(valor):
+    dia = _dia(valor)
+    return None if dia is None else Q(fecha__lt=_inicio(dia + timedelta(days=1)))
+
+
+def _filtro_id(valor):
+    pk = _id(valor)
+    return None if pk is None else Q(pk=pk)
+
+
+def _filtro_cantidad(valor):
+    cantidad = _cantidad(valor)
+    return None if cantidad is None else Q(cantidad=cantidad)
+
+
+# clave -> función(valor) -> Q | None (None = valor inválido)
+CLAVES = {
+    "sku": _prefijo("sku"),
+    "producto": _prefijo("producto_nombre"),
+    "tipo": _filtro_tipo,
+    "bodega": lambda v: Q(bodega_origen__istartswith=v) | Q(bodega_destino__istartswith=v),
+    "origen": _prefijo("bodega_origen"),
+    "destino": _prefijo("bodega_destino"),
+    "proveedor": _prefijo("proveedor"),
+    "rut": lambda v: Q(proveedor_rut__istartswith=normalizar_rut(v)),
+    "usuario": _prefijo("usuario"),
+    "lote": _prefijo("lote"),
+    "desde": _filtro_desde,
+    "hasta": _filtro_hasta,
+    "id": _filtro_id,
+    "cantidad": _filtro_cantidad,
+}
+
+
+def _texto_libre(valor):
+    """Un término sin clave: primero lo que usa índice, icontains sólo si no queda otra."""
+    pk = _id(valor)
+    if pk is not None:
+        return Q(pk=pk) | Q(sku__istartswith=valor) | Q(lote__istartswith=valor)
+    dia = _dia(valor)
+    if dia is not None:
+        return Q(fecha__gte=_inicio(dia), fecha__lt=_inicio(dia + timedelta(days=1)))
+    if valor.lower() in TIPOS:
+        return Q(tipo=TIPOS[valor.lower()])
+    cantidad = _cantidad(valor)
+    if cantidad is not None:
+        return Q(cantidad=cantidad)
+    expr = Q()
+    for campo in CAMPOS_TEXTO:
+        expr |= Q(**{f"{campo}__icontains": valor})
+    return expr
+
+
+def parsear(q: str):
+    """
+    Devuelve (Q, errores). errores lista los términos clave:valor con valor
+    inválido (fecha, tipo o id mal escritos); esos términos se ignoran.
+    Una clave desconocida se trata como texto libre completo ("foo:bar").
+    """
+    expr = Q()
+    errores = []
+    for m in RE_TERMINO.finditer(q or ""):
+        clave = (m.group(1) or m.group(3) or "").lower()
+        valor = (m.group(2) if m.group(1) else m.group(4)) or ""
+        if clave in CLAVES:
+            valor = valor.strip()
+            if not valor:
+                continue
+            filtro = CLAVES[clave](valor)
+            if filtro is None:
+                errores.append(f"{clave}:{valor}")
+            else:
+                expr &= filtro
+            continue
+        libre = (m.group(5) if m.group(5) is not None else m.group(0)).strip()
+        if libre:
+            expr &= _texto_libre(libre)
+    return expr, errores
+
+
+def rango_fechas(q: str):
+    """
+    (desde, hasta) que la consulta exige sobre la fecha (datetimes aware,
+    hasta exclusivo; None = sin límite), a partir de desde:, hasta: y las
+    fechas sueltas. Decide si hay que leer el archivo de movimientos.
+    """
+    desde = hasta = None
+    for m in RE_TERMINO.finditer(q or ""):
+        clave = (m.group(1) or m.group(3) or "").lower()
+        valor = ((m.group(2) if m.group(1) else m.group(4)) or "").strip()
+        if not clave:
+            valor, clave = (m.group(5) or m.group(0)).strip(), "dia"
+        if clave not in ("desde", "hasta", "dia"):
+            continue
+        dia = _dia(valor)
+        if dia is None:
+            continue
+        if clave in ("desde", "dia"):
+            inicio = _inicio(dia)
+            desde = inicio if desde is None else max(desde, inicio)
+        if clave in ("hasta", "dia"):
+            fin = _inicio(dia + timedelta(days=1))
+            hasta = fin if hasta is None else min(hasta, fin)
+    return desde, hasta
+
+
+def filtro_movimientos(q: str) -> Q:
+    """Q sobre MovimientoVista, ignorando los términos inválidos."""
+    return parsear(q)[0]
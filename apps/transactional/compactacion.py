@@ -0,0 +1,76 @@
+# apps/transactional/compactacion.py
+"""
+Compactación de Stock: borra las filas que quedaron en cantidad 0.
+
+SALIDA y TRANSFERENCIA descuentan lotes hasta 0, y AJUSTE (y el conteo
+físico) deja en 0 los lotes no contados; la fila queda y FEFO, el SUM de
+stock por producto y el admin las siguen recorriendo. La historia
+de cada lote está en Kardex, así que la fila en cero no aporta nada: si
+el lote vuelve a entrar, _sumar() la crea de nuevo.
+
+Pensado para correr con el sistema en uso:
+- bloques chicos por id (keyset), cada uno en su propia transacción;
+- las filas se toman con select_for_update(skip_locked=True) donde el
+  motor lo soporta: una fila que un movimiento tiene bloqueada se salta
+  (queda para la próxima pasada) en vez de esperar o hacer esperar;
+- el DELETE vuelve a exigir cantidad = 0, por si una fila cambió entre
+  la lectura y el borrado, y el conteo por bodega sale de las filas que
+  efectivamente se borraron;
+- pausa opcional entre bloques para no acaparar el motor.
+"""
+import time
+from collections import Counter
+
+from django.db import connection, models, transaction
+
+from .models import Stock
+
+BLOQUE = 1000
+
+
+def compactar_stock(bloque=BLOQUE, pausa=0.0, max_bloques=None, simular=False):
+    """
+    Devuelve {"eliminadas", "bloques", "por_bodega": {bodega_id: n}, "segundos"}.
+    Con simular=True sólo cuenta (sin bloquear ni borrar).
+    """
+    inicio = time.monotonic()
+    por_bodega = Counter()
+    eliminadas = bloques = ultimo = 0
+
+    en_cero = Stock.objects.filter(cantidad=0).order_by("id")
+    if simular:
+        por_bodega.update(dict(
+            en_cero.order_by().values("bodega_id").annotate(n=models.Count("id")).values_list("bodega_id", "n")
+        ))
+        eliminadas = sum(por_bodega.values())
+    else:
+        saltar = connection.features.has_select_for_update_skip_locked
+        while max_bloques is None or bloques < max_bloques:
+            with transaction.atomic():
+                qs = en_cero.filter(id__gt=ultimo)
+                if connection.features.has_select_for_update:
+                    qs = qs.select_for_update(skip_locked=saltar)
+                filas = list(qs.values_list("id", "bodega_id")[:bloque])
+                if not filas:
+                    break
+                ids = [i for i, _ in filas]
+                Stock.objects.filter(id__in=ids, cantidad=0).delete()
+                # Se cuenta lo que el DELETE borró, no lo leído: una fila que
+                # volvió a tener stock entre la lectura y el borrado sigue ahí.
+                quedan = set(Stock.objects.filter(id__in=ids).values_list("id", flat=True))
+            borradas = [b for i, b in filas if i not in quedan]
+            eliminadas += len(borradas)
+            por_bodega.update(borradas)
+            ultimo = ids[-1]
+            bloques += 1
+            if len(filas) < bloque:
+                break
+            if pausa:
+                time.sleep(pausa)
+
+    return {
+        "eliminadas": eliminadas,
+        "bloques": bloques,
+        "por_bodega": dict(por_bodega),
+        "segundos": round(time.monotonic() - inicio, 2),
+    }
@@ -0,0 +1,164 @@
+# apps/transactional/conteo.py
+"""
+Conteo físico (inventario cíclico) por lote en una bodega.
+
+aplicar_conteo(bodega, lineas) recibe lo contado, lote por lote, y deja
+Stock igual al conteo tocando sólo lo que cambió:
+- lee de una vez (y bloquea) las filas de Stock de los productos contados,
+  por bloques de productos;
+- compara en memoria (diferencia_conteo) y escribe con un bulk_update de
+  las filas que cambian y un bulk_create de los lotes nuevos. Las filas que
+  quedan en 0 no se borran (las limpia compactar_stock);
+- por cada producto con diferencias crea un movimiento AJUSTE con la
+  cantidad total contada (misma semántica que un AJUSTE manual para la
+  valorización y los reportes) y un asiento de Kardex por lote cambiado.
+  Los productos sin diferencias no generan movimiento.
+
+Un producto que aparece en el conteo se considera contado completo en la
+bodega: sus lotes que no figuran quedan en 0. Los productos que no
+aparecen no se tocan. Líneas repetidas del mismo lote se suman (el lote
+puede estar en más de una ubicación).
+"""
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils.dateparse import parse_date
+
+from apps.products.models import Producto
+
+from .models import (
+    Kardex, MovimientoInventario, MovimientoPendiente, MovimientoVista, Stock, clave_lote, diferencia_conteo,
+)
+
+BLOQUE = 500  # productos por lectura de Stock
+
+
+def leer_lineas(lineas):
+    """
+    Valida las líneas ({"producto", "lote", "serie", "fecha_vencimiento",
+    "cantidad"}) y devuelve {producto_id: {clave_lote: cantidad}}.
+    Lanza ValidationError con todos los errores encontrados.
+    """
+    conteos = defaultdict(lambda: defaultdict(Decimal))
+    errores = []
+    for i, linea in enumerate(lineas, start=1):
+        if not isinstance(linea, dict):
+            errores.append(f"Línea {i}: se esperaba un objeto.")
+            continue
+        try:
+            producto_id = int(linea.get("producto"))
+            cantidad = Decimal(str(linea.get("cantidad")))
+        except (TypeError, ValueError, InvalidOperation):
+            errores.append(f"Línea {i}: producto y cantidad son obligatorios y numéricos.")
+            continue
+        if not cantidad.is_finite():  # NaN / Infinity
+            errores.append(f"Línea {i}: producto y cantidad son obligatorios y numéricos.")
+            continue
+        if cantidad < 0:
+            errores.append(f"Línea {i}: la cantidad no puede ser negativa.")
+            continue
+
+        vencimiento = linea.get("fecha_vencimiento") or None
+        if isinstance(vencimiento, str):
+            try:
+                vencimiento = parse_date(vencimiento)
+            except ValueError:
+                vencimiento = None
+            if vencimiento is None:
+                errores.append(f"Línea {i}: fecha_vencimiento inválida (AAAA-MM-DD).")
+                continue
+
+        clave = clave_lote(linea.get("lote"), linea.get("serie"), vencimiento)
+        conteos[producto_id][clave] += cantidad
+
+    faltantes = set(conteos) - set(Producto.objects.filter(id__in=conteos).values_list("id", flat=True))
+    if faltantes:
+        errores.append(f"Productos inexistentes: {', '.join(map(str, sorted(faltantes)))}.")
+    if errores:
+        raise ValidationError(errores)
+    return {producto_id: dict(conteo) for producto_id, conteo in conteos.items()}
+
+
+def _crear_movimientos(movimientos):
+    """
+    INSERT de los AJUSTE (con pk de vuelta si el motor lo permite), su fila
+    de vista y sus pendientes de reportes.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        MovimientoInventario.objects.bulk_create(movimientos, batch_size=500)
+        MovimientoVista.registrar(movimientos)
+        MovimientoPendiente.encolar(movimientos)
+    else:
+        for mov in movimientos:
+            mov.save()  # save() ya registra la vista y los pendientes
+
+
+@transaction.atomic
+def aplicar_conteo(bodega, lineas, usuario=None, observacion=""):
+    """
+    Aplica el conteo físico de 'lineas' en 'bodega'. Devuelve
+    {"productos", "movimientos": [ids], "filas_actualizadas", "filas_nuevas"}.
+    """
+    conteos = leer_lineas(lineas)
+    if usuario is not None and not isinstance(usuario, get_user_model()):
+        # UsuarioToken (API): una instancia, para no leerla en cada movimiento
+        usuario = get_user_model().objects.filter(pk=usuario.pk).first()
+    observacion = observacion or "Conteo físico"
+
+    productos = Producto.objects.in_bulk(list(conteos))
+    ids = sorted(conteos)
+    actualizadas, nuevas, movimientos, asientos = [], [], [], []
+
+    for i in range(0, len(ids), BLOQUE):
+        bloque = ids[i:i + BLOQUE]
+        existentes = defaultdict(list)
+        for stock in (
+            Stock.objects.select_for_update()
+            .filter(bodega=bodega, producto_id__in=bloque)
+            .order_by("producto_id", "id")
+        ):
+            existentes[stock.producto_id].append(stock)
+
+        for producto_id in bloque:
+            conteo = conteos[producto_id]
+            cambios, lotes_nuevos = diferencia_conteo(existentes[producto_id], conteo)
+            if not cambios and not lotes_nuevos:
+                continue
+
+            mov = MovimientoInventario(
+                tipo=MovimientoInventario.TIPO_AJUSTE,
+                producto=productos[producto_id],
+                bodega_destino=bodega,
+                cantidad=sum(conteo.values(), Decimal("0")),
+                observacion=observacion,
+                creado_por=usuario,
+            )
+            movimientos.append(mov)
+            actualizadas.extend(stock for stock, _ in cambios)
+            for stock, antes in cambios:
+                asientos.append((mov, stock, antes))
+            for (lote, serie, vencimiento), cantidad in lotes_nuevos:
+                stock = Stock(
+                    producto_id=producto_id, bodega=bodega, lote=lote, serie=serie,
+                    fecha_vencimiento=vencimiento, cantidad=cantidad,
+                )
+                nuevas.append(stock)
+                asientos.append((mov, stock, Decimal("0")))
+
+    _crear_movimientos(movimientos)
+    Stock.objects.bulk_update(actualizadas, ["cantidad"], batch_size=500)
+    Stock.objects.bulk_create(nuevas, batch_size=500)
+    Kardex.objects.bulk_create(
+        [mov._asiento(stock, antes, stock.cantidad) for mov, stock, antes in asientos],
+        batch_size=1000,
+    )
+
+    return {
+        "productos": len(conteos),
+        "movimientos": [mov.id for mov in movimientos],
+        "filas_actualizadas": len(actualizadas),
+        "filas_nuevas": len(nuevas),
+    }
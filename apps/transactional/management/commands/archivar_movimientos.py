@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.reports.models import ValorizacionCierre
+from apps.reports.valorizacion import calcular_valorizacion, periodo_anterior, periodo_de
+from apps.transactional import archivo
+from apps.transactional.models import MovimientoInventario
+
+
+def _restar_meses(anio, mes, n):
+    total = anio * 12 + (mes - 1) - n
+    return total // 12, total % 12 + 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve los movimientos de inventario antiguos a la tabla de archivo "
+        "(MovimientoArchivo). Antes guarda la valorización al cierre del mes "
+        "anterior al corte (cantidad y valor por producto/bodega), que es el punto "
+        "de partida de los meses siguientes. No archiva movimientos que algún "
+        "proceso incremental de reportes todavía no sumó (MovimientoPendiente)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--meses-activos", type=int, default=13,
+                            help="Meses completos que permanecen en la tabla activa (default 13: "
+                                 "la analítica usa los últimos 12).")
+        parser.add_argument("--lote", type=int, default=archivo.BLOQUE,
+                            help=f"Movimientos por transacción (default {archivo.BLOQUE}).")
+
+    def handle(self, *args, **opts):
+        ahora = timezone.localtime()
+
+        # Corte: primer día del mes (actual - meses_activos), hora local
+        anio, mes = _restar_meses(ahora.year, ahora.month, max(1, opts["meses_activos"]))
+        corte = ahora.replace(year=anio, month=mes, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        # Punto de control: cierre del mes anterior al corte, para ambos métodos
+        periodo = periodo_anterior(periodo_de(corte))
+        for metodo, _ in ValorizacionCierre.METODOS:
+            calcular_valorizacion(periodo, metodo, guardar=True)
+
+        # archivar() deja fuera lo que algún proceso incremental tiene pendiente
+        movidos = archivo.archivar(corte, bloque=max(1, opts["lote"]))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Movimientos: {movidos} archivados (anteriores a {corte:%Y-%m-%d}); "
+            f"valorización guardada al cierre de {periodo}."
+        ))
+        pendientes = MovimientoInventario.objects.filter(fecha__lt=corte).count()
+        if pendientes:
+            self.stdout.write(self.style.WARNING(
+                f"{pendientes} movimientos anteriores al corte siguen activos: "
+                "hay procesos incrementales atrasados (ver MovimientoPendiente)."
+            ))
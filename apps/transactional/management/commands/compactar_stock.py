@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from apps.transactional.compactacion import BLOQUE, compactar_stock
+from apps.transactional.models import Bodega, Stock
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra las filas de Stock con cantidad 0 (lotes agotados) en bloques cortos, "
+        "sin esperar filas bloqueadas por movimientos en curso. Apto para correr con "
+        "el sistema en uso (cron nocturno o cada hora)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=BLOQUE,
+                            help=f"Filas por transacción (default {BLOQUE}).")
+        parser.add_argument("--pausa", type=float, default=0.0,
+                            help="Segundos de espera entre bloques (default 0).")
+        parser.add_argument("--max-lotes", type=int, default=None,
+                            help="Detenerse tras N bloques (el resto queda para la próxima pasada).")
+        parser.add_argument("--simular", action="store_true",
+                            help="Sólo cuenta las filas en cero, no borra.")
+
+    def handle(self, *args, **opts):
+        resultado = compactar_stock(
+            bloque=max(1, opts["lote"]),
+            pausa=max(0.0, opts["pausa"]),
+            max_bloques=opts["max_lotes"],
+            simular=opts["simular"],
+        )
+
+        nombres = dict(Bodega.objects.filter(id__in=resultado["por_bodega"]).values_list("id", "nombre"))
+        for bodega_id, n in sorted(resultado["por_bodega"].items(), key=lambda x: -x[1]):
+            self.stdout.write(f"  {nombres.get(bodega_id, bodega_id)}: {n}")
+
+        verbo = "a eliminar" if opts["simular"] else "eliminadas"
+        self.stdout.write(self.style.SUCCESS(
+            f"Stock: {resultado['eliminadas']} filas en cero {verbo} en {resultado['bloques']} bloques "
+            f"({resultado['segundos']}s); quedan {Stock.objects.count()} filas."
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.transactional.models import MovimientoVista, reconstruir_vista_movimientos
+
+
+class Command(BaseCommand):
+    help = (
+        "Llena MovimientoVista (listado/búsqueda/exportación de movimientos). "
+        "Sin opciones sólo agrega los movimientos posteriores al último proyectado; con --todo "
+        "reescribe todas las filas con los nombres actuales (se pierde el histórico)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--todo", action="store_true",
+                            help="Reescribe todas las filas, no sólo las faltantes.")
+        parser.add_argument("--bloque", type=int, default=2000,
+                            help="Movimientos por consulta/upsert (default 2000).")
+
+    def handle(self, *args, **opts):
+        desde_id = 0
+        if not opts["todo"]:
+            ultima = MovimientoVista.objects.order_by("-movimiento_id").values_list("movimiento_id", flat=True).first()
+            desde_id = ultima or 0
+        n = reconstruir_vista_movimientos(bloque=opts["bloque"], desde_id=desde_id)
+        self.stdout.write(self.style.SUCCESS(f"Movimientos proyectados: {n}"))
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:46
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('transactional', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Kardex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lote', models.CharField(blank=True, max_length=100, null=True)),
+                ('serie', models.CharField(blank=True, max_length=100, null=True)),
+                ('fecha_vencimiento', models.DateField(blank=True, null=True)),
+                ('cantidad_antes', models.DecimalField(decimal_places=3, max_digits=14)),
+                ('cantidad_despues', models.DecimalField(decimal_places=3, max_digits=14)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('bodega', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kardex', to='transactional.bodega')),
+                ('movimiento', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='kardex', to='transactional.movimientoinventario')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kardex', to='products.producto')),
+            ],
+            options={
+                'ordering': ('fecha', 'id'),
+                'indexes': [models.Index(fields=['producto', 'bodega', 'fecha'], name='kardex_prod_bod_fecha_idx'), models.Index(fields=['fecha'], name='kardex_fecha_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SnapshotStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('cantidad', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('tomado_en', models.DateTimeField()),
+                ('bodega', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots_stock', to='transactional.bodega')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots_stock', to='products.producto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['fecha'], name='snapshot_fecha_idx')],
+                'constraints': [models.UniqueConstraint(fields=('producto', 'bodega', 'fecha'), name='uniq_snapshot_prod_bod_fecha')],
+            },
+        ),
+    ]
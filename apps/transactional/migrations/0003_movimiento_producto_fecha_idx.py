@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('suppliers', '0001_initial'),
+        ('transactional', '0002_kardex_snapshot_stock'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movimientoinventario',
+            index=models.Index(fields=['producto', 'fecha'], name='mov_producto_fecha_idx'),
+        ),
+    ]
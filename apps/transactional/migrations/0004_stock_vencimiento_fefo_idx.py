@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('transactional', '0003_movimiento_producto_fecha_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['fecha_vencimiento', 'bodega', 'cantidad'], name='stock_venc_bodega_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['producto', 'bodega', 'fecha_vencimiento'], name='stock_fefo_idx'),
+        ),
+    ]
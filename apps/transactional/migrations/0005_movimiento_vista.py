@@ -0,0 +1,65 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def poblar_vista(apps, schema_editor):
+    MovimientoInventario = apps.get_model("transactional", "MovimientoInventario")
+    MovimientoVista = apps.get_model("transactional", "MovimientoVista")
+    filas = MovimientoInventario.objects.order_by().values(
+        "id", "tipo", "fecha", "cantidad", "lote", "serie", "fecha_vencimiento", "observacion",
+        "producto__sku", "producto__nombre", "bodega_origen__nombre", "bodega_destino__nombre",
+        "proveedor__razon_social", "proveedor__rut_nif", "creado_por__username",
+    )
+    lote = []
+    for m in filas.iterator(chunk_size=2000):
+        lote.append(MovimientoVista(
+            movimiento_id=m["id"], tipo=m["tipo"], fecha=m["fecha"], cantidad=m["cantidad"],
+            lote=m["lote"], serie=m["serie"], fecha_vencimiento=m["fecha_vencimiento"],
+            observacion=m["observacion"] or "",
+            sku=m["producto__sku"], producto_nombre=m["producto__nombre"],
+            bodega_origen=m["bodega_origen__nombre"] or "",
+            bodega_destino=m["bodega_destino__nombre"] or "",
+            proveedor=m["proveedor__razon_social"] or "",
+            proveedor_rut=m["proveedor__rut_nif"] or "",
+            usuario=m["creado_por__username"] or "",
+        ))
+        if len(lote) >= 2000:
+            MovimientoVista.objects.bulk_create(lote)
+            lote = []
+    MovimientoVista.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactional', '0004_stock_vencimiento_fefo_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoVista',
+            fields=[
+                ('movimiento', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='vista', serialize=False, to='transactional.movimientoinventario')),
+                ('tipo', models.CharField(choices=[('INGRESO', 'Ingreso'), ('SALIDA', 'Salida'), ('AJUSTE', 'Ajuste'), ('DEVOLUCION', 'Devolución'), ('TRANSFERENCIA', 'Transferencia')], max_length=20)),
+                ('fecha', models.DateTimeField()),
+                ('cantidad', models.DecimalField(decimal_places=3, max_digits=14)),
+                ('lote', models.CharField(blank=True, max_length=100, null=True)),
+                ('serie', models.CharField(blank=True, max_length=100, null=True)),
+                ('fecha_vencimiento', models.DateField(blank=True, null=True)),
+                ('observacion', models.TextField(blank=True)),
+                ('sku', models.CharField(max_length=50)),
+                ('producto_nombre', models.CharField(max_length=191)),
+                ('bodega_origen', models.CharField(blank=True, max_length=120)),
+                ('bodega_destino', models.CharField(blank=True, max_length=120)),
+                ('proveedor', models.CharField(blank=True, max_length=191)),
+                ('proveedor_rut', models.CharField(blank=True, max_length=20)),
+                ('usuario', models.CharField(blank=True, max_length=150)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['fecha'], name='movvista_fecha_idx'), models.Index(fields=['tipo', 'fecha'], name='movvista_tipo_fecha_idx'), models.Index(fields=['sku'], name='movvista_sku_idx'), models.Index(fields=['producto_nombre'], name='movvista_producto_idx'), models.Index(fields=['lote'], name='movvista_lote_idx')],
+            },
+        ),
+        migrations.RunPython(poblar_vista, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactional', '0005_movimiento_vista'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movimientovista',
+            index=models.Index(fields=['bodega_origen'], name='movvista_bod_origen_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movimientovista',
+            index=models.Index(fields=['bodega_destino'], name='movvista_bod_destino_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movimientovista',
+            index=models.Index(fields=['proveedor'], name='movvista_proveedor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movimientovista',
+            index=models.Index(fields=['proveedor_rut'], name='movvista_prov_rut_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movimientovista',
+            index=models.Index(fields=['usuario'], name='movvista_usuario_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:25
+
+from django.db import migrations, models
+
+
+def comprimir_archivo(apps, schema_editor):
+    # Tabla fría: en InnoDB se guarda comprimida (otros motores, sin cambios)
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute("ALTER TABLE transactional_movimientoarchivo ROW_FORMAT=COMPRESSED")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactional', '0006_movimiento_vista_busqueda_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoArchivo',
+            fields=[
+                ('tipo', models.CharField(choices=[('INGRESO', 'Ingreso'), ('SALIDA', 'Salida'), ('AJUSTE', 'Ajuste'), ('DEVOLUCION', 'Devolución'), ('TRANSFERENCIA', 'Transferencia')], max_length=20)),
+                ('fecha', models.DateTimeField()),
+                ('cantidad', models.DecimalField(decimal_places=3, max_digits=14)),
+                ('lote', models.CharField(blank=True, max_length=100, null=True)),
+                ('serie', models.CharField(blank=True, max_length=100, null=True)),
+                ('fecha_vencimiento', models.DateField(blank=True, null=True)),
+                ('observacion', models.TextField(blank=True)),
+                ('sku', models.CharField(max_length=50)),
+                ('producto_nombre', models.CharField(max_length=191)),
+                ('bodega_origen', models.CharField(blank=True, max_length=120)),
+                ('bodega_destino', models.CharField(blank=True, max_length=120)),
+                ('proveedor', models.CharField(blank=True, max_length=191)),
+                ('proveedor_rut', models.CharField(blank=True, max_length=20)),
+                ('usuario', models.CharField(blank=True, max_length=150)),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('periodo', models.PositiveIntegerField()),
+                ('producto_id', models.BigIntegerField()),
+                ('proveedor_id', models.BigIntegerField(null=True)),
+                ('bodega_origen_id', models.BigIntegerField(null=True)),
+                ('bodega_destino_id', models.BigIntegerField(null=True)),
+                ('creado_por_id', models.BigIntegerField(null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['periodo'], name='movarch_periodo_idx'), models.Index(fields=['fecha'], name='movarch_fecha_idx'), models.Index(fields=['producto_id', 'fecha'], name='movarch_producto_fecha_idx'), models.Index(fields=['sku'], name='movarch_sku_idx'), models.Index(fields=['lote'], name='movarch_lote_idx')],
+            },
+        ),
+        migrations.RunPython(comprimir_archivo, migrations.RunPython.noop),
+    ]
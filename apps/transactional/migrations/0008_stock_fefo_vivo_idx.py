@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('transactional', '0007_movimiento_archivo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(condition=models.Q(('cantidad__gt', 0)), fields=['producto', 'bodega', 'fecha_vencimiento'], name='stock_fefo_vivo_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactional', '0008_stock_fefo_vivo_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoPendiente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('proceso', models.CharField(max_length=20)),
+                ('movimiento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pendientes', to='transactional.movimientoinventario')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('proceso', 'movimiento'), name='uniq_movpendiente')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactional', '0009_movimiento_pendiente'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='kardex',
+            name='movimiento',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='kardex', to='transactional.movimientoinventario'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from apps.suppliers.validators import normalizar_rut
+
+
+def normalizar(apps, schema_editor):
+    """proveedor_rut se guarda como normalizar_rut(rut_nif), igual que la búsqueda rut:."""
+    for nombre in ("MovimientoVista", "MovimientoArchivo"):
+        modelo = apps.get_model("transactional", nombre)
+        ruts = modelo.objects.exclude(proveedor_rut="").values_list("proveedor_rut", flat=True).distinct()
+        for rut in list(ruts):
+            limpio = normalizar_rut(rut)
+            if limpio != rut:
+                modelo.objects.filter(proveedor_rut=rut).update(proveedor_rut=limpio)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactional", "0010_kardex_movimiento_sin_fk"),
+    ]
+
+    operations = [
+        migrations.RunPython(normalizar, migrations.RunPython.noop),
+    ]
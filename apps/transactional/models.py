@@ -1,11 +1,15 @@
-from django.db import models, transaction
+from django.db import connection, models, transaction
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
 from decimal import Decimal
 
+from apps.products.catalogos import invalidar_catalogos
 from apps.products.models import Producto
 from apps.suppliers.models import Proveedor
+from apps.suppliers.validators import normalizar_rut
 
 
 class Bodega(models.Model):
@@ -19,6 +23,93 @@ class Bodega(models.Model):
     def __str__(self):
         return self.nombre
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        transaction.on_commit(invalidar_catalogos)
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        transaction.on_commit(invalidar_catalogos)
+        return resultado
+
+
+class StockQuerySet(models.QuerySet):
+
+    def disponibles(self):
+        return self.filter(cantidad__gt=0)
+
+    def fefo(self, producto, bodega):
+        """
+        Registros con saldo del producto en la bodega, en orden FEFO
+        (primero el que vence antes; los sin vencimiento al final).
+        Se resuelve con el índice (producto, bodega, fecha_vencimiento).
+        """
+        return (
+            self.disponibles()
+            .filter(producto=producto, bodega=bodega)
+            .order_by(models.F("fecha_vencimiento").asc(nulls_last=True), "id")
+        )
+
+    def por_vencer(self, dias, desde=None):
+        """
+        Lotes con saldo que vencen en los próximos 'dias' días (incluye
+        los ya vencidos), en todas las bodegas. Rango sobre el índice
+        (fecha_vencimiento, bodega).
+        """
+        desde = desde or timezone.localdate()
+        return (
+            self.disponibles()
+            .filter(fecha_vencimiento__isnull=False, fecha_vencimiento__lte=desde + timedelta(days=dias))
+            .order_by("fecha_vencimiento", "bodega_id", "id")
+        )
+
+
+def asignar_fefo(producto, bodega, cantidad, bloquear=False):
+    """
+    Reparte 'cantidad' entre los lotes de la bodega en orden FEFO.
+    Devuelve (asignaciones, faltante) con asignaciones = [(stock, cantidad_tomada)].
+    No modifica nada: sirve para previsualizar una salida y para aplicarla.
+    """
+    qs = Stock.objects.fefo(producto, bodega)
+    if bloquear:
+        qs = qs.select_for_update()
+
+    asignaciones = []
+    pendiente = cantidad
+    for stock in qs.iterator(chunk_size=100):
+        if pendiente <= 0:
+            break
+        tomar = min(stock.cantidad, pendiente)
+        asignaciones.append((stock, tomar))
+        pendiente -= tomar
+    return asignaciones, max(pendiente, Decimal("0"))
+
+
+def clave_lote(lote, serie, fecha_vencimiento):
+    """Identidad de un lote dentro de (producto, bodega). '' y NULL son lo mismo."""
+    return (lote or None, serie or None, fecha_vencimiento)
+
+
+def diferencia_conteo(existentes, conteo):
+    """
+    Compara las filas de Stock de un (producto, bodega) con un conteo físico
+    {clave_lote: cantidad}; los lotes que no aparecen en el conteo quedan en 0.
+    No escribe: devuelve (cambios, nuevos) con
+    - cambios = [(stock, cantidad_antes)], ya con la cantidad contada asignada
+      (sólo las filas cuya cantidad cambia);
+    - nuevos = [(clave_lote, cantidad)], lotes contados (> 0) sin fila.
+    """
+    pendientes = dict(conteo)
+    cambios = []
+    for stock in existentes:
+        # Si dos filas comparten clave ('' y NULL), la primera recibe el conteo
+        contado = pendientes.pop(clave_lote(stock.lote, stock.serie, stock.fecha_vencimiento), Decimal("0"))
+        if contado != stock.cantidad:
+            cambios.append((stock, stock.cantidad))
+            stock.cantidad = contado
+    nuevos = [(clave, cantidad) for clave, cantidad in pendientes.items() if cantidad > 0]
+    return cambios, nuevos
+
 
 class Stock(models.Model):
     producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name="stocks")
@@ -28,8 +119,25 @@ class Stock(models.Model):
     fecha_vencimiento = models.DateField(blank=True, null=True)
     cantidad = models.DecimalField(max_digits=14, decimal_places=3, default=0)
 
+    objects = StockQuerySet.as_manager()
+
     class Meta:
         unique_together = ("producto", "bodega", "lote", "serie", "fecha_vencimiento")
+        indexes = [
+            # Reporte de vencimientos: rango por fecha en todas las bodegas.
+            # 'cantidad' va en el índice para descartar saldos en cero sin leer la fila.
+            models.Index(fields=["fecha_vencimiento", "bodega", "cantidad"], name="stock_venc_bodega_idx"),
+            # Asignación FEFO de una salida: (producto, bodega) ordenado por vencimiento
+            models.Index(fields=["producto", "bodega", "fecha_vencimiento"], name="stock_fefo_idx"),
+            # Lo mismo sólo sobre lotes con saldo (= disponibles()). Parcial: PostgreSQL
+            # y SQLite lo crean; MySQL lo omite (models.W037) y queda stock_fefo_idx.
+            # Las filas en cero las limpia el comando compactar_stock.
+            models.Index(
+                fields=["producto", "bodega", "fecha_vencimiento"],
+                condition=models.Q(cantidad__gt=0),
+                name="stock_fefo_vivo_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.producto} @ {self.bodega} = {self.cantidad}"
@@ -70,6 +178,23 @@ class MovimientoInventario(models.Model):
     observacion = models.TextField(blank=True)
     creado_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Valorización y reportes recorren los movimientos por (producto, fecha)
+            models.Index(fields=["producto", "fecha"], name="mov_producto_fecha_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # La vista y los pendientes de reportes se escriben sólo al crear el
+        # movimiento (la vista es el registro tal como quedó en ese momento,
+        # así un UPDATE no la reescribe) y en su misma transacción.
+        nuevo = self._state.adding
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            if nuevo:
+                MovimientoVista.registrar([self])
+                MovimientoPendiente.encolar([self])
+
     # -------------------------------
     # VALIDACIONES
     # -------------------------------
@@ -104,23 +229,74 @@ class MovimientoInventario(models.Model):
 
     # -------------------------------
     # LÓGICA DE STOCK
-    # -------------------------------
-        # -------------------------------
-    # LÓGICA DE STOCK
     # -------------------------------
     @transaction.atomic
     def aplicar_a_stock(self):
-
-        from .models import Stock  # por si no está arriba (ajusta si ya está importado)
-
-        def key(bod):
-            return dict(
-                producto=self.producto,
-                bodega=bod,
-                lote=self.lote,
-                serie=self.serie,
-                fecha_vencimiento=self.fecha_vencimiento,
-            )
+        """
+        Aplica el movimiento sobre Stock y deja en Kardex el antes/después
+        de cada fila de stock tocada (incluidas las que AJUSTE deja en 0).
+        """
+        asientos = []
+        self._mover_stock(asientos)
+        if asientos:
+            Kardex.objects.bulk_create(asientos)
+
+    def _asiento(self, stock, antes, despues):
+        return Kardex(
+            movimiento=self,
+            producto_id=stock.producto_id,
+            bodega_id=stock.bodega_id,
+            lote=stock.lote,
+            serie=stock.serie,
+            fecha_vencimiento=stock.fecha_vencimiento,
+            cantidad_antes=antes,
+            cantidad_despues=despues,
+        )
+
+    def _descontar_fefo(self, bodega, asientos, mensaje_error):
+        """Resta self.cantidad de los lotes de la bodega en orden FEFO."""
+        asignaciones, faltante = asignar_fefo(self.producto, bodega, self.cantidad, bloquear=True)
+        if faltante > 0:
+            # Salvaguarda, no debería pasar si la validación estuvo bien
+            raise ValidationError(mensaje_error)
+
+        for stock_record, a_descontar in asignaciones:
+            antes = stock_record.cantidad
+            stock_record.cantidad -= a_descontar
+            stock_record.save(update_fields=["cantidad"])
+            asientos.append(self._asiento(stock_record, antes, stock_record.cantidad))
+
+    def _sumar(self, bodega, asientos):
+        stock_destino, _ = Stock.objects.select_for_update().get_or_create(
+            producto=self.producto,
+            bodega=bodega,
+            lote=self.lote,
+            serie=self.serie,
+            fecha_vencimiento=self.fecha_vencimiento,
+        )
+        antes = stock_destino.cantidad or Decimal("0")
+        stock_destino.cantidad = antes + self.cantidad
+        stock_destino.save()
+        asientos.append(self._asiento(stock_destino, antes, stock_destino.cantidad))
+
+    def _aplicar_conteo(self, bodega, existentes, conteo, asientos):
+        """
+        Lleva las filas 'existentes' (bloqueadas) al conteo {clave_lote: cantidad}:
+        UPDATE sólo de las que cambian, INSERT de los lotes contados sin fila.
+        """
+        cambios, nuevos = diferencia_conteo(existentes, conteo)
+        Stock.objects.bulk_update([stock for stock, _ in cambios], ["cantidad"], batch_size=500)
+        creados = Stock.objects.bulk_create([
+            Stock(producto_id=self.producto_id, bodega=bodega, lote=lote, serie=serie,
+                  fecha_vencimiento=vencimiento, cantidad=cantidad)
+            for (lote, serie, vencimiento), cantidad in nuevos
+        ])
+        for stock, antes in cambios:
+            asientos.append(self._asiento(stock, antes, stock.cantidad))
+        for stock in creados:
+            asientos.append(self._asiento(stock, Decimal("0"), stock.cantidad))
+
+    def _mover_stock(self, asientos):
 
         # -----------------------------------------
         # INGRESO y DEVOLUCIÓN  ->  SUMAR STOCK
@@ -131,9 +307,7 @@ class MovimientoInventario(models.Model):
             if not bod:
                 raise ValidationError("No hay bodega definida para aplicar el ingreso/devolución.")
 
-            stock_destino, _ = Stock.objects.select_for_update().get_or_create(**key(bod))
-            stock_destino.cantidad = (stock_destino.cantidad or Decimal("0")) + self.cantidad
-            stock_destino.save()
+            self._sumar(bod, asientos)
             return
 
         # -----------------------------------------
@@ -149,37 +323,15 @@ class MovimientoInventario(models.Model):
             if total_stock_bodega < self.cantidad:
                 raise ValidationError("Stock insuficiente para realizar salida.")
 
-            # 2. Restar la cantidad de la bodega, descontando de los registros existentes (FIFO).
-            cantidad_a_restar = self.cantidad
-            stock_records = (
-                Stock.objects.select_for_update()
-                .filter(
-                    producto=self.producto,
-                    bodega=self.bodega_origen,
-                    cantidad__gt=0,
-                )
-                .order_by("fecha_vencimiento", "id")  # FIFO
+            # 2. Restar la cantidad de la bodega, descontando de los lotes que vencen antes (FEFO).
+            self._descontar_fefo(
+                self.bodega_origen, asientos,
+                "Error de consistencia: no se pudo descontar todo el stock de salida.",
             )
-
-            for stock_record in stock_records:
-                if cantidad_a_restar <= 0:
-                    break
-
-                cantidad_a_descontar = min(stock_record.cantidad, cantidad_a_restar)
-                stock_record.cantidad -= cantidad_a_descontar
-                cantidad_a_restar -= cantidad_a_descontar
-                stock_record.save()
-
-            if cantidad_a_restar > 0:
-                # Salvaguarda, no debería pasar si la validación estuvo bien
-                raise ValidationError(
-                    "Error de consistencia: no se pudo descontar todo el stock de salida."
-                )
-
             return
 
         # -----------------------------------------
-        # AJUSTE  ->  REEMPLAZAR STOCK
+        # AJUSTE  ->  FIJAR STOCK (CONTEO DE UN LOTE)
         # -----------------------------------------
         if self.tipo == self.TIPO_AJUSTE:
             # Para ajuste se usa la bodega destino; si no, la origen
@@ -187,21 +339,11 @@ class MovimientoInventario(models.Model):
             if not bod:
                 raise ValidationError("Debe indicar una bodega para realizar el ajuste.")
 
-            # 1. Borrar TODO el stock del producto en esa bodega
-            Stock.objects.filter(producto=self.producto, bodega=bod).delete()
-
-            # 2. Si la cantidad > 0, crear un registro con exactamente esa cantidad
-            if self.cantidad > 0:
-                Stock.objects.create(
-                    producto=self.producto,
-                    bodega=bod,
-                    cantidad=self.cantidad,
-                    # Si quieres, aquí podrías setear lote/serie si aplica
-                    lote=self.lote or None,
-                    serie=self.serie or None,
-                    fecha_vencimiento=self.fecha_vencimiento,
-                )
-            # Si la cantidad es 0, simplemente deja la bodega sin stock
+            # El stock de la bodega pasa a ser exactamente este lote con esta
+            # cantidad: el resto de los lotes queda en 0 (sin borrar filas)
+            existentes = Stock.objects.select_for_update().filter(producto=self.producto, bodega=bod)
+            conteo = {clave_lote(self.lote, self.serie, self.fecha_vencimiento): self.cantidad}
+            self._aplicar_conteo(bod, list(existentes.order_by("id")), conteo, asientos)
             return
 
         # -----------------------------------------
@@ -228,98 +370,308 @@ class MovimientoInventario(models.Model):
             if total_stock_origen < self.cantidad:
                 raise ValidationError("Stock insuficiente en bodega origen para transferir.")
 
-            # 2. Restar de origen (igual que SALIDA, FIFO)
-            cantidad_a_restar = self.cantidad
-            stock_records_origen = (
-                Stock.objects.select_for_update()
-                .filter(
-                    producto=self.producto,
-                    bodega=self.bodega_origen,
-                    cantidad__gt=0,
-                )
-                .order_by("fecha_vencimiento", "id")  # FIFO
+            # 2. Restar de origen (igual que SALIDA, FEFO)
+            self._descontar_fefo(
+                self.bodega_origen, asientos,
+                "Error de consistencia: no se pudo descontar todo el stock de origen.",
             )
 
-            for stock_record in stock_records_origen:
-                if cantidad_a_restar <= 0:
-                    break
+            # 3. Sumar en destino
+            self._sumar(self.bodega_destino, asientos)
+            return
 
-                a_descontar = min(stock_record.cantidad, cantidad_a_restar)
-                stock_record.cantidad -= a_descontar
-                cantidad_a_restar -= a_descontar
-                stock_record.save()
 
-            if cantidad_a_restar > 0:
-                raise ValidationError(
-                    "Error de consistencia: no se pudo descontar todo el stock de origen."
-                )
+# ================================================================
+# VISTA DESNORMALIZADA DE MOVIMIENTOS (LISTADO / BÚSQUEDA / EXPORT)
+# ================================================================
 
-            # 3. Sumar en destino
-            stock_destino, _ = Stock.objects.select_for_update().get_or_create(
-                **key(self.bodega_destino)
-            )
-            stock_destino.cantidad = (stock_destino.cantidad or Decimal("0")) + self.cantidad
-            stock_destino.save()
-            return
+class MovimientoVistaBase(models.Model):
+    """Columnas desnormalizadas de un movimiento (vista activa y archivo)."""
+    tipo = models.CharField(max_length=20, choices=MovimientoInventario.TIPOS)
+    fecha = models.DateTimeField()
+    cantidad = models.DecimalField(max_digits=14, decimal_places=3)
+    lote = models.CharField(max_length=100, blank=True, null=True)
+    serie = models.CharField(max_length=100, blank=True, null=True)
+    fecha_vencimiento = models.DateField(blank=True, null=True)
+    observacion = models.TextField(blank=True)
 
+    sku = models.CharField(max_length=50)
+    producto_nombre = models.CharField(max_length=191)
+    bodega_origen = models.CharField(max_length=120, blank=True)
+    bodega_destino = models.CharField(max_length=120, blank=True)
+    proveedor = models.CharField(max_length=191, blank=True)
+    proveedor_rut = models.CharField(max_length=20, blank=True)  # normalizar_rut: sin puntos ni guión
+    usuario = models.CharField(max_length=150, blank=True)
 
-        # AJUSTE (SET ABSOLUTO)
-        if self.tipo == self.TIPO_AJUSTE:
-            bod = self.bodega_destino or self.bodega_origen
-            # Lógica de ajuste corregida:
-            # 1. Borra todo el stock existente para este producto en esta bodega.
-            #    Esto simplifica el proceso y evita crear registros duplicados si hay lotes/series.
-            Stock.objects.filter(producto=self.producto, bodega=bod).delete()
-
-            # 2. Si la cantidad de ajuste es mayor que cero, crea un nuevo registro de stock.
-            #    Si la cantidad es cero, el paso anterior ya dejó el stock en cero.
-            if self.cantidad > 0:
-                Stock.objects.create(
-                    producto=self.producto,
-                    bodega=bod,
-                    cantidad=self.cantidad,
-                    # Se puede asignar el lote/serie del ajuste si se desea, o dejarlo en blanco.
-                )
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.tipo} {self.sku} {self.cantidad}"
+
+
+class MovimientoVista(MovimientoVistaBase):
+    """
+    Proyección de lectura de MovimientoInventario: una fila por movimiento
+    con SKU, nombre de producto, bodegas, proveedor y usuario copiados tal
+    como estaban al registrarlo. El listado, la búsqueda y la exportación
+    leen sólo esta tabla (sin los 5 JOIN) y quedan como registro histórico
+    aunque después cambien los nombres.
+    Se escribe en MovimientoInventario.save() al crear el movimiento; quien
+    inserte movimientos por bulk_create debe llamar a
+    MovimientoVista.registrar(movs).
+    """
+    movimiento = models.OneToOneField(
+        MovimientoInventario, on_delete=models.CASCADE, primary_key=True, related_name="vista"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["fecha"], name="movvista_fecha_idx"),
+            models.Index(fields=["tipo", "fecha"], name="movvista_tipo_fecha_idx"),
+            models.Index(fields=["sku"], name="movvista_sku_idx"),
+            models.Index(fields=["producto_nombre"], name="movvista_producto_idx"),
+            models.Index(fields=["lote"], name="movvista_lote_idx"),
+            # Búsqueda clave:valor (ver busqueda.py): prefijos sobre columnas indexadas
+            models.Index(fields=["bodega_origen"], name="movvista_bod_origen_idx"),
+            models.Index(fields=["bodega_destino"], name="movvista_bod_destino_idx"),
+            models.Index(fields=["proveedor"], name="movvista_proveedor_idx"),
+            models.Index(fields=["proveedor_rut"], name="movvista_prov_rut_idx"),
+            models.Index(fields=["usuario"], name="movvista_usuario_idx"),
+        ]
+
+    @classmethod
+    def desde_movimiento(cls, mov):
+        origen, destino = mov.bodega_origen, mov.bodega_destino
+        proveedor, usuario = mov.proveedor, mov.creado_por
+        return cls(
+            movimiento_id=mov.pk,
+            tipo=mov.tipo,
+            fecha=mov.fecha,
+            cantidad=mov.cantidad,
+            lote=mov.lote,
+            serie=mov.serie,
+            fecha_vencimiento=mov.fecha_vencimiento,
+            observacion=mov.observacion or "",
+            sku=mov.producto.sku,
+            producto_nombre=mov.producto.nombre,
+            bodega_origen=origen.nombre if origen else "",
+            bodega_destino=destino.nombre if destino else "",
+            proveedor=proveedor.razon_social if proveedor else "",
+            proveedor_rut=normalizar_rut(proveedor.rut_nif) if proveedor else "",
+            usuario=usuario.get_username() if usuario else "",
+        )
+
+    @classmethod
+    def registrar(cls, movimientos, batch_size=1000):
+        """Inserta o reemplaza la fila de vista de cada movimiento (ya guardado)."""
+        filas = [cls.desde_movimiento(m) for m in movimientos]
+        if not filas:
             return
+        campos = [f.name for f in cls._meta.concrete_fields if not f.primary_key]
+        kwargs = {"update_conflicts": True, "update_fields": campos}
+        if connection.features.supports_update_conflicts_with_target:
+            kwargs["unique_fields"] = ["movimiento"]
+        cls.objects.bulk_create(filas, batch_size=batch_size, **kwargs)
+
+
+def reconstruir_vista_movimientos(bloque=2000, desde_id=0):
+    """
+    Llena MovimientoVista para los movimientos con id > desde_id (backfill
+    o reparación). Recorre por rangos de id con select_related: una consulta
+    y un upsert por bloque. Devuelve cuántos movimientos procesó.
+    """
+    total = 0
+    ultimo = desde_id
+    base = MovimientoInventario.objects.select_related(
+        "producto", "proveedor", "bodega_origen", "bodega_destino", "creado_por"
+    ).order_by("id")
+    while True:
+        movs = list(base.filter(id__gt=ultimo)[:bloque])
+        if not movs:
+            return total
+        with transaction.atomic():
+            MovimientoVista.registrar(movs, batch_size=bloque)
+        total += len(movs)
+        ultimo = movs[-1].id
+
+
+# ================================================================
+# PENDIENTES DE LOS PROCESOS INCREMENTALES DE REPORTES
+# ================================================================
+
+class MovimientoPendiente(models.Model):
+    """
+    Movimiento que un proceso incremental de reportes todavía no sumó a su
+    tabla. Se inserta en la misma transacción que el movimiento, así queda
+    visible justo cuando éste confirma, en el orden que sea; el proceso lo
+    borra en la transacción en que lo suma (ver apps.reports.incremental).
+    Quien inserte movimientos por bulk_create debe llamar a
+    MovimientoPendiente.encolar(movs).
+    """
+    METRICAS = "metricas"
+    DIARIO = "diario"
+    RESUMEN = "resumen"
+    PROCESOS = (METRICAS, DIARIO, RESUMEN)
+
+    proceso = models.CharField(max_length=20)
+    movimiento = models.ForeignKey(MovimientoInventario, on_delete=models.CASCADE, related_name="pendientes")
 
-        # TRANSFERENCIA
-        if self.tipo == self.TIPO_TRANSFERENCIA:
-            # 1. Validar que haya stock suficiente en la bodega de origen.
-            total_stock_origen = Stock.objects.filter(
-                producto=self.producto, bodega=self.bodega_origen
-            ).aggregate(total=models.Sum('cantidad'))['total'] or Decimal('0')
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["proceso", "movimiento"], name="uniq_movpendiente"),
+        ]
 
-            if total_stock_origen < self.cantidad:
-                raise ValidationError("Stock insuficiente en bodega origen.")
+    def __str__(self):
+        return f"{self.proceso}: {self.movimiento_id}"
+
+    @classmethod
+    def encolar(cls, movimientos, batch_size=1000):
+        """Una fila por proceso para cada movimiento (ya guardado)."""
+        cls.objects.bulk_create(
+            [cls(proceso=proceso, movimiento_id=m.pk) for m in movimientos for proceso in cls.PROCESOS],
+            batch_size=batch_size,
+        )
+
+
+# ================================================================
+# ARCHIVO DE MOVIMIENTOS ANTIGUOS
+# ================================================================
+
+class MovimientoArchivo(MovimientoVistaBase):
+    """
+    Movimientos anteriores al corte de archivo (comando archivar_movimientos),
+    fuera de la tabla activa. Conserva el id original, los nombres
+    desnormalizados (como MovimientoVista) y los ids de producto, proveedor,
+    bodegas y usuario como enteros sin FK: el producto o la bodega pueden
+    borrarse después sin perder la historia. En MySQL la tabla es
+    ROW_FORMAT=COMPRESSED (ver la migración).
+    Sólo se lee cuando el rango de fechas pedido llega al archivo
+    (ver apps.transactional.archivo).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    periodo = models.PositiveIntegerField()  # AAAAMM, para purgar o restaurar meses completos
+    producto_id = models.BigIntegerField()
+    proveedor_id = models.BigIntegerField(null=True)
+    bodega_origen_id = models.BigIntegerField(null=True)
+    bodega_destino_id = models.BigIntegerField(null=True)
+    creado_por_id = models.BigIntegerField(null=True)
 
-            # 2. Restar la cantidad de la bodega de origen (lógica idéntica a SALIDA para máxima robustez).
-            cantidad_a_restar = self.cantidad
-            stock_records_origen = Stock.objects.select_for_update().filter(
-                producto=self.producto,
-                bodega=self.bodega_origen,
-                cantidad__gt=0
-            ).order_by('fecha_vencimiento', 'id') # Estrategia FIFO
-
-            for stock_record in stock_records_origen:
-                if cantidad_a_restar <= 0:
-                    break
-
-                a_descontar = min(stock_record.cantidad, cantidad_a_restar)
-                stock_record.cantidad -= a_descontar
-                cantidad_a_restar -= a_descontar
-                stock_record.save()
-
-            if cantidad_a_restar > 0:
-                # Esta situación no debería ocurrir si la validación inicial es correcta.
-                # Es una salvaguarda.
-                raise ValidationError(
-                    "Error de consistencia: no se pudo descontar todo el stock de origen."
-                )
-
-            # 3. Sumar la cantidad a la bodega de destino.
-            #    Se usa get_or_create para añadir al stock existente o crear uno nuevo.
-            #    La función key() asegura que se agrupe por producto, bodega, lote, etc.
-            stock_destino, _ = Stock.objects.select_for_update().get_or_create(**key(self.bodega_destino))
-            stock_destino.cantidad = (stock_destino.cantidad or Decimal("0")) + self.cantidad
-            stock_destino.save()
-            return
+    class Meta:
+        indexes = [
+            models.Index(fields=["periodo"], name="movarch_periodo_idx"),
+            models.Index(fields=["fecha"], name="movarch_fecha_idx"),
+            models.Index(fields=["producto_id", "fecha"], name="movarch_producto_fecha_idx"),
+            models.Index(fields=["sku"], name="movarch_sku_idx"),
+            models.Index(fields=["lote"], name="movarch_lote_idx"),
+        ]
+
+    @classmethod
+    def desde_vista(cls, vista, mov):
+        """Fila de archivo a partir de la fila de vista y del movimiento (values())."""
+        campos = {f.name: getattr(vista, f.name) for f in MovimientoVistaBase._meta.fields}
+        return cls(
+            id=mov["id"],
+            periodo=int(timezone.localtime(mov["fecha"]).strftime("%Y%m")),
+            producto_id=mov["producto_id"],
+            proveedor_id=mov["proveedor_id"],
+            bodega_origen_id=mov["bodega_origen_id"],
+            bodega_destino_id=mov["bodega_destino_id"],
+            creado_por_id=mov["creado_por_id"],
+            **campos,
+        )
+
+
+# ================================================================
+# KARDEX (LIBRO DE STOCK) Y SNAPSHOTS
+# ================================================================
+
+class Kardex(models.Model):
+    """
+    Una fila por cada registro de Stock que un movimiento modifica:
+    cantidad antes y después. Sólo se inserta, nunca se edita.
+    Permite reconstruir el stock en cualquier fecha partiendo del
+    último SnapshotStock, sin recorrer todo MovimientoInventario.
+    'movimiento' no tiene restricción en la BD ni se toca al borrar: al
+    archivar, el movimiento pasa a MovimientoArchivo con el mismo id y el
+    asiento lo sigue apuntando.
+    """
+    movimiento = models.ForeignKey(
+        MovimientoInventario, on_delete=models.DO_NOTHING, db_constraint=False,
+        null=True, blank=True, related_name="kardex",
+    )
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name="kardex")
+    bodega = models.ForeignKey(Bodega, on_delete=models.CASCADE, related_name="kardex")
+    lote = models.CharField(max_length=100, blank=True, null=True)
+    serie = models.CharField(max_length=100, blank=True, null=True)
+    fecha_vencimiento = models.DateField(blank=True, null=True)
+    cantidad_antes = models.DecimalField(max_digits=14, decimal_places=3)
+    cantidad_despues = models.DecimalField(max_digits=14, decimal_places=3)
+    fecha = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ("fecha", "id")
+        indexes = [
+            # stock_en_fecha: deltas de (producto, bodega) en un rango de fechas
+            models.Index(fields=["producto", "bodega", "fecha"], name="kardex_prod_bod_fecha_idx"),
+            models.Index(fields=["fecha"], name="kardex_fecha_idx"),
+        ]
+
+    @property
+    def delta(self):
+        return self.cantidad_despues - self.cantidad_antes
+
+    def __str__(self):
+        return f"{self.producto} @ {self.bodega}: {self.cantidad_antes} -> {self.cantidad_despues}"
+
+
+class SnapshotStock(models.Model):
+    """
+    Foto diaria del stock total por (producto, bodega).
+    'tomado_en' es el instante exacto de la foto: los asientos de Kardex
+    posteriores a ese instante son los que hay que sumar.
+    """
+    fecha = models.DateField()
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name="snapshots_stock")
+    bodega = models.ForeignKey(Bodega, on_delete=models.CASCADE, related_name="snapshots_stock")
+    cantidad = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    tomado_en = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["producto", "bodega", "fecha"], name="uniq_snapshot_prod_bod_fecha"),
+        ]
+        indexes = [
+            models.Index(fields=["fecha"], name="snapshot_fecha_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} {self.producto} @ {self.bodega} = {self.cantidad}"
+
+
+def stock_en_fecha(producto, bodega, momento):
+    """
+    Stock total de 'producto' en 'bodega' en el instante 'momento' (aware).
+    Costo: una lectura del último snapshot anterior + la suma de los
+    asientos de Kardex entre el snapshot y 'momento' (rango sobre índice).
+    """
+    producto_id = getattr(producto, "pk", producto)
+    bodega_id = getattr(bodega, "pk", bodega)
+
+    snapshot = (
+        SnapshotStock.objects.filter(producto_id=producto_id, bodega_id=bodega_id, tomado_en__lte=momento)
+        .order_by("-tomado_en")
+        .values("cantidad", "tomado_en")
+        .first()
+    )
+
+    asientos = Kardex.objects.filter(producto_id=producto_id, bodega_id=bodega_id, fecha__lte=momento)
+    base = Decimal("0")
+    if snapshot:
+        base = snapshot["cantidad"]
+        asientos = asientos.filter(fecha__gt=snapshot["tomado_en"])
+
+    delta = asientos.aggregate(
+        total=models.Sum(models.F("cantidad_despues") - models.F("cantidad_antes"))
+    )["total"] or Decimal("0")
+    return base + delta
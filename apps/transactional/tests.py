@@ -1,3 +1,238 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.test import SimpleTestCase, TestCase
+
+from apps.products.models import Categoria, Producto
+from apps.suppliers.models import Proveedor
+
+from .busqueda import parsear
+from .conteo import aplicar_conteo, leer_lineas
+from .models import (
+    Bodega, Kardex, MovimientoInventario, MovimientoVista, Stock, clave_lote, diferencia_conteo,
+)
+
+
+def _producto(sku="SKU-1"):
+    categoria, _ = Categoria.objects.get_or_create(nombre="General")
+    return Producto.objects.create(sku=sku, nombre=f"Producto {sku}", categoria=categoria)
+
+
+class BaseInventario(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.producto = _producto()
+        cls.central = Bodega.objects.create(nombre="Central")
+        cls.sala = Bodega.objects.create(nombre="Sala")
+
+    def mover(self, tipo, cantidad, origen=None, destino=None, **lote):
+        mov = MovimientoInventario(
+            tipo=tipo, producto=self.producto, cantidad=Decimal(cantidad),
+            bodega_origen=origen, bodega_destino=destino, **lote,
+        )
+        mov.full_clean()
+        mov.save()
+        mov.aplicar_a_stock()
+        return mov
+
+    def stock(self, bodega, lote):
+        return Stock.objects.get(producto=self.producto, bodega=bodega, lote=lote).cantidad
+
+
+# ================================================================
+# STOCK Y KARDEX
+# ================================================================
+
+class AplicarAStockTests(BaseInventario):
+
+    def test_ingreso_suma_y_deja_asiento(self):
+        self.mover("INGRESO", "10", destino=self.central, lote="L1")
+        mov = self.mover("INGRESO", "5", destino=self.central, lote="L1")
+
+        self.assertEqual(self.stock(self.central, "L1"), Decimal("15"))
+        asiento = Kardex.objects.get(movimiento=mov)
+        self.assertEqual((asiento.cantidad_antes, asiento.cantidad_despues), (Decimal("10"), Decimal("15")))
+
+    def test_salida_descuenta_fefo(self):
+        self.mover("INGRESO", "5", destino=self.central, lote="TARDE", fecha_vencimiento=date(2031, 1, 1))
+        self.mover("INGRESO", "5", destino=self.central, lote="PRONTO", fecha_vencimiento=date(2030, 1, 1))
+        self.mover("INGRESO", "5", destino=self.central, lote="SIN")
+
+        mov = self.mover("SALIDA", "7", origen=self.central)
+
+        self.assertEqual(self.stock(self.central, "PRONTO"), 0)
+        self.assertEqual(self.stock(self.central, "TARDE"), Decimal("3"))
+        self.assertEqual(self.stock(self.central, "SIN"), Decimal("5"))
+        self.assertEqual(sum(k.delta for k in Kardex.objects.filter(movimiento=mov)), Decimal("-7"))
+
+    def test_salida_sin_stock_no_toca_nada(self):
+        self.mover("INGRESO", "2", destino=self.central, lote="L1")
+        with self.assertRaises(ValidationError):
+            self.mover("SALIDA", "3", origen=self.central)
+        self.assertEqual(self.stock(self.central, "L1"), Decimal("2"))
+        self.assertEqual(Kardex.objects.count(), 1)
+
+    def test_ajuste_fija_el_lote_y_deja_el_resto_en_cero(self):
+        self.mover("INGRESO", "5", destino=self.central, lote="A")
+        self.mover("INGRESO", "3", destino=self.central, lote="B")
+        self.mover("INGRESO", "4", destino=self.sala, lote="A")
+
+        mov = self.mover("AJUSTE", "4", destino=self.central, lote="A")
+
+        self.assertEqual(self.stock(self.central, "A"), Decimal("4"))
+        self.assertEqual(self.stock(self.central, "B"), 0)
+        self.assertEqual(self.stock(self.sala, "A"), Decimal("4"))  # otra bodega: no se toca
+        deltas = {k.lote: k.delta for k in Kardex.objects.filter(movimiento=mov)}
+        self.assertEqual(deltas, {"A": Decimal("-1"), "B": Decimal("-3")})
+
+    def test_ajuste_de_lote_nuevo_crea_la_fila(self):
+        self.mover("INGRESO", "5", destino=self.central, lote="A")
+
+        mov = self.mover("AJUSTE", "2", destino=self.central, lote="C")
+
+        self.assertEqual(self.stock(self.central, "C"), Decimal("2"))
+        self.assertEqual(self.stock(self.central, "A"), 0)
+        self.assertEqual(Kardex.objects.filter(movimiento=mov).count(), 2)
+
+    def test_transferencia_mueve_entre_bodegas(self):
+        self.mover("INGRESO", "6", destino=self.central, lote="L1")
+
+        self.mover("TRANSFERENCIA", "4", origen=self.central, destino=self.sala, lote="L1")
+
+        self.assertEqual(self.stock(self.central, "L1"), Decimal("2"))
+        self.assertEqual(self.stock(self.sala, "L1"), Decimal("4"))
+
+    def test_movimiento_registra_su_vista(self):
+        proveedor = Proveedor.objects.create(
+            rut_nif="76.123.456-7", razon_social="Dulces Sur", email="ventas@dulcessur.cl", condiciones_pago="30 días",
+        )
+        mov = MovimientoInventario(
+            tipo="INGRESO", producto=self.producto, cantidad=Decimal("1"),
+            bodega_destino=self.central, proveedor=proveedor,
+        )
+        mov.save()
+
+        vista = MovimientoVista.objects.get(movimiento=mov)
+        self.assertEqual((vista.sku, vista.bodega_destino), ("SKU-1", "Central"))
+        self.assertEqual(vista.proveedor_rut, "761234567")
+
+
+# ================================================================
+# CONTEO FÍSICO
+# ================================================================
+
+class DiferenciaConteoTests(SimpleTestCase):
+
+    def test_solo_cambia_lo_distinto(self):
+        a = Stock(lote="A", cantidad=Decimal("5"))
+        b = Stock(lote="B", cantidad=Decimal("3"))
+        c = Stock(lote="C", cantidad=Decimal("0"))
+        conteo = {
+            clave_lote("A", None, None): Decimal("5"),
+            clave_lote("B", None, None): Decimal("1"),
+            clave_lote("D", None, None): Decimal("2"),
+            clave_lote("E", None, None): Decimal("0"),
+        }
+
+        cambios, nuevos = diferencia_conteo([a, b, c], conteo)
+
+        self.assertEqual(cambios, [(b, Decimal("3"))])
+        self.assertEqual(b.cantidad, Decimal("1"))
+        self.assertEqual(nuevos, [(("D", None, None), Decimal("2"))])
+
+    def test_lote_no_contado_queda_en_cero(self):
+        a = Stock(lote="A", cantidad=Decimal("5"))
+        cambios, nuevos = diferencia_conteo([a], {})
+        self.assertEqual((cambios, nuevos), ([(a, Decimal("5"))], []))
+        self.assertEqual(a.cantidad, 0)
+
+    def test_vacio_y_null_son_el_mismo_lote(self):
+        a = Stock(lote="", serie=None, cantidad=Decimal("2"))
+        cambios, nuevos = diferencia_conteo([a], {clave_lote(None, "", None): Decimal("2")})
+        self.assertEqual((cambios, nuevos), ([], []))
+
+
+class AplicarConteoTests(BaseInventario):
+
+    def test_ajusta_solo_los_productos_con_diferencias(self):
+        otro = _producto("SKU-2")
+        self.mover("INGRESO", "5", destino=self.central, lote="A")
+        self.mover("INGRESO", "3", destino=self.central, lote="B")
+        Stock.objects.create(producto=otro, bodega=self.central, lote="X", cantidad=Decimal("7"))
+
+        resultado = aplicar_conteo(self.central, [
+            {"producto": self.producto.id, "lote": "A", "cantidad": "2"},
+            {"producto": self.producto.id, "lote": "A", "cantidad": "1.5"},  # otra ubicación
+            {"producto": self.producto.id, "lote": "N", "cantidad": "4"},
+            {"producto": otro.id, "lote": "X", "cantidad": "7"},
+        ])
+
+        self.assertEqual(len(resultado["movimientos"]), 1)
+        self.assertEqual((resultado["filas_actualizadas"], resultado["filas_nuevas"]), (2, 1))
+        mov = MovimientoInventario.objects.get(id=resultado["movimientos"][0])
+        self.assertEqual((mov.tipo, mov.producto_id, mov.cantidad), ("AJUSTE", self.producto.id, Decimal("7.5")))
+        self.assertEqual(self.stock(self.central, "A"), Decimal("3.5"))
+        self.assertEqual(self.stock(self.central, "B"), 0)
+        self.assertEqual(self.stock(self.central, "N"), Decimal("4"))
+        deltas = {k.lote: k.delta for k in Kardex.objects.filter(movimiento=mov)}
+        self.assertEqual(deltas, {"A": Decimal("-1.5"), "B": Decimal("-3"), "N": Decimal("4")})
+        self.assertTrue(MovimientoVista.objects.filter(movimiento=mov).exists())
+
+    def test_sin_diferencias_no_crea_movimientos(self):
+        self.mover("INGRESO", "5", destino=self.central, lote="A")
+        resultado = aplicar_conteo(self.central, [{"producto": self.producto.id, "lote": "A", "cantidad": 5}])
+        self.assertEqual(resultado["movimientos"], [])
+
+    def test_lineas_invalidas(self):
+        with self.assertRaises(ValidationError) as ctx:
+            leer_lineas([
+                {"producto": self.producto.id, "cantidad": "NaN"},
+                {"producto": self.producto.id, "cantidad": "-1"},
+                {"producto": self.producto.id, "cantidad": "1", "fecha_vencimiento": "31/12/2030"},
+                {"producto": 999999, "cantidad": "1"},
+                "texto",
+            ])
+        self.assertEqual(ctx.exception.messages, [
+            "Línea 1: producto y cantidad son obligatorios y numéricos.",
+            "Línea 2: la cantidad no puede ser negativa.",
+            "Línea 3: fecha_vencimiento inválida (AAAA-MM-DD).",
+            "Línea 5: se esperaba un objeto.",
+            "Productos inexistentes: 999999.",
+        ])
+
+
+# ================================================================
+# BÚSQUEDA DE MOVIMIENTOS
+# ================================================================
+
+class ParsearTests(SimpleTestCase):
+
+    def test_claves(self):
+        expr, errores = parsear('sku:ABC tipo:sal proveedor:"Dulces Sur"')
+        self.assertEqual(errores, [])
+        self.assertEqual(
+            expr,
+            Q(sku__istartswith="ABC") & Q(tipo="SALIDA") & Q(proveedor__istartswith="Dulces Sur"),
+        )
+
+    def test_rut_se_normaliza(self):
+        self.assertEqual(parsear("rut:76.123.456-7")[0], Q(proveedor_rut__istartswith="761234567"))
+
+    def test_valores_invalidos_se_informan_e_ignoran(self):
+        expr, errores = parsear("desde:2026-13-01 id:abc tipo:zz sku:A1")
+        self.assertEqual(errores, ["desde:2026-13-01", "id:abc", "tipo:zz"])
+        self.assertEqual(expr, Q(sku__istartswith="A1"))
+
+    def test_terminos_sueltos(self):
+        self.assertEqual(
+            parsear("123")[0], Q(pk=123) | Q(sku__istartswith="123") | Q(lote__istartswith="123"),
+        )
+        self.assertEqual(parsear("ingreso")[0], Q(tipo="INGRESO"))
+        self.assertEqual(parsear("12,5")[0], Q(cantidad=Decimal("12.5")))
+
+    def test_clave_desconocida_es_texto_libre(self):
+        expr, _ = parsear("foo:bar")
+        self.assertIn(("sku__icontains", "foo:bar"), expr.children)
@@ -6,6 +6,8 @@ app_name = 'transactional'
 urlpatterns = [
     path('', views.gestion_transacciones, name='list'),
     path('crear/', views.crear_transaccion, name='crear'),
+    path('vencimientos/', views.vencimientos_view, name='vencimientos'),
+    path('salida/preview/', views.preview_salida, name='preview_salida'),
     path('editar/<int:mov_id>/', views.editar_transaccion, name='editar'),
     path('eliminar/<int:mov_id>/', views.eliminar_transaccion, name='eliminar'),
 ]
\ No newline at end of file
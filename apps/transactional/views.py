@@ -3,17 +3,22 @@ import json
 from decimal import Decimal, InvalidOperation
 
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Q, Sum
 from django.http import JsonResponse, HttpResponse
 from django.shortcuts import render
+from django.utils import timezone
 from django.views.decorators.http import require_POST
 from django.core.exceptions import ValidationError
 
+from lilis_erp.pagination import paginar
 from lilis_erp.roles import require_roles
+from apps.account.utils import registrar_auditoria
+from apps.reports.kpis import al_confirmar_movimiento
 
-from .models import MovimientoInventario, Producto, Proveedor, Bodega
+from .archivo import limite_archivo, listado, tablas
+from .busqueda import parsear, rango_fechas
+from .models import MovimientoInventario, Producto, Proveedor, Bodega, Stock, asignar_fefo
 from apps.api.serializers import (
     UsuarioSerializer,
     ProductoSerializer,
@@ -29,37 +34,33 @@ except ImportError:
     Workbook = None
 
 
-# ==============================================================
-#               BÚSQUEDA GLOBAL
-# ==============================================================
-def _build_transaction_q(q: str) -> Q:
-    q = (q or "").strip()
-    if not q:
-        return Q()
-
-    expr = (
-        Q(producto__sku__icontains=q) |
-        Q(producto__nombre__icontains=q) |
-        Q(tipo__icontains=q) |
-        Q(bodega_origen__nombre__icontains=q) |
-        Q(bodega_destino__nombre__icontains=q) |
-        Q(proveedor__razon_social__icontains=q) |
-        Q(proveedor__rut_nif__icontains=q) |
-        Q(creado_por__username__icontains=q) |
-        Q(lote__icontains=q)
-    )
-
-    try:
-        expr |= Q(cantidad=Decimal(str(q.replace(",", "."))))
-    except:
-        pass
-
-    try:
-        expr |= Q(id=int(q))
-    except:
-        pass
-
-    return expr
+def auditar_movimiento(usuario, mov):
+    """
+    Registra el movimiento en auditoría y lo suma a las métricas del
+    dashboard, ambos una vez confirmada la transacción.
+    """
+    transaction.on_commit(lambda: registrar_auditoria(
+        usuario, mov.tipo,
+        f"Movimiento id={mov.id} SKU={mov.producto.sku} cantidad={mov.cantidad}",
+        objeto_tipo="Producto", objeto_id=mov.producto_id,
+        movimiento_id=mov.id, sku=mov.producto.sku, cantidad=str(mov.cantidad),
+        bodega_origen=mov.bodega_origen_id, bodega_destino=mov.bodega_destino_id,
+    ))
+    transaction.on_commit(lambda: al_confirmar_movimiento([mov.id]))
+
+
+def auditar_conteo(usuario, bodega, resultado):
+    """Como auditar_movimiento, para un conteo físico: un solo evento con los AJUSTE creados."""
+    movimientos = resultado["movimientos"]
+    transaction.on_commit(lambda: registrar_auditoria(
+        usuario, "CONTEO",
+        f"Conteo físico bodega={bodega.nombre} productos={resultado['productos']} ajustes={len(movimientos)}",
+        objeto_tipo="Bodega", objeto_id=bodega.id,
+        movimientos=movimientos,
+        filas_actualizadas=resultado["filas_actualizadas"], filas_nuevas=resultado["filas_nuevas"],
+    ))
+    if movimientos:
+        transaction.on_commit(lambda: al_confirmar_movimiento(movimientos))
 
 
 # ==============================================================
@@ -74,18 +75,15 @@ def gestion_transacciones(request):
     ver = request.GET.get("ver", "todos")
     export = request.GET.get("export", "")
 
-    valid_sort_fields = [
-        "id", "-id", "fecha", "-fecha",
-        "producto__nombre", "-producto__nombre", "tipo", "-tipo"
-    ]
+    # sort del query string -> columna de MovimientoVista
+    valid_sort_fields = {
+        "id": "pk", "fecha": "fecha",
+        "producto__nombre": "producto_nombre", "tipo": "tipo",
+    }
 
-    if sort_by not in valid_sort_fields:
+    if sort_by.lstrip("-") not in valid_sort_fields:
         sort_by = "-id"
-
-    qs = MovimientoInventario.objects.select_related(
-        "producto", "proveedor", "bodega_origen",
-        "bodega_destino", "creado_por"
-    )
+    orden = ("-" if sort_by.startswith("-") else "") + valid_sort_fields[sort_by.lstrip("-")]
 
     filtro_tipos = {
         "ingreso": "INGRESO",
@@ -94,13 +92,18 @@ def gestion_transacciones(request):
         "devolucion": "DEVOLUCION",
         "transferencia": "TRANSFERENCIA",
     }
+    expr, errores_busqueda = parsear(query) if query else (Q(), [])
     if ver in filtro_tipos:
-        qs = qs.filter(tipo=filtro_tipos[ver])
+        expr &= Q(tipo=filtro_tipos[ver])
 
-    if query:
-        qs = qs.filter(_build_transaction_q(query))
+    # Una sola tabla (nombres copiados al registrar el movimiento); el
+    # archivo se suma sólo si el rango de fechas de la búsqueda llega a él
+    desde, hasta = rango_fechas(query)
+    qs = listado(expr, desde, hasta)
+    limite = limite_archivo()
+    archivo_excluido = limite is not None and not tablas(desde, hasta)[1]
 
-    qs = qs.order_by(sort_by)
+    qs = qs.order_by(orden) if orden.lstrip("-") == "pk" else qs.order_by(orden, "-pk")
 
     # --- Exportar Excel ---
     if export == "xlsx":
@@ -118,21 +121,21 @@ def gestion_transacciones(request):
         ]
         ws.append(headers)
 
-        for m in qs:
+        for m in qs.iterator(chunk_size=2000):
             ws.append([
-                m.id,
+                m.pk,
                 m.fecha.strftime("%Y-%m-%d %H:%M"),
                 m.tipo,
-                m.producto.nombre,
-                m.producto.sku,
+                m.producto_nombre,
+                m.sku,
                 m.cantidad,
-                m.bodega_origen.nombre if m.bodega_origen else "-",
-                m.bodega_destino.nombre if m.bodega_destino else "-",
-                m.proveedor.razon_social if m.proveedor else "-",
+                m.bodega_origen or "-",
+                m.bodega_destino or "-",
+                m.proveedor or "-",
                 m.lote or "-",
                 m.serie or "-",
                 m.fecha_vencimiento.strftime("%Y-%m-%d") if m.fecha_vencimiento else "-",
-                m.creado_por.username if m.creado_por else "-",
+                m.usuario or "-",
                 m.observacion or "",
             ])
 
@@ -148,25 +151,124 @@ def gestion_transacciones(request):
         wb.save(response)
         return response
 
-    # Paginador corregido
-    paginator = Paginator(qs, 10)
-    page_number = request.GET.get("page", 1)
-
-    try:
-        page_obj = paginator.page(page_number)
-    except:
-        page_obj = paginator.page(1)
+    page_obj = paginar(request, qs, 10)
 
     return render(request, "gestion_transacciones.html", {
         "movimientos": page_obj.object_list,
         "page_obj": page_obj,
         "query": query,
+        "errores_busqueda": errores_busqueda,
+        "archivado_hasta": limite if archivo_excluido else None,
         "sort_by": sort_by,
         "ver": ver,
         "bodegas": Bodega.objects.all(),
     })
 
 
+# ==============================================================
+#               VENCIMIENTOS (FEFO)
+# ==============================================================
+@login_required
+@require_roles("ADMIN", "PRODUCCION", "INVENTARIO")
+def vencimientos_view(request):
+    """Lotes con saldo que vencen dentro de N días en todas las bodegas."""
+    try:
+        dias = max(0, min(int(request.GET.get("dias") or 30), 365))
+    except ValueError:
+        dias = 30
+    bodega_id = (request.GET.get("bodega") or "").strip()
+    solo_perecibles = request.GET.get("perecibles") == "1"
+    export = (request.GET.get("export") or "").strip()
+
+    hoy = timezone.localdate()
+    qs = Stock.objects.por_vencer(dias, desde=hoy).select_related("producto", "bodega")
+    if bodega_id.isascii() and bodega_id.isdigit():
+        qs = qs.filter(bodega_id=int(bodega_id))
+    if solo_perecibles:
+        qs = qs.filter(producto__perecible=True)
+
+    # --- Exportar Excel ---
+    if export == "xlsx":
+        if Workbook is None:
+            return HttpResponse("Debes instalar openpyxl", status=500)
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Vencimientos"
+        ws.append(["Vence", "Días", "Bodega", "SKU", "Producto", "Lote", "Serie", "Cantidad"])
+        for s in qs.iterator(chunk_size=1000):
+            ws.append([
+                s.fecha_vencimiento.strftime("%Y-%m-%d"),
+                (s.fecha_vencimiento - hoy).days,
+                s.bodega.nombre,
+                s.producto.sku,
+                s.producto.nombre,
+                s.lote or "-",
+                s.serie or "-",
+                s.cantidad,
+            ])
+
+        for col in ws.columns:
+            max_len = max((len(str(cell.value)) for cell in col if cell.value), default=0)
+            ws.column_dimensions[get_column_letter(col[0].column)].width = max_len + 2
+
+        filename = f"vencimientos_{dias}d_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        response = HttpResponse(
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        wb.save(response)
+        return response
+
+    page_obj = paginar(request, qs, 50)
+    for s in page_obj.object_list:
+        s.dias_restantes = (s.fecha_vencimiento - hoy).days
+
+    return render(request, "vencimientos.html", {
+        "lotes": page_obj.object_list,
+        "page_obj": page_obj,
+        "dias": dias,
+        "bodega_id": bodega_id,
+        "perecibles": solo_perecibles,
+        "bodegas": Bodega.objects.order_by("nombre"),
+    })
+
+
+@login_required
+@require_roles("ADMIN", "PRODUCCION", "INVENTARIO")
+def preview_salida(request):
+    """
+    GET ?producto=<id>&bodega=<id>&cantidad=<n>
+    Muestra qué lotes consumiría una salida (FEFO) sin aplicarla.
+    """
+    try:
+        producto_id = int(request.GET.get("producto") or 0)
+        bodega_id = int(request.GET.get("bodega") or 0)
+        cantidad = Decimal(request.GET.get("cantidad") or "0")
+    except (ValueError, InvalidOperation):
+        return JsonResponse({"ok": False, "error": "Parámetros inválidos"}, status=400)
+    if not producto_id or not bodega_id or not cantidad.is_finite() or cantidad <= 0:
+        return JsonResponse({"ok": False, "error": "Indique producto, bodega y cantidad > 0"}, status=400)
+
+    asignaciones, faltante = asignar_fefo(producto_id, bodega_id, cantidad)
+    return JsonResponse({
+        "ok": True,
+        "suficiente": faltante == 0,
+        "faltante": str(faltante),
+        "lotes": [
+            {
+                "stock_id": s.id,
+                "lote": s.lote or "",
+                "serie": s.serie or "",
+                "fecha_vencimiento": s.fecha_vencimiento.isoformat() if s.fecha_vencimiento else None,
+                "disponible": str(s.cantidad),
+                "tomar": str(tomar),
+            }
+            for s, tomar in asignaciones
+        ],
+    })
+
+
 # ==============================================================
 #               CREAR TRANSACCIÓN
 # ==============================================================
@@ -312,9 +414,10 @@ def crear_transaccion(request):
 
             # Lógica solicitada: Si es TRANSFERENCIA, la cantidad es la que está en base de datos (Stock total de la bodega origen)
             if mov.tipo == "TRANSFERENCIA":
-                # Buscamos el stock en la bodega de origen
-                stock_item = mov.producto.stocks.filter(bodega=mov.bodega_origen).first()
-                stock_actual = stock_item.cantidad if stock_item else Decimal("0")
+                # Stock total de la bodega de origen: suma de todos sus lotes
+                stock_actual = mov.producto.stocks.filter(bodega=mov.bodega_origen).aggregate(
+                    total=Sum("cantidad")
+                )["total"] or Decimal("0")
                 
                 if stock_actual <= 0:
                     raise ValidationError(f"No hay stock disponible del producto '{mov.producto.nombre}' en la bodega '{mov.bodega_origen.nombre}' para transferir.")
@@ -324,6 +427,7 @@ def crear_transaccion(request):
             mov.full_clean()
             mov.save()
             mov.aplicar_a_stock()
+            auditar_movimiento(request.user, mov)
 
             return JsonResponse({"ok": True, "id": mov.id})
 
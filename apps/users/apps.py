@@ -6,7 +6,9 @@ class UsersConfig(AppConfig):
     name = 'apps.users'
 
     def ready(self):
-        # Si usas señales, impórtalas aquí (sin modelos).
+        # Revocación de JWT ante cambios de rol/estado y borrado (ver signals.py)
+        from . import signals  # noqa: F401
+
         try:
             from .admin_invite_action import inject_admin_action
             inject_admin_action()
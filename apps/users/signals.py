@@ -0,0 +1,46 @@
+# apps/users/signals.py
+"""
+Revocación de los JWT de la API ante cambios de permisos del usuario.
+
+Los tokens llevan rol e is_superuser en sus claims y se autorizan sin leer
+la tabla de usuarios (ver apps.api.tokens). Un cambio de rol, estado,
+activo o superusuario, y el borrado del usuario, invalidan los tokens ya
+emitidos. Con señales queda cubierto todo camino de escritura: vistas web,
+API y admin (incluido el borrado masivo).
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.api.tokens import revocar_tokens_usuario
+
+from .models import Usuario
+
+CAMPOS_TOKEN = ("rol", "estado", "activo", "is_active", "is_superuser")
+
+
+@receiver(pre_save, sender=Usuario)
+def _detectar_cambio_permisos(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._revocar_tokens = False
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & set(CAMPOS_TOKEN):
+        return  # p. ej. el contador de intentos fallidos del login
+    previo = sender.objects.filter(pk=instance.pk).values(*CAMPOS_TOKEN).first()
+    instance._revocar_tokens = previo is not None and any(
+        previo[campo] != getattr(instance, campo) for campo in CAMPOS_TOKEN
+    )
+
+
+@receiver(post_save, sender=Usuario)
+def _revocar_si_cambio(sender, instance, raw=False, **kwargs):
+    if getattr(instance, "_revocar_tokens", False):
+        instance._revocar_tokens = False
+        usuario_id = instance.pk
+        transaction.on_commit(lambda: revocar_tokens_usuario(usuario_id, motivo="cambio de rol/estado"))
+
+
+@receiver(post_delete, sender=Usuario)
+def _revocar_al_eliminar(sender, instance, **kwargs):
+    usuario_id = instance.pk
+    transaction.on_commit(lambda: revocar_tokens_usuario(usuario_id, motivo="eliminado"))
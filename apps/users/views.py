@@ -2,7 +2,6 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse, HttpResponse, HttpResponseForbidden, HttpRequest
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.db import transaction
 from datetime import datetime
@@ -10,10 +9,11 @@ from apps.account.views import get_redirect_for_role
 from .models import Usuario
 from .utils_invite import invite_user_and_email
 from .forms import UsuarioForm
+from apps.api.tokens import revocar_tokens_usuario
+from lilis_erp.pagination import paginar
 
 # ====== AUDITORÍA ======
-import logging
-audit_logger = logging.getLogger("auditoria")
+from apps.account.utils import registrar_auditoria
 # =======================
 
 # ====== export a Excel (openpyxl) ======
@@ -124,8 +124,7 @@ def gestion_usuarios(request):
     if export == 'xlsx':
         return _usuarios_to_excel(usuarios_list)
 
-    paginator = Paginator(usuarios_list, 10)
-    page_obj = paginator.get_page(request.GET.get('page', 1))
+    page_obj = paginar(request, usuarios_list, 10)
 
     return render(request, 'usuarios/gestion_usuarios.html', {
         'page_obj': page_obj,
@@ -158,9 +157,8 @@ def crear_usuario(request):
         invite_user_and_email(usuario)
 
         # === AUDITORÍA ===
-        audit_logger.info(
-            f"CREATE Usuario id={usuario.id}, username={usuario.username}, por={request.user.username}"
-        )
+        registrar_auditoria(request.user, "CREATE", f"Usuario id={usuario.id}, username={usuario.username}",
+                            objeto_tipo="Usuario", objeto_id=usuario.id)
 
         return JsonResponse({'status': 'ok', 'message': 'Usuario creado e invitación enviada.'})
 
@@ -183,9 +181,8 @@ def eliminar_usuario(request, user_id):
         return JsonResponse({'status': 'error', 'message': 'Solo un Superusuario puede eliminar a otro administrador.'}, status=403)
 
     # === AUDITORÍA ===
-    audit_logger.info(
-        f"DELETE Usuario id={usuario.id}, username={usuario.username}, por={request.user.username}"
-    )
+    registrar_auditoria(request.user, "DELETE", f"Usuario id={usuario.id}, username={usuario.username}",
+                        objeto_tipo="Usuario", objeto_id=usuario.id)
 
     usuario.delete()
     return JsonResponse({'status': 'ok', 'message': 'Usuario eliminado correctamente.'})
@@ -208,9 +205,8 @@ def editar_usuario(request, user_id):
             usuario_actualizado.save()
 
             # === AUDITORÍA ===
-            audit_logger.info(
-                f"UPDATE Usuario id={usuario.id}, username={usuario.username}, por={request.user.username}"
-            )
+            registrar_auditoria(request.user, "UPDATE", f"Usuario id={usuario.id}, username={usuario.username}",
+                                objeto_tipo="Usuario", objeto_id=usuario.id)
 
             return JsonResponse({'status': 'ok', 'message': 'Usuario actualizado correctamente.'})
 
@@ -248,9 +244,8 @@ def desactivar_usuario(request, user_id):
     usuario.activo = False
     usuario.save(update_fields=['estado', 'activo'])
 
-    audit_logger.info(
-        f"DESACTIVAR Usuario id={usuario.id}, por={request.user.username}"
-    )
+    registrar_auditoria(request.user, "DESACTIVAR", f"Usuario id={usuario.id}",
+                        objeto_tipo="Usuario", objeto_id=usuario.id)
 
     return JsonResponse({'status': 'ok', 'message': 'Usuario desactivado.'})
 
@@ -267,9 +262,8 @@ def reactivar_usuario(request, user_id):
     usuario.activo = True
     usuario.save(update_fields=['estado', 'activo'])
 
-    audit_logger.info(
-        f"REACTIVAR Usuario id={usuario.id}, por={request.user.username}"
-    )
+    registrar_auditoria(request.user, "REACTIVAR", f"Usuario id={usuario.id}",
+                        objeto_tipo="Usuario", objeto_id=usuario.id)
 
     return JsonResponse({'status': 'ok', 'message': 'Usuario reactivado.'})
 
@@ -290,9 +284,8 @@ def bloquear_usuario(request, user_id):
     usuario.activo = False
     usuario.save(update_fields=['estado', 'activo'])
 
-    audit_logger.info(
-        f"BLOQUEAR Usuario id={usuario.id}, por={request.user.username}"
-    )
+    registrar_auditoria(request.user, "BLOQUEAR", f"Usuario id={usuario.id}",
+                        objeto_tipo="Usuario", objeto_id=usuario.id)
 
     return JsonResponse({'status': 'ok', 'message': 'Usuario bloqueado.'})
 
@@ -309,9 +302,8 @@ def desbloquear_usuario(request, user_id):
     usuario.activo = True
     usuario.save(update_fields=['estado', 'activo'])
 
-    audit_logger.info(
-        f"DESBLOQUEAR Usuario id={usuario.id}, por={request.user.username}"
-    )
+    registrar_auditoria(request.user, "DESBLOQUEAR", f"Usuario id={usuario.id}",
+                        objeto_tipo="Usuario", objeto_id=usuario.id)
 
     return JsonResponse({'status': 'ok', 'message': 'Usuario desbloqueado.'})
 
@@ -329,10 +321,10 @@ def reiniciar_clave(request: HttpRequest, user_id: int):
     usuario = get_object_or_404(Usuario, id=user_id)
 
     invite_user_and_email(usuario, source='reset')
+    revocar_tokens_usuario(usuario.id, motivo="reinicio de clave")
 
-    audit_logger.info(
-        f"REINICIAR_CLAVE Usuario id={usuario.id}, por={request.user.username}"
-    )
+    registrar_auditoria(request.user, "REINICIAR_CLAVE", f"Usuario id={usuario.id}",
+                        objeto_tipo="Usuario", objeto_id=usuario.id)
 
     return JsonResponse({
         'status': 'ok',
@@ -0,0 +1,50 @@
+# lilis_erp/admin_base.py
+"""
+Piezas comunes para el admin de tablas grandes.
+
+- AdminEscalable: ModelAdmin sin COUNT(*) completo (show_full_result_count
+  = False + PaginadorEstimado) y con la media de select2 cargada.
+- FiltroAutocomplete: filtro de changelist para FKs a tablas grandes.
+  RelatedFieldListFilter dibuja un enlace por cada fila de la tabla
+  relacionada; éste sólo consulta el valor elegido y ofrece un select2 que
+  busca con el endpoint de autocompletado del admin (usa los search_fields
+  del ModelAdmin destino).
+
+Uso: list_filter = (("producto", FiltroAutocomplete), ...)
+"""
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+
+from .pagination import PaginadorEstimado
+
+
+class AdminEscalable(admin.ModelAdmin):
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        return super().media + AutocompleteSelect(None, self.admin_site).media
+
+
+class FiltroAutocomplete(admin.RelatedFieldListFilter):
+    template = "admin/filtro_autocomplete.html"
+
+    def field_choices(self, field, request, model_admin):
+        # Sólo la opción seleccionada (para mostrarla), nunca el catálogo
+        if not self.lookup_val:
+            return []
+        modelo = field.remote_field.model
+        return [(obj.pk, str(obj)) for obj in modelo._default_manager.filter(pk__in=self.lookup_val)]
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        self.url_limpiar = changelist.get_query_string(remove=[self.lookup_kwarg, self.lookup_kwarg_isnull, "p"])
+        self.autocomplete = {
+            "app_label": self.field.model._meta.app_label,
+            "model_name": self.field.model._meta.model_name,
+            "field_name": self.field.name,
+        }
+        yield from super().choices(changelist)
@@ -0,0 +1,241 @@
+# lilis_erp/buscador.py
+"""
+Búsqueda global (/buscar/?q=): productos, proveedores, movimientos y usuarios
+en una sola respuesta.
+
+- Los módulos se consultan uno tras otro en la conexión del request, cada
+  uno con un tope de filas (LIMITE): son pocas lecturas con LIMIT sobre
+  índices, más baratas que abrir una conexión por módulo en otro thread.
+  Si un módulo falla se informa como "error" y el resto sale igual: cada
+  uno corre en su transaction.atomic() (savepoint), así un error de base
+  de datos no deja la conexión inutilizable para los siguientes.
+- Plazo total de PLAZO segundos: vencido, no se consultan más módulos ni
+  niveles; esos módulos salen como "timeout" (con lo que alcanzaron a
+  juntar, sin cachear).
+- Las consultas van por niveles, de la más precisa a la más amplia (id/SKU
+  exacto, prefijo de SKU, prefijo de nombre...), todas sobre columnas
+  indexadas y con LIMIT; sin icontains. Un nivel sólo se consulta si los
+  anteriores no llenaron el cupo.
+- El resultado de cada módulo se cachea CACHE_TTL segundos por consulta
+  normalizada; la cache es compartida entre usuarios y el filtro por rol se
+  aplica antes (un módulo que el rol no ve ni se consulta ni se lee).
+- Ranking: nivel de coincidencia (0 = exacto) y luego orden de módulo.
+"""
+import hashlib
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from apps.products.models import Producto
+from apps.suppliers.busqueda import filtro_busqueda as filtro_proveedores
+from apps.suppliers.models import Proveedor
+from apps.suppliers.validators import normalizar_rut
+from apps.transactional.busqueda import parsear as parsear_movimientos
+from apps.transactional.models import MovimientoVista
+from apps.users.models import Usuario
+
+from .roles import tiene_rol
+
+LIMITE = 5            # filas por módulo
+CACHE_TTL = 60        # segundos
+MIN_LARGO = 2         # no se busca con menos caracteres
+PLAZO = 2.0           # segundos para consultar todos los módulos
+
+logger = logging.getLogger(__name__)
+
+
+class _Plazo:
+    """Momento límite (time.monotonic) de una búsqueda; recuerda si se venció."""
+
+    def __init__(self, segundos):
+        self.hasta = time.monotonic() + segundos
+        self.vencido = False
+
+    def vencio(self):
+        self.vencido = self.vencido or time.monotonic() >= self.hasta
+        return self.vencido
+
+
+def _por_niveles(qs, niveles, limite, orden, plazo):
+    """
+    niveles: [(score, Q)]. Consulta nivel por nivel hasta juntar 'limite'
+    filas distintas o vencer el plazo; devuelve [(score, fila)].
+    """
+    vistos = set()
+    salida = []
+    for score, expr in niveles:
+        faltan = limite - len(salida)
+        if faltan <= 0 or plazo.vencio():
+            break
+        for fila in qs.filter(expr).exclude(pk__in=vistos).order_by(*orden)[:faltan]:
+            vistos.add(fila["pk"])
+            salida.append((score, fila))
+    return salida
+
+
+def _url(nombre, q):
+    """Listado del módulo ya filtrado por el resultado."""
+    return f"{reverse(nombre)}?{urlencode({'q': q})}"
+
+
+# ================================================================
+# MÓDULOS
+# ================================================================
+
+def _productos(q, limite, plazo):
+    niveles = [(0, Q(sku__iexact=q) | Q(ean_upc=q))]
+    if q.isascii() and q.isdigit():
+        niveles[0] = (0, niveles[0][1] | Q(pk=int(q)))
+    niveles += [(1, Q(sku__istartswith=q)), (2, Q(nombre__istartswith=q))]
+    filas = _por_niveles(
+        Producto.objects.values("pk", "sku", "nombre", "activo"), niveles, limite, ("sku",), plazo
+    )
+    return [{
+        "score": score,
+        "id": f["pk"],
+        "titulo": f"{f['sku']} · {f['nombre']}",
+        "detalle": "" if f["activo"] else "Inactivo",
+        "url": _url("products:list", f["sku"]),
+    } for score, f in filas]
+
+
+def _proveedores(q, limite, plazo):
+    niveles = []
+    rut = normalizar_rut(q)
+    if rut.isascii() and rut[:-1].isdigit():
+        niveles.append((0, Q(rut_nif__iexact=rut) | Q(rut_nif__iexact=q)))
+    tokens = filtro_proveedores(q)
+    if tokens:  # Q() vacío = la consulta no tenía términos válidos
+        niveles.append((1, tokens))
+    filas = _por_niveles(
+        Proveedor.objects.values("pk", "rut_nif", "razon_social", "activo"), niveles, limite, ("razon_social",), plazo
+    )
+    return [{
+        "score": score,
+        "id": f["pk"],
+        "titulo": f["razon_social"],
+        "detalle": f["rut_nif"] + ("" if f["activo"] else " · Inactivo"),
+        "url": _url("suppliers:list", f["rut_nif"]),
+    } for score, f in filas]
+
+
+def _movimientos(q, limite, plazo):
+    if ":" in q:
+        # Sintaxis clave:valor del listado de movimientos (términos inválidos se ignoran)
+        niveles = [(1, parsear_movimientos(q)[0])]
+    else:
+        niveles = []
+        if q.isascii() and q.isdigit():
+            niveles.append((0, Q(pk=int(q))))
+        niveles += [
+            (1, Q(sku__istartswith=q) | Q(lote__istartswith=q)),
+            (2, Q(producto_nombre__istartswith=q)),
+        ]
+    filas = _por_niveles(
+        MovimientoVista.objects.values("pk", "tipo", "fecha", "sku", "producto_nombre", "cantidad"),
+        niveles, limite, ("-pk",), plazo,
+    )
+    return [{
+        "score": score,
+        "id": f["pk"],
+        "titulo": f"#{f['pk']} {f['tipo']} · {f['sku']} {f['producto_nombre']}",
+        "detalle": f"{f['fecha']:%d/%m/%Y %H:%M} · {f['cantidad']:f}",
+        "url": _url("transactional:list", f"id:{f['pk']}"),
+    } for score, f in filas]
+
+
+def _usuarios(q, limite, plazo):
+    niveles = [(0, Q(username__iexact=q) | Q(email__iexact=q))]
+    if q.isascii() and q.isdigit():
+        niveles[0] = (0, niveles[0][1] | Q(pk=int(q)))
+    niveles += [
+        (1, Q(username__istartswith=q) | Q(email__istartswith=q)),
+        (2, Q(first_name__istartswith=q) | Q(last_name__istartswith=q)),
+    ]
+    filas = _por_niveles(
+        Usuario.objects.values("pk", "username", "first_name", "last_name", "rol"), niveles, limite, ("username",), plazo
+    )
+    return [{
+        "score": score,
+        "id": f["pk"],
+        "titulo": f["username"],
+        "detalle": " ".join(filter(None, [f["first_name"], f["last_name"], f"({f['rol']})"])),
+        "url": _url("gestion_usuarios", f["username"]),
+    } for score, f in filas]
+
+
+def _es_admin(user):
+    return user.is_superuser or tiene_rol(user, ("ADMIN",))
+
+
+# (nombre, función, quién puede verlo): mismos roles que el listado de cada módulo
+MODULOS = (
+    ("productos", _productos, lambda u: tiene_rol(u, ("ADMIN", "INVENTARIO", "PRODUCCION", "VENTAS"))),
+    ("proveedores", _proveedores, lambda u: tiene_rol(u, ("ADMIN", "COMPRAS", "INVENTARIO"))),
+    ("movimientos", _movimientos, lambda u: tiene_rol(u, ("ADMIN", "PRODUCCION", "INVENTARIO", "VENTAS", "COMPRAS"))),
+    ("usuarios", _usuarios, _es_admin),
+)
+_ORDEN = {nombre: i for i, (nombre, _, _) in enumerate(MODULOS)}
+
+
+def _clave(nombre, q, limite):
+    digest = hashlib.md5(q.lower().encode()).hexdigest()
+    return f"buscador:{nombre}:{limite}:{digest}"
+
+
+def buscar(user, q, limite=LIMITE):
+    """
+    Devuelve {"q", "results": [...], "modulos": {nombre: estado}, "ms"}.
+    estado: "cache" | "ok" | "error" | "timeout".
+    """
+    inicio = time.monotonic()
+    plazo = _Plazo(PLAZO)
+    q = " ".join((q or "").split())
+    if len(q) < MIN_LARGO:
+        return {"q": q, "results": [], "modulos": {}, "ms": 0}
+
+    visibles = [(nombre, funcion) for nombre, funcion, puede in MODULOS if puede(user)]
+    estados = {}
+    por_modulo = {}
+
+    cacheados = cache.get_many([_clave(nombre, q, limite) for nombre, _ in visibles])
+    for nombre, funcion in visibles:
+        clave = _clave(nombre, q, limite)
+        if clave in cacheados:
+            por_modulo[nombre] = cacheados[clave]
+            estados[nombre] = "cache"
+            continue
+        if plazo.vencio():
+            estados[nombre] = "timeout"
+            continue
+        try:
+            with transaction.atomic():
+                por_modulo[nombre] = funcion(q, limite, plazo)
+        except Exception:
+            logger.exception("Búsqueda global: falló el módulo %s", nombre)
+            estados[nombre] = "error"
+            continue
+        if plazo.vencido:
+            # Cortado a mitad de sus niveles: resultado parcial, no se cachea
+            estados[nombre] = "timeout"
+            continue
+        cache.set(clave, por_modulo[nombre], CACHE_TTL)
+        estados[nombre] = "ok"
+
+    results = [
+        {"modulo": nombre, **r}
+        for nombre, filas in por_modulo.items()
+        for r in filas
+    ]
+    results.sort(key=lambda r: (r["score"], _ORDEN[r["modulo"]]))
+    return {
+        "q": q,
+        "results": results,
+        "modulos": estados,
+        "ms": round((time.monotonic() - inicio) * 1000, 1),
+    }
@@ -0,0 +1,182 @@
+# lilis_erp/pagination.py
+"""
+Conteos baratos para listados grandes.
+
+- filas_estimadas(modelo): filas de la tabla según las estadísticas del
+  motor (MySQL information_schema.TABLES, PostgreSQL pg_class, SQLite
+  sqlite_stat1) en vez de COUNT(*). En tablas chicas o sin estadísticas
+  se cuenta exacto (es barato) y se cachea un rato.
+- PaginadorEstimado: Paginator para el admin. Sin filtros usa la
+  estimación; con filtros cuenta como máximo LIMITE_CONTEO filas
+  (COUNT sobre un subquery con LIMIT), así el costo no crece con la tabla.
+- PaginadorAproximado / paginar(): para los listados de la app. Sin
+  filtros, igual que el admin; con filtros, el COUNT exacto se cachea
+  CONTEO_TTL segundos por consulta normalizada, así cambiar de página no
+  vuelve a contar. Los templates muestran "aprox. N" si es_estimado.
+- pagina_con_total(): filas de la página y total exacto en la misma
+  consulta (COUNT(*) OVER ()), para querysets no agrupados.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.db.models import Count, Window
+from django.utils.functional import cached_property
+
+UMBRAL_EXACTO = 10000     # bajo esto se cuenta exacto
+LIMITE_CONTEO = 10000     # tope del conteo con filtros en el admin
+CACHE_TTL = 5 * 60        # segundos
+CONTEO_TTL = 60           # conteos con filtro de los listados
+
+
+def _estimacion_motor(modelo, alias):
+    conn = connections[alias]
+    tabla = modelo._meta.db_table
+    with conn.cursor() as cursor:
+        if conn.vendor == "mysql":
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [tabla],
+            )
+        elif conn.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [tabla])
+        elif conn.vendor == "sqlite":
+            # Sólo existe si alguien corrió ANALYZE; si no, se cuenta exacto
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone() is None:
+                return None
+            # El primer número de cualquier fila de la tabla es su total de filas
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [tabla])
+            fila = cursor.fetchone()
+            return int(fila[0].split()[0]) if fila and fila[0] else None
+        else:
+            return None
+        fila = cursor.fetchone()
+    return int(fila[0]) if fila and fila[0] is not None and fila[0] >= 0 else None
+
+
+def filas_estimadas(modelo, using="default"):
+    """
+    Devuelve (filas, es_estimado). La estimación del motor se cachea
+    CACHE_TTL segundos por tabla; si la tabla es chica (o no hay
+    estadísticas) se cuenta exacto en cada llamada, que es barato y evita
+    mostrar un total viejo justo después de crear o borrar filas.
+    """
+    key = f"pagination:filas:{using}:{modelo._meta.db_table}"
+    estimado = cache.get(key)
+    if estimado is None:
+        estimado = _estimacion_motor(modelo, using)
+        cache.set(key, -1 if estimado is None else estimado, CACHE_TTL)
+    if estimado is None or estimado < UMBRAL_EXACTO:
+        return modelo._default_manager.using(using).count(), False
+    return estimado, True
+
+
+def sin_filtros(queryset):
+    query = queryset.query
+    return (
+        not query.where and not query.distinct and not query.combinator
+        and query.low_mark == 0 and query.high_mark is None
+    )
+
+
+class PaginadorEstimado(Paginator):
+    """
+    Para ModelAdmin.paginator (junto con show_full_result_count = False).
+    - Sin filtros: filas_estimadas() de la tabla.
+    - Con filtros: COUNT acotado a LIMITE_CONTEO (+1 para saber si hay más).
+    es_estimado indica que count no es exacto.
+    """
+    es_estimado = False
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if not hasattr(qs, "query"):
+            return super().count
+        if sin_filtros(qs):
+            total, self.es_estimado = filas_estimadas(qs.model, qs.db)
+            return total
+        return self._conteo_filtrado(qs)
+
+    def _conteo_filtrado(self, qs):
+        total = qs.order_by()[:LIMITE_CONTEO + 1].count()
+        if total > LIMITE_CONTEO:
+            self.es_estimado = True
+            return LIMITE_CONTEO
+        return total
+
+    def validate_number(self, number):
+        # Con un total estimado, las páginas más allá de la estimación
+        # siguen siendo navegables (pueden venir vacías).
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.es_estimado:
+                raise
+            return int(number)
+
+
+class PaginadorAproximado(PaginadorEstimado):
+    """
+    Para los listados (productos, proveedores, usuarios, movimientos...).
+    Con filtros el conteo es exacto pero se cachea CONTEO_TTL segundos por
+    consulta: la clave es el SQL sin ORDER BY, que ya normaliza el query
+    string (orden de parámetros, espacios, sort, page no cambian el total).
+    """
+
+    def _conteo_filtrado(self, qs):
+        qs = qs.order_by()
+        try:
+            sql = str(qs.query)
+        except EmptyResultSet:
+            return 0
+        digest = hashlib.md5(f"{qs.db}|{sql}".encode()).hexdigest()
+        key = f"pagination:conteo:{qs.model._meta.db_table}:{digest}"
+        total = cache.get(key)
+        if total is None:
+            total = qs.count()
+            cache.set(key, total, CONTEO_TTL)
+        return total
+
+
+def paginar(request, queryset, por_pagina):
+    """get_page() con PaginadorAproximado a partir de ?page=."""
+    return PaginadorAproximado(queryset, por_pagina).get_page(request.GET.get("page"))
+
+
+def pagina_con_total(request, queryset, por_pagina):
+    """
+    Como paginar(), pero el total viaja en cada fila como COUNT(*) OVER ():
+    una sola consulta por página. El queryset no debe tener GROUP BY
+    (usar subconsultas para los agregados). Si el motor no tiene funciones
+    de ventana (MySQL < 8) se usa paginar().
+    Sólo una página fuera de rango cuesta un COUNT extra (y se muestra la última).
+    """
+    if not connections[queryset.db].features.supports_over_clause:
+        return paginar(request, queryset, por_pagina)
+
+    try:
+        numero = max(1, int(request.GET.get("page") or 1))
+    except (TypeError, ValueError):
+        numero = 1
+
+    paginator = Paginator(queryset, por_pagina)
+    con_total = queryset.annotate(total_filas=Window(Count("*")))
+    inicio = (numero - 1) * por_pagina
+    filas = list(con_total[inicio:inicio + por_pagina])
+    if filas:
+        paginator.count = filas[0].total_filas
+    elif numero == 1:
+        paginator.count = 0
+    else:
+        paginator.count = queryset.order_by().count()
+        numero = paginator.num_pages
+        inicio = (numero - 1) * por_pagina
+        filas = list(con_total[inicio:inicio + por_pagina])
+    return paginator._get_page(filas, numero, paginator)
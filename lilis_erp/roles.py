@@ -4,6 +4,11 @@ from django.shortcuts import redirect
 from django.urls import reverse
 from django.http import HttpResponseForbidden
 
+def tiene_rol(user, allowed_roles):
+    """Misma regla que require_roles, para usarla fuera de un decorador."""
+    return getattr(user, "rol", None) in allowed_roles or "ANY" in allowed_roles
+
+
 def require_roles(*allowed_roles):
     """
     Decorador para restringir vistas según el atributo user.rol.
@@ -17,8 +22,7 @@ def require_roles(*allowed_roles):
                 login_url = reverse("login")
                 return redirect(f"{login_url}?next={request.get_full_path()}")
 
-            user_role = getattr(request.user, "rol", None)
-            if user_role in allowed_roles or "ANY" in allowed_roles:
+            if tiene_rol(request.user, allowed_roles):
                 return view_func(request, *args, **kwargs)
 
             # 403 (usará tu handler403)
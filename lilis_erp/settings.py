@@ -67,6 +67,7 @@ INSTALLED_APPS = [
     'apps.suppliers',
     'apps.transactional',
     'apps.api',
+    'apps.reports',
 
     # DRF
     'rest_framework',
@@ -131,20 +132,14 @@ DATABASES = {
     },
 }
 
+# MySQL no crea índices parciales (condition=...): el aviso es esperado, en
+# PostgreSQL/SQLite sí se crean (ver Stock.Meta.indexes)
+SILENCED_SYSTEM_CHECKS = ["models.W037"]
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
 
-    # ============
-    # FORMATTERS
-    # ============
-    'formatters': {
-        'audit_formatter': {
-            'format': '{asctime} | {levelname} | {message}',
-            'style': '{',
-        },
-    },
-
     # ============
     # HANDLERS
     # ============
@@ -157,12 +152,17 @@ LOGGING = {
             'filename': BASE_DIR / 'login.log',
         },
 
-        # --- Nuevo handler para auditoría ---
-        'audit_file': {
+        # --- Auditoría no bloqueante ---
+        # Sólo encola; un hilo escribe en lotes a audit.log (rotativo) y a AuditEvento.
+        'audit_queue': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': BASE_DIR /'audit.log',
-            'formatter': 'audit_formatter',
+            '()': 'apps.account.audit.crear_handler_auditoria',
+            'filename': BASE_DIR / 'audit.log',
+            'formato': '{asctime} | {levelname} | {message}',
+            'max_bytes': 10 * 1024 * 1024,
+            'backup_count': 10,
+            'tamano_lote': 200,
+            'intervalo': 2.0,
         },
     },
 
@@ -178,9 +178,9 @@ LOGGING = {
             'propagate': False,
         },
 
-        # --- NUEVO logger audit ---
+        # --- Logger de auditoría (registrar_auditoria) ---
         'auditoria': {
-            'handlers': ['audit_file'],
+            'handlers': ['audit_queue'],
             'level': 'INFO',
             'propagate': False,
         },
@@ -246,7 +246,8 @@ PASSWORD_RESET_PROTOCOL = "http"       # usa "https" si tienes SSL en la instanc
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # JWT sin consulta del usuario por request (claims rol/id + lista de revocación)
+        "apps.api.authentication.StatelessJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
@@ -254,4 +255,24 @@ REST_FRAMEWORK = {
     ),
 }
 
+SIMPLE_JWT = {
+    "TOKEN_USER_CLASS": "apps.api.authentication.UsuarioToken",
+    "TOKEN_OBTAIN_SERIALIZER": "apps.api.tokens.TokenConRolSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "apps.api.tokens.TokenRefreshConDenylistSerializer",
+}
+
+# Caché compartida por todos los workers y por los comandos programados:
+# unos procesos la invalidan o la refrescan (revocación JWT, catálogos,
+# relaciones de proveedores, KPIs, reposición, archivo de movimientos) y
+# otros la leen. Una caché por proceso (LocMemCache) dejaría datos viejos
+# hasta el TTL. La tabla la crea la migración api/0002 (createcachetable).
+# Con Redis disponible basta cambiar BACKEND/LOCATION (django.core.cache.backends.redis.RedisCache).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "lilis_cache",
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+}
+
 
@@ -41,6 +41,9 @@ urlpatterns = [
     # Dashboard principal
     path("", views.dashboard_page, name="dashboard"),
 
+    # Búsqueda global (productos, proveedores, movimientos, usuarios)
+    path("buscar/", views.buscar_global, name="buscar"),
+
     # Admin Django
     path("admin/", admin.site.urls),
 
@@ -61,6 +64,10 @@ urlpatterns = [
         "transacciones/",
         include(("apps.transactional.urls", "transactional"), namespace="transactional")
     ),
+    path(
+        "reportes/",
+        include(("apps.reports.urls", "reports"), namespace="reports")
+    ),
 
     # Acceso por módulo (portón)
     path("modulos/<slug:app_slug>/entrar/", module_gate_view, name="module_gate"),
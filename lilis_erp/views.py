@@ -1,13 +1,30 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from apps.account.views import get_redirect_for_role
+from apps.reports.analitica import resumen_dashboard
+from . import buscador
 
 @login_required(login_url='login')
 def dashboard_page(request):
     user = request.user
     if not (user.is_superuser or getattr(user, "rol", "") == "ADMIN"):
         return redirect(get_redirect_for_role(user))
-    return render(request, "dashboard.html")
+    return render(request, "dashboard.html", {"analitica": resumen_dashboard()})
+
+@login_required(login_url='login')
+def buscar_global(request):
+    """
+    GET /buscar/?q=...[&limite=5]
+    Productos, proveedores, movimientos y usuarios en una respuesta; cada
+    usuario sólo ve los módulos que su rol puede abrir (ver lilis_erp/buscador.py).
+    """
+    try:
+        limite = max(1, min(int(request.GET.get("limite") or buscador.LIMITE), 20))
+    except ValueError:
+        limite = buscador.LIMITE
+    data = buscador.buscar(request.user, request.GET.get("q", ""), limite)
+    return JsonResponse({"ok": True, **data})
 
 def handler403(request, exception=None):
     return render(request, "403.html", status=403)